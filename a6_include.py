@@ -1,3 +1,11 @@
+import bisect
+import mmap
+import os
+import pickle
+import struct
+import time
+
+
 class DynamicArrayException(Exception):
     pass
 
@@ -9,6 +17,8 @@ class DynamicArray:
     append, pop, swap, get_at_index, set_at_index, length
     """
 
+    __slots__ = ('_data',)
+
     def __init__(self, arr=None) -> None:
         """Initialize new dynamic array using a list."""
         self._data = arr.copy() if arr else []
@@ -86,6 +96,275 @@ def hash_function_2(key: str) -> int:
     return hash
 
 
+# ---------- Production hash functions, selectable by name ---------- #
+
+_MASK_64 = (1 << 64) - 1
+_FNV_OFFSET = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+
+
+def _key_bytes(key) -> bytes:
+    """Return the bytes a byte-oriented hash function should consume for key."""
+    if isinstance(key, str):
+        return key.encode('utf-8')
+    if isinstance(key, (bytes, bytearray)):
+        return key
+    return str(key).encode('utf-8')
+
+
+def hash_function_fnv1a(key: str) -> int:
+    """64-bit FNV-1a hash of the key's UTF-8 bytes"""
+    hash = _FNV_OFFSET
+    for byte in _key_bytes(key):
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+def hash_function_builtin(key: str) -> int:
+    """
+    Delegate to Python's builtin hash(). This is by far the fastest option and
+    works for any hashable key, but str/bytes hashes are randomized per process
+    (see PYTHONHASHSEED), so they must not be persisted or shared.
+    """
+    return hash(key)
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> tuple:
+    """Apply the given number of SipRounds to the SipHash state."""
+    mask = _MASK_64
+    for _ in range(rounds):
+        v0 = (v0 + v1) & mask
+        v1 = (((v1 << 13) | (v1 >> 51)) & mask) ^ v0
+        v0 = ((v0 << 32) | (v0 >> 32)) & mask
+        v2 = (v2 + v3) & mask
+        v3 = (((v3 << 16) | (v3 >> 48)) & mask) ^ v2
+        v0 = (v0 + v3) & mask
+        v3 = (((v3 << 21) | (v3 >> 43)) & mask) ^ v0
+        v2 = (v2 + v1) & mask
+        v1 = (((v1 << 17) | (v1 >> 47)) & mask) ^ v2
+        v2 = ((v2 << 32) | (v2 >> 32)) & mask
+    return v0, v1, v2, v3
+
+
+class SipHash:
+    """
+    Keyed SipHash-2-4 over the key's UTF-8 bytes.
+    The 16-byte seed is random unless given, so an attacker who does not
+    know it cannot craft colliding keys.
+    """
+
+    __slots__ = ('seed', '_k0', '_k1')
+
+    def __init__(self, seed: bytes = None) -> None:
+        """Initialize the hash function with a 16-byte seed."""
+        if seed is None:
+            seed = os.urandom(16)
+        if len(seed) != 16:
+            raise ValueError("SipHash seed must be 16 bytes")
+        self.seed = bytes(seed)
+        self._k0 = int.from_bytes(seed[:8], 'little')
+        self._k1 = int.from_bytes(seed[8:], 'little')
+
+    def __call__(self, key: str) -> int:
+        """Return the 64-bit SipHash-2-4 of key."""
+        data = _key_bytes(key)
+        v0 = self._k0 ^ 0x736f6d6570736575
+        v1 = self._k1 ^ 0x646f72616e646f6d
+        v2 = self._k0 ^ 0x6c7967656e657261
+        v3 = self._k1 ^ 0x7465646279746573
+
+        # Every 8-byte word is compressed with two rounds; the last word is padded
+        # with zeros and carries the message length in its top byte
+        tail = len(data) & ~7
+        last = int.from_bytes(data[tail:], 'little') | ((len(data) & 0xff) << 56)
+        words = [int.from_bytes(data[i:i + 8], 'little') for i in range(0, tail, 8)]
+        words.append(last)
+
+        for word in words:
+            v3 ^= word
+            v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+            v0 ^= word
+
+        v2 ^= 0xff
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+        return v0 ^ v1 ^ v2 ^ v3
+
+
+def mix_hash(key_hash: int) -> int:
+    """
+    Mixing finalizer for power-of-two tables, which index with the low bits only.
+    A multiply by the 64-bit golden ratio moves every input bit into the high
+    half of the product, and the xor-shift folds the high half back down.
+    This costs two big-int operations, against four for MurmurHash3's fmix64.
+    """
+    key_hash = (key_hash * 0x9e3779b97f4a7c15) & _MASK_64
+    return key_hash ^ (key_hash >> 32)
+
+
+# Keyed with a random per-process seed
+hash_function_siphash = SipHash()
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': hash_function_fnv1a,
+    'siphash': hash_function_siphash,
+    'builtin': hash_function_builtin,
+}
+
+
+def resolve_hash_function(function) -> callable:
+    """
+    Return the hash function registered under the given name in HASH_FUNCTIONS,
+    or function itself if it is already callable.
+    """
+    if callable(function):
+        return function
+    if function not in HASH_FUNCTIONS:
+        raise ValueError(f"Unknown hash function {function!r}, "
+                         f"expected one of {', '.join(HASH_FUNCTIONS)}")
+    return HASH_FUNCTIONS[function]
+
+
+# ---------- Opt-in operation statistics for both HashMaps ---------- #
+
+class MapStats:
+    """
+    Counters collected by a HashMap created with stats=True: a histogram per
+    operation of how many slots (OA) or chain nodes (SC) it had to look at,
+    plus the number and duration of resizes. The map's own methods record
+    the lengths they measured, so stats cost no extra lookups. An export hook
+    can be called with a snapshot at most once per interval.
+    """
+
+    __slots__ = ('histograms', 'resizes', 'resize_seconds', 'max_resize_seconds',
+                 '_hook', '_interval', '_last_export', '_snapshot')
+
+    def __init__(self, snapshot: callable) -> None:
+        """Initialize empty counters; snapshot() builds what the export hook receives."""
+        self.histograms = {}
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.max_resize_seconds = 0.0
+        self._hook = None
+        self._interval = 0.0
+        self._last_export = 0.0
+        self._snapshot = snapshot
+
+    def record(self, operation: str, length: int) -> None:
+        """Count one operation that looked at length slots or nodes."""
+        histogram = self.histograms.get(operation)
+        if histogram is None:
+            histogram = self.histograms[operation] = {}
+        histogram[length] = histogram.get(length, 0) + 1
+        if self._hook is not None and time.monotonic() - self._last_export >= self._interval:
+            self._last_export = time.monotonic()
+            self._hook(self._snapshot())
+
+    def record_resize(self, seconds: float) -> None:
+        """Count one resize that took the given time."""
+        self.resizes += 1
+        self.resize_seconds += seconds
+        self.max_resize_seconds = max(self.max_resize_seconds, seconds)
+
+    def set_hook(self, callback: callable, interval: float) -> None:
+        """Call callback(snapshot) after an operation whenever interval seconds have passed."""
+        self._hook = callback
+        self._interval = interval
+        self._last_export = time.monotonic()
+
+    def snapshot(self) -> dict:
+        """Return a copy of the counters as plain dicts and numbers."""
+        return {
+            'operations': {operation: sum(histogram.values())
+                           for operation, histogram in self.histograms.items()},
+            'histograms': {operation: dict(sorted(histogram.items()))
+                           for operation, histogram in self.histograms.items()},
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+            'max_resize_seconds': self.max_resize_seconds,
+        }
+
+
+# ---------- Resize policy shared by both HashMaps ---------- #
+
+class GrowthPolicy:
+    """
+    Controls when and how a hash map resizes.
+    max_load         load factor that triggers growth (None uses the map's default)
+    min_load         load factor below which remove shrinks the table (0 never shrinks)
+    growth_factor    capacity multiplier on growth and divisor on shrink
+    sizing           'prime' or 'power_of_two' capacities
+    tombstone_ratio  fraction of the slots tombstones may fill before an open
+                     addressing table is rebuilt without them (None never rebuilds)
+    """
+
+    __slots__ = ('max_load', 'min_load', 'growth_factor', 'sizing', 'tombstone_ratio')
+
+    SIZINGS = ('prime', 'power_of_two')
+
+    def __init__(self, max_load: float = None, min_load: float = 0.0,
+                 growth_factor: float = 2.0, sizing: str = 'prime',
+                 tombstone_ratio: float = 0.25) -> None:
+        """Initialize and validate the policy."""
+        if max_load is not None and max_load <= 0:
+            raise ValueError("max_load must be positive")
+        if min_load < 0:
+            raise ValueError("min_load must not be negative")
+        if growth_factor <= 1:
+            raise ValueError("growth_factor must be greater than 1")
+        if sizing not in self.SIZINGS:
+            raise ValueError(f"Unknown sizing {sizing!r}, expected one of {', '.join(self.SIZINGS)}")
+        if tombstone_ratio is not None and not 0 < tombstone_ratio <= 1:
+            raise ValueError("tombstone_ratio must be in (0, 1]")
+
+        self.max_load = max_load
+        self.min_load = min_load
+        self.growth_factor = growth_factor
+        self.sizing = sizing
+        self.tombstone_ratio = tombstone_ratio
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return (f"GrowthPolicy(max_load={self.max_load}, min_load={self.min_load}, "
+                f"growth_factor={self.growth_factor}, sizing={self.sizing!r}, "
+                f"tombstone_ratio={self.tombstone_ratio})")
+
+    def resolve_max_load(self, default: float) -> float:
+        """
+        Return max_load, or the map's default if it is not set. Raise ValueError
+        if a shrink would leave the table loaded enough to grow straight back.
+        """
+        max_load = default if self.max_load is None else self.max_load
+        if self.min_load * self.growth_factor >= max_load:
+            raise ValueError("min_load * growth_factor must be below max_load")
+        return max_load
+
+    def grow(self, capacity: int) -> int:
+        """Return the (unrounded) capacity to grow to from capacity."""
+        return max(capacity + 1, int(capacity * self.growth_factor))
+
+    def shrink(self, capacity: int) -> int:
+        """Return the (unrounded) capacity to shrink to from capacity."""
+        return max(1, int(capacity / self.growth_factor))
+
+
+def next_power_of_two(capacity: int) -> int:
+    """Return the smallest power of two that is greater than or equal to capacity."""
+    return 1 << max(0, capacity - 1).bit_length()
+
+
+def next_prime(capacity: int) -> int:
+    """Return the smallest prime number >= capacity (capacity >= 2)."""
+    if capacity <= 3:
+        return max(capacity, 2)
+    if capacity % 2 == 0:
+        capacity += 1
+    while any(capacity % factor == 0 for factor in range(3, int(capacity ** 0.5) + 1, 2)):
+        capacity += 2
+    return capacity
+
+
 # --------- For use in Separate Chaining (SC) HashMap  --------- #
 
 class SLNode:
@@ -93,11 +372,19 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    __slots__ = ('key', 'value', 'next', 'key_hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 key_hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        key_hash caches the full hash of the key so the map never has to
+        run the hash function again for this node (e.g. during resize).
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.key_hash = key_hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -109,6 +396,8 @@ class LinkedListIterator:
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -134,6 +423,8 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -158,20 +449,28 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, key_hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, key_hash)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in at the front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def remove(self, key: str, key_hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If key_hash is given, nodes with a different cached hash are
+        skipped without comparing keys.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (key_hash is None or node.key_hash == key_hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -182,11 +481,14 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, key_hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If key_hash is given, it is compared before the (possibly long) key.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (key_hash is None or node.key_hash == key_hash) and node.key == key:
                 return node
             node = node.next
         return node
@@ -196,14 +498,115 @@ class LinkedList:
         return self._size
 
 
+class SortedBucket:
+    """
+    Bucket for a long separate chaining chain. The nodes are kept in an array
+    sorted by (hash, key), with a parallel array of those pairs, so contains,
+    insert and remove binary search in C instead of walking the chain. The
+    keys must all have the same type from ORDERED_KEY_TYPES, so that they are
+    totally ordered; keys of another type that compare equal to one of them
+    (1.0 in a bucket of ints) are found by a linear scan.
+    Supported methods are those of LinkedList.
+    """
+
+    ORDERED_KEY_TYPES = (str, bytes, int, float)
+
+    __slots__ = ('_order', '_nodes', 'key_type')
+
+    def __init__(self, nodes, key_type: type) -> None:
+        """Initialize the bucket with nodes whose keys all have type key_type."""
+        self._nodes = sorted(nodes, key=lambda node: (node.key_hash, node.key))
+        self._order = [(node.key_hash, node.key) for node in self._nodes]
+        self.key_type = key_type
+
+    @staticmethod
+    def key_type_of(nodes) -> type:
+        """
+        Return the type shared by the keys of nodes if it is one of
+        ORDERED_KEY_TYPES, or None if nodes cannot be kept in a SortedBucket.
+        """
+        key_type = None
+        for node in nodes:
+            if key_type is None:
+                key_type = type(node.key)
+                if key_type not in SortedBucket.ORDERED_KEY_TYPES:
+                    return None
+            elif type(node.key) is not key_type:
+                return None
+        return key_type
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return 'SORTED [' + ' -> '.join(str(node) for node in self._nodes) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes in (hash, key) order."""
+        return iter(self._nodes)
+
+    def _index(self, key: object, key_hash: int) -> int:
+        """Return the position of the node for key, or -1 if it is not in the bucket."""
+        if type(key) is self.key_type:
+            order = self._order
+            index = bisect.bisect_left(order, (key_hash, key))
+            if index < len(order) and order[index][0] == key_hash and order[index][1] == key:
+                return index
+            return -1
+        for index, node in enumerate(self._nodes):
+            if node.key_hash == key_hash and node.key == key:
+                return index
+        return -1
+
+    def insert(self, key: object, value: object, key_hash: int) -> None:
+        """Insert a new node for a key of key_type."""
+        self.insert_node(SLNode(key, value, None, key_hash))
+
+    def insert_node(self, node: SLNode) -> None:
+        """Insert an existing node whose key has key_type."""
+        node.next = None
+        index = bisect.bisect_right(self._order, (node.key_hash, node.key))
+        self._order.insert(index, (node.key_hash, node.key))
+        self._nodes.insert(index, node)
+
+    def remove(self, key: object, key_hash: int) -> bool:
+        """Remove the node with matching key. Return True if removal was successful."""
+        index = self._index(key, key_hash)
+        if index == -1:
+            return False
+        del self._order[index]
+        del self._nodes[index]
+        return True
+
+    def contains(self, key: object, key_hash: int) -> SLNode:
+        """Return the node with matching key, or None if no match."""
+        index = self._index(key, key_hash)
+        return self._nodes[index] if index != -1 else None
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
+
+    def to_linked_list(self) -> LinkedList:
+        """Return a LinkedList holding the same nodes."""
+        chain = LinkedList()
+        for node in reversed(self._nodes):
+            chain.insert_node(node)
+        return chain
+
+
 # ---------- For use in Open Addressing (OA) HashMap  ---------- #
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    __slots__ = ('key', 'value', 'key_hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, key_hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        key_hash caches the full hash of the key (see SLNode).
+        """
         self.key = key
         self.value = value
+        self.key_hash = key_hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
@@ -211,3 +614,248 @@ class HashEntry:
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# ---------- Packed read-only table, for shared memory and files ---------- #
+#
+# Layout, little-endian:
+#   header  magic, version, flags, capacity, size, total length,
+#           hash function name and SipHash seed (see _HEADER)
+#   slots   capacity slots of (hash, key offset, value offset, state), see _SLOT
+#   arena   key and value records, each a 4-byte length followed by the
+#           encoded bytes (see _encode_key; values are pickled)
+#
+# The slots form a quadratic probing table over a prime capacity at a load of
+# at most 0.5. Offsets are from the start of the buffer.
+
+_PACKED_MAGIC = b'HMPK'
+_PACKED_VERSION = 1
+_PACKED_MIXED = 1           # flag: stored hashes went through mix_hash
+_HEADER = struct.Struct('<4sHHQQQ16s16s')
+_SLOT = struct.Struct('<QQQB7x')
+_RECORD_LENGTH = struct.Struct('<I')
+PACKED_EMPTY = 0
+PACKED_LIVE = 1
+
+
+def hash_function_name(function) -> tuple:
+    """
+    Return (name, seed) identifying a hash function in every process: its name
+    in HASH_FUNCTIONS, plus the 16-byte seed for SipHash (empty otherwise).
+    Raises ValueError for 'builtin', whose string hashes differ per process,
+    and for functions that are not registered.
+    """
+    function = resolve_hash_function(function)
+    if isinstance(function, SipHash):
+        return 'siphash', function.seed
+    for name, registered in HASH_FUNCTIONS.items():
+        if registered is function:
+            if name == 'builtin':
+                raise ValueError("'builtin' hashes are randomized per process and cannot be stored")
+            return name, b''
+    raise ValueError("Only hash functions registered in HASH_FUNCTIONS can be stored")
+
+
+def _encode_key(key) -> bytes:
+    """Encode a key for the arena: str keys as UTF-8, so they compare without decoding, others pickled."""
+    if isinstance(key, str):
+        return b's' + key.encode('utf-8', 'surrogatepass')
+    return b'p' + pickle.dumps(key)
+
+
+def _append_record(arena: bytearray, arena_offset: int, data: bytes) -> int:
+    """Append a length-prefixed record to the arena and return its offset in the buffer."""
+    offset = arena_offset + len(arena)
+    arena += _RECORD_LENGTH.pack(len(data))
+    arena += data
+    return offset
+
+
+def pack_table(entries, function, mixed: bool = False) -> bytearray:
+    """
+    Pack (key, value, key_hash) triples into a buffer readable by PackedTable.
+    key_hash is the hash the map cached for the key (already passed through
+    mix_hash if mixed is True), or None to compute it. Only the arena is
+    built from the keys and values; slots are placed from the hashes.
+    """
+    name, seed = hash_function_name(function)
+    function = resolve_hash_function(function)
+    entries = list(entries)
+    capacity = next_prime(2 * len(entries) + 1)
+
+    # Each slot is (hash, key offset, value offset, key); a repeated key keeps its
+    # slot and takes the later value
+    slots = [None] * capacity
+    size = 0
+    arena = bytearray()
+    arena_offset = _HEADER.size + capacity * _SLOT.size
+    for key, value, key_hash in entries:
+        if key_hash is None:
+            key_hash = mix_hash(function(key)) if mixed else function(key)
+        key_hash &= _MASK_64
+
+        home = index = key_hash % capacity
+        probe = 0
+        while slots[index] is not None and not (slots[index][0] == key_hash and slots[index][3] == key):
+            probe += 1
+            index = (home + probe * probe) % capacity
+
+        if slots[index] is None:
+            key_offset = _append_record(arena, arena_offset, _encode_key(key))
+            size += 1
+        else:
+            key_offset = slots[index][1]
+        value_offset = _append_record(arena, arena_offset, pickle.dumps(value))
+        slots[index] = (key_hash, key_offset, value_offset, key)
+
+    buffer = bytearray(arena_offset)
+    _HEADER.pack_into(buffer, 0, _PACKED_MAGIC, _PACKED_VERSION, _PACKED_MIXED if mixed else 0,
+                      capacity, size, arena_offset + len(arena),
+                      name.encode('ascii'), seed)
+    for index, slot in enumerate(slots):
+        if slot is not None:
+            _SLOT.pack_into(buffer, _HEADER.size + index * _SLOT.size, *slot[:3], PACKED_LIVE)
+    buffer += arena
+    return buffer
+
+
+class PackedTable:
+    """
+    Read-only hash map over a buffer written by pack_table: bytes, a
+    memoryview of shared memory or an mmap. Lookups read the slots and
+    records straight from the buffer; nothing is copied or rehashed up front.
+    """
+
+    def __init__(self, buffer) -> None:
+        """Validate the header of buffer and prepare lookups."""
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Buffer is too small to hold a packed table")
+        (magic, version, flags, self._capacity, self._size, length,
+         name, seed) = _HEADER.unpack_from(buffer, 0)
+        if magic != _PACKED_MAGIC or version != _PACKED_VERSION:
+            raise ValueError("Buffer does not hold a packed table of a supported version")
+        if len(buffer) < length:
+            raise ValueError("Packed table is truncated")
+
+        name = name.rstrip(b'\0').decode('ascii')
+        function = SipHash(seed) if name == 'siphash' else resolve_hash_function(name)
+        self._function_name = name
+        self._hash_function = (lambda key: mix_hash(function(key))) if flags & _PACKED_MIXED else function
+        self._buffer = buffer
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def get_function_name(self) -> str:
+        """Return the name of the hash function the table was packed with"""
+        return self._function_name
+
+    def _record(self, offset: int) -> bytes:
+        """Return the bytes of the arena record at offset."""
+        start = offset + _RECORD_LENGTH.size
+        return self._buffer[start:start + _RECORD_LENGTH.unpack_from(self._buffer, offset)[0]]
+
+    def _key(self, offset: int) -> object:
+        """Decode the key record at offset."""
+        data = bytes(self._record(offset))
+        return data[1:].decode('utf-8', 'surrogatepass') if data[:1] == b's' else pickle.loads(data[1:])
+
+    def _find(self, key) -> int:
+        """Return the offset of the value record for key, or -1 if the key is absent."""
+        key_hash = self._hash_function(key) & _MASK_64
+        buffer, capacity = self._buffer, self._capacity
+        encoded = _encode_key(key) if isinstance(key, str) else None
+        home = key_hash % capacity
+
+        for probe in range(capacity):
+            index = (home + probe * probe) % capacity
+            slot_hash, key_offset, value_offset, state = _SLOT.unpack_from(
+                buffer, _HEADER.size + index * _SLOT.size)
+            if state == PACKED_EMPTY:
+                return -1
+            if slot_hash != key_hash:
+                continue
+            if encoded is not None:
+                if self._record(key_offset) == encoded:
+                    return value_offset
+            elif self._key(key_offset) == key:
+                return value_offset
+        return -1
+
+    def get(self, key) -> object:
+        """Return the value for key, or None if the key is not in the table."""
+        offset = self._find(key)
+        return None if offset == -1 else pickle.loads(self._record(offset))
+
+    def contains_key(self, key) -> bool:
+        """Return True if key is in the table."""
+        return self._find(key) != -1
+
+    def table_load(self) -> float:
+        """Return the load factor of the table."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty slots."""
+        return self._capacity - self._size
+
+    def __iter__(self):
+        """Iterate over the entries, yielding a HashEntry built for each one."""
+        for index in range(self._capacity):
+            slot_hash, key_offset, value_offset, state = _SLOT.unpack_from(
+                self._buffer, _HEADER.size + index * _SLOT.size)
+            if state == PACKED_LIVE:
+                yield HashEntry(self._key(key_offset), pickle.loads(self._record(value_offset)), slot_hash)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """Return a dynamic array of (key, value) tuples for every entry."""
+        return DynamicArray([(entry.key, entry.value) for entry in self])
+
+    def __enter__(self) -> "PackedTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
+
+    def release(self) -> None:
+        """
+        Drop the reference to the buffer, so shared memory can be closed.
+        A buffer mapped by load_packed is closed here.
+        """
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._buffer = None
+
+
+def save_packed(path: str, entries, function, mixed: bool = False) -> None:
+    """
+    Write (key, value, key_hash) triples to path in the pack_table format.
+    The file is written next to path and then renamed over it, so a reader
+    never sees a partly written table.
+    """
+    buffer = pack_table(entries, function, mixed)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(buffer)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def load_packed(path: str) -> PackedTable:
+    """
+    Map a file written by save_packed into memory and return a read-only
+    PackedTable over it. Pages are read from disk as lookups touch them.
+    """
+    with open(path, 'rb') as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return PackedTable(buffer)
+    except ValueError:
+        buffer.close()
+        raise
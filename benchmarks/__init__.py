@@ -0,0 +1,2 @@
+# Benchmarks for the HashMap implementations. Run each one from the repository root as a module,
+# e.g. python -m benchmarks.resize_latency
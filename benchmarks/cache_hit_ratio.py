@@ -0,0 +1,55 @@
+# Hit ratio of CacheMap's LRU, LFU and W-TinyLFU eviction on Zipfian request traces, for several
+# skews and cache sizes. The 'zipf+scan' trace mixes in one-off sequential keys, which push
+# frequently used entries out of an LRU cache.
+#
+#   python -m benchmarks.cache_hit_ratio [--requests N] [--keys N]
+
+import argparse
+import itertools
+import random
+
+from hash_map_cache import EVICTIONS, CacheMap
+
+
+def zipf_trace(requests: int, keys: int, skew: float, seed: int = 1) -> list:
+    """Return requests keys drawn from keys keys with Zipf weights 1 / rank ** skew."""
+    rng = random.Random(seed)
+    weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, keys + 1)))
+    return ['key' + str(rank) for rank in rng.choices(range(keys), cum_weights=weights, k=requests)]
+
+
+def scan_trace(requests: int, keys: int, skew: float) -> list:
+    """Return a Zipf trace where every fourth request is a key that is never requested again."""
+    trace = zipf_trace(requests, keys, skew)
+    for i in range(0, requests, 4):
+        trace[i] = 'scan' + str(i)
+    return trace
+
+
+def hit_ratio(eviction: str, size: int, trace: list) -> float:
+    """Replay trace through a cache, filling it on every miss, and return its hit ratio."""
+    cache = CacheMap(max_entries=size, eviction=eviction, function='fnv1a')
+    for key in trace:
+        if cache.get(key) is None:
+            cache.put(key, True)
+    return cache.cache_stats().hit_ratio()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=100_000, help='requests per trace')
+    parser.add_argument('--keys', type=int, default=50_000, help='number of distinct keys')
+    args = parser.parse_args()
+
+    traces = [(f"zipf {skew}", zipf_trace(args.requests, args.keys, skew)) for skew in (0.7, 0.9, 1.1)]
+    traces.append(("zipf+scan 0.9", scan_trace(args.requests, args.keys, 0.9)))
+
+    print(f"{'trace':<14} {'size':>6} " + ' '.join(f"{name:>8}" for name in EVICTIONS))
+    for label, trace in traces:
+        for size in (args.keys // 100, args.keys // 10):
+            ratios = ' '.join(f"{hit_ratio(name, size, trace):>8.3f}" for name in EVICTIONS)
+            print(f"{label:<14} {size:>6} {ratios}")
+
+
+if __name__ == '__main__':
+    main()
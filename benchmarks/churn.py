@@ -0,0 +1,58 @@
+# Delete-heavy churn on the open addressing HashMap: a sliding window of keys is inserted at
+# one end and removed at the other, and the latency of lookup misses is sampled as the run
+# goes on. Without tombstone compaction the misses get slower as tombstones pile up.
+#
+#   python -m benchmarks.churn [--window N] [--rounds N]
+
+import argparse
+from time import perf_counter
+
+import hash_map_oa
+from a6_include import GrowthPolicy
+
+
+def miss_latency(hash_map, misses: list) -> float:
+    """Return the mean latency of get() in microseconds over keys that are not in hash_map."""
+    start = perf_counter()
+    for key in misses:
+        hash_map.get(key)
+    return (perf_counter() - start) / len(misses) * 1e6
+
+
+def churn(tombstone_ratio: float, window: int, rounds: int, samples: int) -> list:
+    """
+    Run the sliding-window workload and return one
+    (operations, miss latency us, tombstones, capacity) row per sample.
+    """
+    hash_map = hash_map_oa.HashMap(11, 'fnv1a', policy=GrowthPolicy(tombstone_ratio=tombstone_ratio))
+    misses = ['missing' + str(i) for i in range(500)]
+    for i in range(window):
+        hash_map.put('key' + str(i), i)
+
+    rows = []
+    every = rounds // samples
+    for i in range(window, window + rounds):
+        hash_map.put('key' + str(i), i)
+        hash_map.remove('key' + str(i - window))
+        if (i - window + 1) % every == 0:
+            rows.append((i - window + 1, miss_latency(hash_map, misses),
+                         hash_map.tombstone_count(), hash_map.get_capacity()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--window', type=int, default=2_000, help='number of live keys')
+    parser.add_argument('--rounds', type=int, default=50_000, help='insert/remove pairs to run')
+    parser.add_argument('--samples', type=int, default=10, help='miss latency samples per run')
+    args = parser.parse_args()
+
+    for ratio in (None, 0.25):
+        print(f"\ntombstone_ratio={ratio}")
+        print(f"{'ops':>8} {'miss us':>9} {'tombstones':>11} {'capacity':>9}")
+        for ops, latency, tombstones, capacity in churn(ratio, args.window, args.rounds, args.samples):
+            print(f"{ops:>8} {latency:>9.2f} {tombstones:>11} {capacity:>9}")
+
+
+if __name__ == "__main__":
+    main()
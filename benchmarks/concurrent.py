@@ -0,0 +1,96 @@
+# Multi-threaded stress test and throughput benchmark for ConcurrentHashMap. The stress phase
+# checks that merge and put_if_absent stay atomic under contention; the throughput phase runs
+# a read-mostly mix on 1, 2, 4 and 8 threads with one segment (a single global lock) and with
+# lock striping. Works on both the GIL build and free-threaded CPython.
+#
+#   python -m benchmarks.concurrent [--ops N] [--keys N]
+
+import argparse
+import random
+import sys
+import threading
+from time import perf_counter
+
+from hash_map_concurrent import ConcurrentHashMap
+
+
+def run_threads(target, count: int) -> float:
+    """Run target(thread number) on count threads started together and return the seconds taken."""
+    barrier = threading.Barrier(count + 1)
+
+    def run(number: int) -> None:
+        barrier.wait()
+        target(number)
+
+    threads = [threading.Thread(target=run, args=(number,)) for number in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = perf_counter()
+    for thread in threads:
+        thread.join()
+    return perf_counter() - start
+
+
+def stress(threads: int, ops: int, keys: int) -> None:
+    """Hammer merge and put_if_absent from every thread and check the results."""
+    counts = ConcurrentHashMap(function='fnv1a')
+    winners = ConcurrentHashMap(function='fnv1a')
+    claimed = [0] * threads
+
+    def work(number: int) -> None:
+        rng = random.Random(number)
+        for _ in range(ops):
+            counts.merge('key' + str(rng.randrange(keys)), 1, lambda old, new: old + new)
+        for i in range(keys):
+            if winners.put_if_absent('key' + str(i), number) is None:
+                claimed[number] += 1
+
+    run_threads(work, threads)
+    total = sum(value for _, value in counts)
+    assert total == threads * ops, f"merge lost updates: {total} != {threads * ops}"
+    assert sum(claimed) == keys == winners.get_size(), "put_if_absent admitted more than one writer"
+    print(f"stress ok: {threads} threads, {threads * ops} merges, {keys} contested put_if_absent keys")
+
+
+def throughput(threads: int, segments: int, ops: int, keys: int) -> float:
+    """Return operations per second of a 80% get / 10% put / 10% merge mix."""
+    hash_map = ConcurrentHashMap(function='fnv1a', segments=segments)
+    names = ['key' + str(i) for i in range(keys)]
+    for name in names:
+        hash_map.put(name, 0)
+
+    def work(number: int) -> None:
+        rng = random.Random(number)
+        for _ in range(ops):
+            name = names[rng.randrange(keys)]
+            roll = rng.random()
+            if roll < 0.8:
+                hash_map.get(name)
+            elif roll < 0.9:
+                hash_map.put(name, roll)
+            else:
+                hash_map.merge(name, 1, lambda old, new: new)
+
+    return threads * ops / run_threads(work, threads)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ops', type=int, default=50_000, help='operations per thread')
+    parser.add_argument('--keys', type=int, default=10_000, help='number of distinct keys')
+    args = parser.parse_args()
+
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    stress(8, args.ops // 5, args.keys)
+
+    print(f"{'threads':>8} {'segments':>9} {'ops/sec':>12}")
+    for threads in (1, 2, 4, 8):
+        for segments in (1, 16):
+            rate = throughput(threads, segments, args.ops, args.keys)
+            print(f"{threads:>8} {segments:>9} {rate:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# Worst-case lookup latency of the cuckoo map against the chaining and open addressing maps.
+# Each map is filled with the same keys, then every key and as many missing keys are looked up
+# one at a time. Reports the latency distribution of get and the most slots (cuckoo, OA) or
+# chain nodes (SC) any single lookup examined. hash_function_2 gives the two existing maps long
+# probe sequences and chains on these keys; fnv1a spreads them well. Garbage collection is
+# disabled while timing.
+#
+#   python -m benchmarks.cuckoo [--keys N]
+
+import argparse
+import gc
+from time import perf_counter_ns
+
+import hash_map_cuckoo
+import hash_map_oa
+import hash_map_sc
+
+MAPS = (
+    ('sc', hash_map_sc.HashMap),
+    ('oa', hash_map_oa.HashMap),
+    ('cuckoo', hash_map_cuckoo.HashMap),
+)
+
+
+def get_latencies(hash_map, keys: list) -> list:
+    """Get every key from hash_map and return the sorted latencies in nanoseconds."""
+    latencies = []
+    gc.disable()
+    try:
+        for key in keys:
+            start = perf_counter_ns()
+            hash_map.get(key)
+            latencies.append(perf_counter_ns() - start)
+    finally:
+        gc.enable()
+    return sorted(latencies)
+
+
+def percentile(sorted_values: list, fraction: float) -> int:
+    """Return the value at the given fraction (0..1) of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=20_000, help='number of stored keys')
+    args = parser.parse_args()
+
+    stored = ['key' + str(i) for i in range(args.keys)]
+    lookups = stored + ['miss' + str(i) for i in range(args.keys)]
+    print(f"{'function':<16} {'map':<7} {'p50 us':>7} {'p99 us':>7} {'p99.9 us':>9} {'max us':>8} "
+          f"{'max slots':>10}")
+    for function in ('fnv1a', 'hash_function_2'):
+        for name, cls in MAPS:
+            hash_map = cls(11, function)
+            for key in stored:
+                hash_map.put(key, key)
+            latencies = get_latencies(hash_map, lookups)
+            slots = max(hash_map._probe_length(key) for key in lookups)
+            print(f"{function:<16} {name:<7} "
+                  f"{percentile(latencies, 0.50) / 1e3:>7.2f} "
+                  f"{percentile(latencies, 0.99) / 1e3:>7.2f} "
+                  f"{percentile(latencies, 0.999) / 1e3:>9.2f} "
+                  f"{latencies[-1] / 1e3:>8.2f} "
+                  f"{slots:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# A hash-flooding attack on hash_function_1: every permutation of the same letters has the same
+# character sum, so the keys all share one hash value. Reports put+get throughput with and
+# without flood_guard, and how often the guard switched hash functions.
+#
+#   python -m benchmarks.flooding [--keys N]
+
+import argparse
+import itertools
+from time import perf_counter
+
+import hash_map_oa
+import hash_map_sc
+
+MAPS = (
+    ('sc', hash_map_sc.HashMap, {}),
+    ('oa', hash_map_oa.HashMap, {}),
+    ('oa robin_hood', hash_map_oa.HashMap, {'probing': 'robin_hood'}),
+)
+
+
+def ops_per_second(hash_map, keys: list) -> float:
+    """Put then get every key and return the operations per second."""
+    start = perf_counter()
+    for key in keys:
+        hash_map.put(key, key)
+    for key in keys:
+        hash_map.get(key)
+    return 2 * len(keys) / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=5_000, help='number of colliding keys')
+    args = parser.parse_args()
+
+    keys = [''.join(p) for p in itertools.islice(itertools.permutations('abcdefghijkl'), args.keys)]
+    print(f"{'map':<14} {'unguarded ops/s':>16} {'guarded ops/s':>14} {'rehashes':>9}")
+    for name, cls, options in MAPS:
+        unguarded = ops_per_second(cls(11, 'hash_function_1', **options), keys)
+        hash_map = cls(11, 'hash_function_1', flood_guard=True, **options)
+        guarded = ops_per_second(hash_map, keys)
+        print(f"{name:<14} {unguarded:>16,.0f} {guarded:>14,.0f} {hash_map._flood_rehashes:>9}")
+
+
+if __name__ == "__main__":
+    main()
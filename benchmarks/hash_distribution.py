@@ -0,0 +1,67 @@
+# Compares the hash functions in a6_include.HASH_FUNCTIONS on realistic key sets: how many keys
+# share a full hash value, how evenly they spread over a prime bucket count, and how long one
+# call takes.
+#
+#   python -m benchmarks.hash_distribution [--keys N]
+
+import argparse
+import itertools
+import random
+import string
+from time import perf_counter
+
+from a6_include import HASH_FUNCTIONS
+
+
+def key_sets(count: int) -> dict:
+    """Return the named key sets used by the benchmark, each with about count keys."""
+    rng = random.Random(1234)
+    letters = string.ascii_lowercase + string.digits
+    words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+             for _ in range(200)]
+    return {
+        'prefix+counter': ['str' + str(i) for i in range(count)],
+        'random strings': [''.join(rng.choice(letters) for _ in range(rng.randint(6, 20)))
+                           for _ in range(count)],
+        'anagrams': [''.join(p) for p in itertools.islice(itertools.permutations('abcdefghij'), count)],
+        'url paths': ['/' + '/'.join(rng.sample(words, 3)) + '?id=' + str(rng.randrange(10 ** 6))
+                      for _ in range(count)],
+    }
+
+
+def distribution(hashes: list, buckets: int) -> tuple:
+    """
+    Return (distinct hash values, longest bucket, chi-square ratio) for hashes
+    spread over the given number of buckets. A chi-square ratio close to 1.0
+    means the spread is as even as a uniformly random hash would give.
+    """
+    counts = [0] * buckets
+    for value in hashes:
+        counts[value % buckets] += 1
+    expected = len(hashes) / buckets
+    chi_square = sum((count - expected) ** 2 for count in counts) / expected
+    return len(set(hashes)), max(counts), chi_square / (buckets - 1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=50_000, help='keys per key set')
+    args = parser.parse_args()
+
+    # A prime bucket count close to the number of keys, as the maps would use at load 1.0
+    buckets = 50_021 if args.keys == 50_000 else args.keys | 1
+
+    print(f"{'key set':<16} {'function':<16} {'distinct':>9} {'max bucket':>11} "
+          f"{'chi2 ratio':>11} {'ns/key':>8}")
+    for set_name, keys in key_sets(args.keys).items():
+        for name, function in HASH_FUNCTIONS.items():
+            start = perf_counter()
+            hashes = [function(key) for key in keys]
+            elapsed = perf_counter() - start
+            distinct, longest, ratio = distribution(hashes, buckets)
+            print(f"{set_name:<16} {name:<16} {distinct:>9} {longest:>11} "
+                  f"{ratio:>11.2f} {elapsed / len(keys) * 1e9:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Compares exact find_mode against the bounded-memory approx_find_mode on a Zipf-distributed
+# stream with many distinct values: peak traced memory, run time, whether the true mode was
+# found, the error in the reported frequency, and how many of the true top 10 values the
+# Space-Saving summary keeps.
+#
+#   python -m benchmarks.heavy_hitters [--length N] [--distinct N] [--skew S]
+
+import argparse
+import random
+import tracemalloc
+from time import perf_counter
+
+from a6_include import DynamicArray
+from hash_map_sc import find_mode, top_k
+from heavy_hitters import SpaceSaving, approx_find_mode
+
+
+def zipf_stream(length: int, distinct: int, skew: float, seed: int = 1) -> list:
+    """Return length values drawn from distinct values with Zipf weights 1 / rank ** skew."""
+    rng = random.Random(seed)
+    values = ['value' + str(i) for i in range(distinct)]
+    weights = [1 / rank ** skew for rank in range(1, distinct + 1)]
+    return rng.choices(values, weights, k=length)
+
+
+def measure(function, *args) -> tuple:
+    """Run function(*args) and return (result, peak traced bytes, seconds)."""
+    tracemalloc.start()
+    start = perf_counter()
+    result = function(*args)
+    elapsed = perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def top_recall(stream: list, exact_top: list, epsilon: float) -> float:
+    """Return the fraction of the exact top values that a Space-Saving summary also ranks in its top."""
+    summary = SpaceSaving(int(1 / epsilon), 'fnv1a')
+    summary.update(stream)
+    approx = summary.top_k(len(exact_top))
+    found = {approx[i][0] for i in range(approx.length())}
+    return sum(value in found for value in exact_top) / len(exact_top)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--length', type=int, default=200_000, help='number of values in the stream')
+    parser.add_argument('--distinct', type=int, default=100_000, help='number of distinct values')
+    parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent')
+    args = parser.parse_args()
+
+    stream = DynamicArray(zipf_stream(args.length, args.distinct, args.skew))
+    (exact_mode, exact_frequency), exact_peak, exact_time = measure(find_mode, stream, 'fnv1a')
+    exact_pairs = top_k(stream, 10, 'fnv1a')
+    exact_top = [exact_pairs[i][0] for i in range(exact_pairs.length())]
+
+    print(f"{'method':<18} {'peak KiB':>10} {'seconds':>8} {'mode ok':>8} {'freq error':>11} {'top10':>6}")
+    print(f"{'find_mode':<18} {exact_peak / 1024:>10.0f} {exact_time:>8.2f} {'yes':>8} {0:>11} {1:>6.0%}")
+    for epsilon in (0.01, 0.001):
+        (mode, frequency), peak, elapsed = measure(approx_find_mode, stream, epsilon)
+        mode_ok = mode.length() > 0 and mode[0] in [exact_mode[i] for i in range(exact_mode.length())]
+        print(f"{'approx eps=' + str(epsilon):<18} {peak / 1024:>10.0f} {elapsed:>8.2f} "
+              f"{'yes' if mode_ok else 'no':>8} {frequency - exact_frequency:>11} "
+              f"{top_recall(stream, exact_top, epsilon):>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+# Reports the memory each HashMap implementation uses per stored key/value pair, measured with
+# tracemalloc. Keys and values are created before tracing starts, so only the map's own
+# structures (buckets, entries, arrays) are counted.
+#
+#   python -m benchmarks.memory [--sizes N [N ...]]
+
+import argparse
+import tracemalloc
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_sc
+import hash_map_swiss
+
+MAPS = (
+    ('sc', hash_map_sc.HashMap),
+    ('oa', hash_map_oa.HashMap),
+    ('compact', hash_map_compact.HashMap),
+    ('swiss', hash_map_swiss.HashMap),
+)
+
+
+def bytes_per_entry(cls, keys: list, values: list) -> float:
+    """Build a map of cls holding keys/values and return the traced bytes per pair."""
+    tracemalloc.start()
+    hash_map = cls(11, hash)
+    for key, value in zip(keys, values):
+        hash_map.put(key, value)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return used / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help='numbers of entries to measure')
+    args = parser.parse_args()
+
+    print(f"{'map':<10} {'entries':>10} {'bytes/entry':>12}")
+    for size in args.sizes:
+        keys = ['key' + str(i) for i in range(size)]
+        values = list(range(1_000, 1_000 + size))
+        for name, cls in MAPS:
+            print(f"{name:<10} {size:>10} {bytes_per_entry(cls, keys, values):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
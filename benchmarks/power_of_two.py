@@ -0,0 +1,44 @@
+# Compares put/get throughput of prime-modulo tables against power-of-two tables with mask
+# indexing (GrowthPolicy(sizing='power_of_two')) for both HashMap implementations.
+#
+#   python -m benchmarks.power_of_two [--keys N]
+
+import argparse
+from time import perf_counter
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import GrowthPolicy
+
+
+def throughput(hash_map, keys: list) -> tuple:
+    """Put then get every key and return (puts per second, gets per second)."""
+    start = perf_counter()
+    for key in keys:
+        hash_map.put(key, key)
+    put_time = perf_counter() - start
+
+    start = perf_counter()
+    for key in keys:
+        hash_map.get(key)
+    get_time = perf_counter() - start
+    return len(keys) / put_time, len(keys) / get_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=200_000, help='number of keys to insert')
+    args = parser.parse_args()
+
+    keys = ['key' + str(i) for i in range(args.keys)]
+    print(f"{'map':<4} {'function':<9} {'sizing':<13} {'put/s':>10} {'get/s':>10}")
+    for name, cls in (('oa', hash_map_oa.HashMap), ('sc', hash_map_sc.HashMap)):
+        for function in ('builtin', 'fnv1a'):
+            for sizing in ('prime', 'power_of_two'):
+                hash_map = cls(11, function, policy=GrowthPolicy(sizing=sizing))
+                puts, gets = throughput(hash_map, keys)
+                print(f"{name:<4} {function:<9} {sizing:<13} {puts:>10.0f} {gets:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# Measures the worst-case latency of a single put() while a map grows, comparing the default
+# stop-the-world resize against the incremental resize mode of both HashMap implementations.
+#
+#   python -m benchmarks.resize_latency [--keys N]
+
+import argparse
+from time import perf_counter_ns
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_2
+
+
+def put_latencies(hash_map, keys: list) -> list:
+    """Put every key into hash_map and return the latency of each put in nanoseconds."""
+    latencies = []
+    for key in keys:
+        start = perf_counter_ns()
+        hash_map.put(key, key)
+        latencies.append(perf_counter_ns() - start)
+    return latencies
+
+
+def percentile(sorted_values: list, fraction: float) -> int:
+    """Return the value at the given fraction (0..1) of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=20_000, help='number of keys to insert')
+    args = parser.parse_args()
+
+    keys = ['key' + str(i) for i in range(args.keys)]
+    print(f"{'map':<4} {'mode':<12} {'p50 us':>8} {'p99 us':>8} {'max ms':>8} {'total s':>8}")
+    for name, cls in (('oa', hash_map_oa.HashMap), ('sc', hash_map_sc.HashMap)):
+        for incremental in (False, True):
+            latencies = sorted(put_latencies(cls(11, hash_function_2, incremental=incremental), keys))
+            print(f"{name:<4} {'incremental' if incremental else 'blocking':<12} "
+                  f"{percentile(latencies, 0.50) / 1e3:>8.2f} "
+                  f"{percentile(latencies, 0.99) / 1e3:>8.2f} "
+                  f"{latencies[-1] / 1e6:>8.2f} "
+                  f"{sum(latencies) / 1e9:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
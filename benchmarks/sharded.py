@@ -0,0 +1,43 @@
+# Scaling of parallel_find_mode over 1, 2, 4 and 8 worker processes against the single-process
+# find_mode, on a high-cardinality input. The times include starting the workers. Speedups
+# are bounded by the number of CPU cores available.
+#
+#   python -m benchmarks.sharded [--length N] [--distinct N] [--engine sc|oa]
+
+import argparse
+import os
+import random
+from time import perf_counter
+
+from a6_include import DynamicArray
+from hash_map_sc import find_mode
+from hash_map_sharded import parallel_find_mode
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--length', type=int, default=500_000, help='number of values to count')
+    parser.add_argument('--distinct', type=int, default=100_000, help='number of distinct values')
+    parser.add_argument('--engine', choices=('sc', 'oa'), default='sc', help='HashMap used for each shard')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    da = DynamicArray(['value' + str(rng.randrange(args.distinct)) for _ in range(args.length)])
+    print(f"{args.length} values, {args.distinct} distinct, {os.cpu_count()} CPUs")
+
+    start = perf_counter()
+    _, expected = find_mode(da, 'fnv1a')
+    baseline = perf_counter() - start
+    print(f"{'processes':>10} {'seconds':>8} {'speedup':>8}")
+    print(f"{'find_mode':>10} {baseline:>8.2f} {1:>8.2f}")
+
+    for processes in (1, 2, 4, 8):
+        start = perf_counter()
+        _, frequency = parallel_find_mode(da, processes, 'fnv1a', args.engine)
+        elapsed = perf_counter() - start
+        assert frequency == expected, f"{frequency} != {expected}"
+        print(f"{processes:>10} {elapsed:>8.2f} {baseline / elapsed:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# Memory per worker process for a read-mostly lookup table: every worker building its own
+# hash_map_oa.HashMap, against every worker attaching to one SharedHashMap. RSS counts shared
+# pages in full for each worker; PSS splits them between the workers that map them, so it
+# shows the real cost per worker. Reads /proc and needs Linux.
+#
+#   python -m benchmarks.shared_memory [--entries N] [--workers N]
+
+import argparse
+import multiprocessing
+
+import hash_map_oa
+from hash_map_shared import SharedHashMap
+
+
+def memory_kib() -> tuple:
+    """Return (RSS, PSS) of this process in KiB."""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Rss'], fields['Pss']
+
+
+def pairs(entries: int):
+    """Yield the table contents: entries of (key, value) strings."""
+    for i in range(entries):
+        yield 'key' + str(i), 'value' + str(i)
+
+
+def worker(mode: str, entries: int, name: str, ready, results) -> None:
+    """Load or attach to the table, look up every key, then report memory once all workers are loaded."""
+    if mode == 'private':
+        table = hash_map_oa.HashMap(11, 'fnv1a', expected_size=entries)
+        table.put_many(pairs(entries))
+    else:
+        table = SharedHashMap(name)
+    for key, value in pairs(entries):
+        assert table.get(key) == value
+
+    # Measure while every worker still holds its table, so shared pages are split
+    ready.wait()
+    results.put(memory_kib())
+    ready.wait()
+    if mode == 'shared':
+        table.close()
+
+
+def run(mode: str, entries: int, workers: int) -> tuple:
+    """Return the mean (RSS, PSS) in KiB of workers running mode."""
+    context = multiprocessing.get_context('fork')
+    shared = SharedHashMap.create(pairs(entries)) if mode == 'shared' else None
+    ready = context.Barrier(workers)
+    results = context.Queue()
+    processes = [context.Process(target=worker,
+                                 args=(mode, entries, shared and shared.get_name(), ready, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    measured = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    if shared is not None:
+        shared.unlink()
+    return (sum(rss for rss, _ in measured) / workers,
+            sum(pss for _, pss in measured) / workers)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=100_000, help='number of entries in the table')
+    parser.add_argument('--workers', type=int, default=4, help='number of worker processes')
+    args = parser.parse_args()
+
+    print(f"{args.entries} entries, {args.workers} workers; mean memory per worker")
+    print(f"{'mode':<8} {'RSS KiB':>10} {'PSS KiB':>10}")
+    for mode in ('private', 'shared'):
+        rss, pss = run(mode, args.entries, args.workers)
+        print(f"{mode:<8} {rss:>10.0f} {pss:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
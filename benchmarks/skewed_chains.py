@@ -0,0 +1,64 @@
+# Separate chaining under skewed hash functions: hash_function_1 and hash_function_2 map
+# prefix + counter keys onto few distinct values, so chains grow to hundreds of nodes. Compares
+# put/get/remove throughput of the map with SortedBucket chains (the default) against plain
+# linked chains, plus fnv1a keys to show the cost on well spread tables.
+#
+#   python -m benchmarks.skewed_chains [--keys N]
+
+import argparse
+import sys
+from time import perf_counter
+
+from a6_include import SortedBucket
+from hash_map_sc import HashMap
+
+
+class ChainOnlyHashMap(HashMap):
+    """The chaining map with SortedBucket conversion turned off."""
+
+    _TREEIFY_LENGTH = sys.maxsize
+
+
+def longest_chain(hash_map: HashMap) -> int:
+    """Return the number of nodes in the fullest bucket."""
+    return max(hash_map._buckets[i].length() for i in range(hash_map.get_capacity()))
+
+
+def run(cls, function: str, keys: list) -> tuple:
+    """Return (put, get, remove) operations per second for keys, and the map after the puts."""
+    hash_map = cls(11, function)
+    rates = []
+    start = perf_counter()
+    for key in keys:
+        hash_map.put(key, key)
+    rates.append(len(keys) / (perf_counter() - start))
+    start = perf_counter()
+    for key in keys:
+        hash_map.get(key)
+    rates.append(len(keys) / (perf_counter() - start))
+    chain = longest_chain(hash_map)
+    sorted_buckets = sum(type(hash_map._buckets[i]) is SortedBucket for i in range(hash_map.get_capacity()))
+    start = perf_counter()
+    for key in keys:
+        hash_map.remove(key)
+    rates.append(len(keys) / (perf_counter() - start))
+    return rates, chain, sorted_buckets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=20_000, help='number of keys')
+    args = parser.parse_args()
+
+    keys = ['key' + str(i) for i in range(args.keys)]
+    print(f"{'function':<16} {'buckets':<8} {'put/s':>9} {'get/s':>9} {'remove/s':>9} "
+          f"{'longest':>8} {'sorted':>7}")
+    for function in ('hash_function_1', 'hash_function_2', 'fnv1a'):
+        for label, cls in (('chain', ChainOnlyHashMap), ('sorted', HashMap)):
+            (put, get, remove), chain, sorted_buckets = run(cls, function, keys)
+            print(f"{function:<16} {label:<8} {put:>9,.0f} {get:>9,.0f} {remove:>9,.0f} "
+                  f"{chain:>8} {sorted_buckets:>7}")
+
+
+if __name__ == "__main__":
+    main()
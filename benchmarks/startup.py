@@ -0,0 +1,73 @@
+# Startup time of a saved map: replaying put for every pair, unpickling the map object, and
+# load() of the packed file written by save(), which maps it and is queryable at once. Each
+# method is timed up to and including 1000 lookups, so lazy loading is not hidden.
+#
+#   python -m benchmarks.startup [--entries N]
+
+import argparse
+import os
+import pickle
+import tempfile
+from time import perf_counter
+
+import hash_map_oa
+import hash_map_sc
+
+MAPS = (
+    ('sc', hash_map_sc.HashMap),
+    ('oa', hash_map_oa.HashMap),
+)
+
+
+def timed(function) -> float:
+    """Return the seconds function() takes."""
+    start = perf_counter()
+    function()
+    return perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=100_000, help='number of entries in the map')
+    args = parser.parse_args()
+
+    pairs = [('key' + str(i), 'value' + str(i)) for i in range(args.entries)]
+    probes = [pairs[i][0] for i in range(0, args.entries, max(1, args.entries // 1000))]
+
+    print(f"{args.entries} entries; seconds to a queryable map")
+    print(f"{'map':<4} {'replay put':>11} {'pickle':>8} {'mmap load':>10} {'file MiB':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, cls in MAPS:
+            hash_map = cls(11, 'fnv1a')
+            for key, value in pairs:
+                hash_map.put(key, value)
+            pickle_path = os.path.join(directory, name + '.pickle')
+            packed_path = os.path.join(directory, name + '.hmpk')
+            with open(pickle_path, 'wb') as file:
+                pickle.dump(hash_map, file, pickle.HIGHEST_PROTOCOL)
+            hash_map.save(packed_path)
+
+            def replay() -> None:
+                replayed = cls(11, 'fnv1a')
+                for key, value in pairs:
+                    replayed.put(key, value)
+                for key in probes:
+                    replayed.get(key)
+
+            def unpickle() -> None:
+                with open(pickle_path, 'rb') as file:
+                    loaded = pickle.load(file)
+                for key in probes:
+                    loaded.get(key)
+
+            def load() -> None:
+                with cls.load(packed_path) as table:
+                    for key in probes:
+                        table.get(key)
+
+            print(f"{name:<4} {timed(replay):>11.3f} {timed(unpickle):>8.3f} {timed(load):>10.3f} "
+                  f"{os.path.getsize(packed_path) / 2 ** 20:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,350 @@
+# The benchmark suite: the same workloads against both HashMap implementations, with every
+# registered hash function, and against the builtin dict as a reference. For each run it reports
+# throughput, per-operation latency percentiles and peak traced memory, and it can save the
+# results as JSON and compare them with a file saved on an earlier commit.
+#
+#   python -m benchmarks.suite [--ops N] [--maps sc oa dict] [--functions NAME ...]
+#                              [--workloads NAME ...] [--repeat N] [--output FILE] [--compare FILE]
+#   python -m benchmarks.suite --list
+#
+# Every run uses fixed seeds, so two runs on the same machine measure identical key streams.
+# Throughput comes from the fastest of --repeat untimed passes, latencies from a pass timing each
+# operation, and memory from a last pass under tracemalloc, so timers and tracing skew nothing else.
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import string
+import subprocess
+import sys
+import tracemalloc
+from time import perf_counter, perf_counter_ns, strftime
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import HASH_FUNCTIONS, DynamicArray
+
+MAPS = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+    'dict': None,
+}
+
+
+def sequential_keys(count: int, rng: random.Random) -> list:
+    """Return count keys of the form prefix + counter."""
+    return ['key' + str(i) for i in range(count)]
+
+
+def random_keys(count: int, rng: random.Random) -> list:
+    """Return count distinct random strings of 8 to 20 letters and digits."""
+    letters = string.ascii_letters + string.digits
+    keys = set()
+    while len(keys) < count:
+        keys.add(''.join(rng.choices(letters, k=rng.randint(8, 20))))
+    return sorted(keys)
+
+
+def zipf_choices(keys: list, count: int, rng: random.Random, skew: float = 1.0) -> list:
+    """Return count keys drawn from keys with Zipf weights 1 / rank ** skew."""
+    weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(keys) + 1)))
+    return rng.choices(keys, cum_weights=weights, k=count)
+
+
+class Workload:
+    """
+    A named benchmark workload. prepare(ops, rng, function) builds its input
+    once. Every pass then calls setup(new_map, data) to build and fill the map,
+    and steps(hash_map, data) for the zero-argument callables that are timed.
+    A workload that is not timed per operation is one callable over count(data)
+    elements, and only its throughput and memory are reported.
+    """
+
+    def __init__(self, name: str, description: str, prepare: callable, setup: callable,
+                 steps: callable, count: callable = None) -> None:
+        """Initialize a workload from its input builder, map setup and step builder."""
+        self.name = name
+        self.description = description
+        self.prepare = prepare
+        self.setup = setup
+        self.steps = steps
+        self.count = count
+
+
+def _presized(new_map: callable, keys: list):
+    """Return an empty map sized for keys."""
+    return new_map(len(keys))
+
+
+def _default_size(new_map: callable, data) -> object:
+    """Return an empty map at the default capacity, so it resizes as it fills."""
+    return new_map(None)
+
+
+def _filled(new_map: callable, data: tuple):
+    """Return a map holding the first element of data, a list of keys."""
+    keys = data[0]
+    hash_map = new_map(len(keys))
+    put = _put(hash_map)
+    for key in keys:
+        put(key, key)
+    return hash_map
+
+
+def _insert_lookup(hash_map, keys: list) -> list:
+    """Put every key, then get every key."""
+    put, get = _put(hash_map), _get(hash_map)
+    return ([lambda key=key: put(key, key) for key in keys] +
+            [lambda key=key: get(key) for key in keys])
+
+
+def _reads(hash_map, data: tuple) -> list:
+    """Get the keys in the second element of data."""
+    get = _get(hash_map)
+    return [lambda key=key: get(key) for key in data[1]]
+
+
+def _churn(hash_map, data: tuple) -> list:
+    """Slide a window over the keys: put the next key and remove the oldest one."""
+    keys, next_keys = data
+    put, remove = _put(hash_map), _remove(hash_map)
+    window = len(keys)
+    keys = keys + next_keys
+    steps = []
+    for i in range(window, len(keys)):
+        steps.append(lambda key=keys[i]: put(key, key))
+        steps.append(lambda key=keys[i - window]: remove(key))
+    return steps
+
+
+def _growth(hash_map, keys: list) -> list:
+    """Put every key."""
+    put = _put(hash_map)
+    return [lambda key=key: put(key, key) for key in keys]
+
+
+def _find_mode(counts, data: tuple) -> list:
+    """
+    Count the values of a stream and collect the modes, as one step. The
+    chaining map runs hash_map_sc.find_mode; the others count with get/put.
+    """
+    stream, function = data
+
+    def run() -> None:
+        if isinstance(counts, hash_map_sc.HashMap):
+            hash_map_sc.find_mode(stream, function)
+            return
+        get, put = _get(counts), _put(counts)
+        for i in range(stream.length()):
+            value = stream.get_at_index(i)
+            put(value, (get(value) or 0) + 1)
+        if isinstance(counts, dict):
+            pairs = list(counts.items())
+        else:
+            da = counts.get_keys_and_values()
+            pairs = [da.get_at_index(i) for i in range(da.length())]
+        max_frequency = max(count for _, count in pairs)
+        [value for value, count in pairs if count == max_frequency]
+
+    return [run]
+
+
+def _put(hash_map) -> callable:
+    """Return the bound put method of a HashMap or dict."""
+    return hash_map.__setitem__ if isinstance(hash_map, dict) else hash_map.put
+
+
+def _get(hash_map) -> callable:
+    """Return the bound get method of a HashMap or dict."""
+    return hash_map.get
+
+
+def _remove(hash_map) -> callable:
+    """Return the bound remove method of a HashMap or dict (keys must be present for a dict)."""
+    return hash_map.__delitem__ if isinstance(hash_map, dict) else hash_map.remove
+
+
+WORKLOADS = {workload.name: workload for workload in (
+    Workload('sequential', 'put then get prefix+counter keys in a presized map',
+             lambda ops, rng, function: sequential_keys(ops // 2, rng), _presized, _insert_lookup),
+    Workload('random', 'put then get random strings in a presized map',
+             lambda ops, rng, function: random_keys(ops // 2, rng), _presized, _insert_lookup),
+    Workload('zipf_reads', 'get Zipf-distributed keys, a tenth of them missing, from a full map',
+             lambda ops, rng, function: (
+                 sequential_keys(ops // 4, rng),
+                 zipf_choices(sequential_keys(ops // 4 + ops // 40, rng), ops, rng)),
+             _filled, _reads),
+    Workload('churn', 'sliding window of put and remove',
+             lambda ops, rng, function: (
+                 sequential_keys(ops // 8, rng),
+                 ['next' + str(i) for i in range(ops // 2)]),
+             _filled, _churn),
+    Workload('growth', 'put random strings into a map starting at the default capacity',
+             lambda ops, rng, function: random_keys(ops, rng), _default_size, _growth),
+    Workload('find_mode', 'count a Zipf stream and find its modes',
+             lambda ops, rng, function: (
+                 DynamicArray(zipf_choices(sequential_keys(ops // 10, rng), ops, rng, 1.1)), function),
+             _default_size, _find_mode, lambda data: data[0].length()),
+)}
+
+
+def map_factory(engine: str, function: callable) -> callable:
+    """Return new_map(expected_size) building an empty map of engine with function."""
+    cls = MAPS[engine]
+
+    def new_map(expected_size: int):
+        if cls is None:
+            return {}
+        return cls(11, function, expected_size=expected_size)
+
+    return new_map
+
+
+def percentile(sorted_values: list, fraction: float) -> int:
+    """Return the value at the given fraction (0..1) of an already sorted list."""
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run(engine: str, function: str, workload: Workload, ops: int, seed: int, repeat: int) -> dict:
+    """Run one workload on one map and return its result row."""
+    data = workload.prepare(ops, random.Random(seed), function)
+    new_map = map_factory(engine, HASH_FUNCTIONS[function])
+
+    # Throughput: untimed calls, the fastest of repeat runs
+    seconds = float('inf')
+    for _ in range(repeat):
+        steps = workload.steps(workload.setup(new_map, data), data)
+        start = perf_counter()
+        for step in steps:
+            step()
+        seconds = min(seconds, perf_counter() - start)
+    count = workload.count(data) if workload.count else len(steps)
+
+    # Latency: every call timed on its own
+    latencies = None
+    if workload.count is None:
+        steps = workload.steps(workload.setup(new_map, data), data)
+        latencies = []
+        for step in steps:
+            begin = perf_counter_ns()
+            step()
+            latencies.append(perf_counter_ns() - begin)
+        latencies.sort()
+
+    # Memory: the peak of the map's allocations while it is built and used. The
+    # input is built beforehand, and the step callables are not counted.
+    tracemalloc.start()
+    hash_map = workload.setup(new_map, data)
+    before = tracemalloc.get_traced_memory()[0]
+    steps = workload.steps(hash_map, data)
+    steps_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.reset_peak()
+    for step in steps:
+        step()
+    peak = tracemalloc.get_traced_memory()[1] - steps_bytes
+    tracemalloc.stop()
+
+    return {
+        'map': engine,
+        'function': function,
+        'workload': workload.name,
+        'ops': count,
+        'seconds': seconds,
+        'ops_per_sec': count / seconds,
+        'p50_ns': latencies and percentile(latencies, 0.50),
+        'p99_ns': latencies and percentile(latencies, 0.99),
+        'max_ns': latencies and latencies[-1],
+        'peak_bytes': peak,
+    }
+
+
+def _format_ns(value: int, scale: float) -> str:
+    """Return a latency in ns divided by scale, or '-' when it was not measured."""
+    return '-' if value is None else f"{value / scale:.2f}"
+
+
+def git_commit() -> str:
+    """Return the current commit hash (with a -dirty suffix for local changes), or None outside git."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + '-dirty' if dirty else commit
+
+
+def compare(results: list, baseline_path: str) -> None:
+    """Print the change in throughput and p99 latency of every row also found in a baseline file."""
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    previous = {(row['map'], row['function'], row['workload']): row for row in baseline['results']}
+    print(f"\nagainst {baseline_path} (commit {baseline['meta'].get('commit')})")
+    print(f"{'map':<5} {'function':<16} {'workload':<11} {'ops/sec':>9} {'p99':>9}")
+    for row in results:
+        old = previous.get((row['map'], row['function'], row['workload']))
+        if old is None:
+            continue
+        throughput = row['ops_per_sec'] / old['ops_per_sec'] - 1
+        if row['p99_ns'] and old['p99_ns']:
+            p99 = f"{row['p99_ns'] / old['p99_ns'] - 1:+.1%}"
+        else:
+            p99 = '-'
+        print(f"{row['map']:<5} {row['function']:<16} {row['workload']:<11} {throughput:>+9.1%} {p99:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--ops', type=int, default=20_000, help='operations per workload')
+    parser.add_argument('--maps', nargs='+', choices=MAPS, default=list(MAPS), help='maps to run')
+    parser.add_argument('--functions', nargs='+', choices=HASH_FUNCTIONS, default=list(HASH_FUNCTIONS),
+                        help='hash functions to run the HashMaps with')
+    parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS),
+                        help='workloads to run')
+    parser.add_argument('--seed', type=int, default=1, help='seed of the generated keys')
+    parser.add_argument('--repeat', type=int, default=3, help='throughput runs per row; the fastest counts')
+    parser.add_argument('--list', action='store_true', help='describe the workloads and exit')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare with the results of an earlier --output file')
+    args = parser.parse_args()
+
+    if args.list:
+        for workload in WORKLOADS.values():
+            print(f"{workload.name:<11} {workload.description}")
+        return
+
+    print(f"{'map':<5} {'function':<16} {'workload':<11} {'ops/sec':>10} "
+          f"{'p50 us':>8} {'p99 us':>8} {'max ms':>8} {'peak KiB':>9}")
+    results = []
+    for workload in args.workloads:
+        for engine in args.maps:
+            # dict always hashes with the builtin hash, so it runs once per workload
+            for function in (['builtin'] if engine == 'dict' else args.functions):
+                row = run(engine, function, WORKLOADS[workload], args.ops, args.seed, args.repeat)
+                results.append(row)
+                print(f"{engine:<5} {function:<16} {workload:<11} {row['ops_per_sec']:>10,.0f} "
+                      f"{_format_ns(row['p50_ns'], 1e3):>8} {_format_ns(row['p99_ns'], 1e3):>8} "
+                      f"{_format_ns(row['max_ns'], 1e6):>8} {row['peak_bytes'] / 1024:>9.0f}", flush=True)
+
+    if args.output:
+        meta = {
+            'commit': git_commit(),
+            'date': strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': sys.version,
+            'implementation': platform.python_implementation(),
+            'machine': platform.platform(),
+            'ops': args.ops,
+            'seed': args.seed,
+            'repeat': args.repeat,
+        }
+        with open(args.output, 'w') as file:
+            json.dump({'meta': meta, 'results': results}, file, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
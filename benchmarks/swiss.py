@@ -0,0 +1,67 @@
+# Lookup hits and misses on the open addressing maps: hash_map_oa (a HashEntry per slot),
+# hash_map_compact (flat arrays) and hash_map_swiss (grouped control bytes). Besides the time
+# per lookup it counts full key comparisons, using a str subclass that counts calls to __eq__,
+# and reports the bytes each map's own structures take per entry.
+#
+#   python -m benchmarks.swiss [--keys N]
+
+import argparse
+import tracemalloc
+from time import perf_counter
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_swiss
+
+MAPS = (
+    ('oa', hash_map_oa.HashMap),
+    ('compact', hash_map_compact.HashMap),
+    ('swiss', hash_map_swiss.HashMap),
+)
+
+
+class CountedKey(str):
+    """A str that counts how often it is compared for equality."""
+
+    comparisons = 0
+    __hash__ = str.__hash__
+
+    def __eq__(self, other) -> bool:
+        CountedKey.comparisons += 1
+        return str.__eq__(self, other)
+
+
+def lookups(hash_map, keys: list) -> tuple:
+    """Get every key and return (ns per lookup, key comparisons per lookup)."""
+    CountedKey.comparisons = 0
+    start = perf_counter()
+    for key in keys:
+        hash_map.get(key)
+    elapsed = perf_counter() - start
+    return elapsed / len(keys) * 1e9, CountedKey.comparisons / len(keys)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--keys', type=int, default=100_000, help='number of stored keys')
+    args = parser.parse_args()
+
+    stored = [CountedKey('key' + str(i)) for i in range(args.keys)]
+    missing = [CountedKey('miss' + str(i)) for i in range(args.keys)]
+    print(f"{'map':<8} {'load':>5} {'bytes/entry':>12} {'hit ns':>7} {'hit cmp':>8} {'miss ns':>8} "
+          f"{'miss cmp':>9}")
+    for name, cls in MAPS:
+        tracemalloc.start()
+        hash_map = cls(11, 'builtin')
+        for key in stored:
+            hash_map.put(key, key)
+        used = tracemalloc.get_traced_memory()[0] / len(stored)
+        tracemalloc.stop()
+        hit_ns, hit_cmp = lookups(hash_map, stored)
+        miss_ns, miss_cmp = lookups(hash_map, missing)
+        print(f"{name:<8} {hash_map.table_load():>5.2f} {used:>12.1f} {hit_ns:>7.0f} {hit_cmp:>8.2f} "
+              f"{miss_ns:>8.0f} {miss_cmp:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# Write throughput of DurableHashMap at several group-commit (fsync) intervals, against the
+# in-memory separate chaining HashMap it wraps. Run it with --directory on the disk that will
+# hold the data; the default temporary directory may be in memory, which makes fsync free.
+#
+#   python -m benchmarks.wal [--puts N] [--directory PATH]
+
+import argparse
+import tempfile
+from time import perf_counter
+
+import hash_map_sc
+from hash_map_wal import DurableHashMap
+
+INTERVALS = (0, 0.001, 0.01, 0.1, None)
+
+
+def puts_per_second(hash_map, pairs: list) -> float:
+    """Return put() calls per second over pairs."""
+    start = perf_counter()
+    for key, value in pairs:
+        hash_map.put(key, value)
+    return len(pairs) / (perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--puts', type=int, default=20_000, help='number of puts per run')
+    parser.add_argument('--directory', help='where to create the logs (default: a temporary directory)')
+    args = parser.parse_args()
+
+    pairs = [('key' + str(i), 'value' + str(i)) for i in range(args.puts)]
+    print(f"{'map':<22} {'puts/sec':>10}")
+    print(f"{'in-memory':<22} {puts_per_second(hash_map_sc.HashMap(11, 'fnv1a'), pairs):>10,.0f}")
+
+    for interval in INTERVALS:
+        with tempfile.TemporaryDirectory(dir=args.directory) as directory:
+            with DurableHashMap(directory, 'fnv1a', fsync_interval=interval) as hash_map:
+                rate = puts_per_second(hash_map, pairs)
+        if interval is None:
+            label = 'fsync on close'
+        elif interval == 0:
+            label = 'fsync every put'
+        else:
+            label = f"fsync every {interval}s"
+        print(f"{label:<22} {rate:>10,.0f}")
+
+
+if __name__ == '__main__':
+    main()
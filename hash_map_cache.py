@@ -0,0 +1,498 @@
+# A bounded cache built on the separate chaining HashMap. Chain nodes carry the eviction policy's
+# links themselves (CacheNode extends SLNode), so a hit is one hash lookup plus O(1) pointer
+# updates. Entries can be bounded by count or by bytes, expire after a TTL, and are evicted by
+# LRU, LFU or W-TinyLFU.
+
+import math
+import sys
+from time import monotonic
+
+from a6_include import DynamicArray, SLNode, hash_function_1, hash_function_2
+from hash_map_sc import HashMap
+from heavy_hitters import CountMinSketch
+
+
+class CacheNode(SLNode):
+    """
+    Chain node that is also a member of a doubly linked eviction list.
+    segment is the list (or LFU frequency group) the node is in.
+    """
+
+    __slots__ = ('prev_recent', 'next_recent', 'segment', 'expires', 'weight')
+
+    def __init__(self, key: object, value: object, key_hash: int = None,
+                 expires: float = None, weight: int = 1) -> None:
+        """Initialize a node that is not linked into any list yet."""
+        super().__init__(key, value, None, key_hash)
+        self.prev_recent = None
+        self.next_recent = None
+        self.segment = None
+        self.expires = expires
+        self.weight = weight
+
+
+class RecencyList:
+    """
+    Doubly linked list of CacheNodes, most recently used at the front.
+    A sentinel node closes the ring, so linking and unlinking never branch.
+    """
+
+    __slots__ = ('_sentinel', '_size')
+
+    def __init__(self) -> None:
+        """Initialize an empty list."""
+        self._sentinel = CacheNode(None, None)
+        self._sentinel.prev_recent = self._sentinel.next_recent = self._sentinel
+        self._size = 0
+
+    def push_front(self, node: CacheNode) -> None:
+        """Link node in as the most recently used."""
+        sentinel = self._sentinel
+        node.prev_recent, node.next_recent = sentinel, sentinel.next_recent
+        sentinel.next_recent.prev_recent = node
+        sentinel.next_recent = node
+        node.segment = self
+        self._size += 1
+
+    def unlink(self, node: CacheNode) -> None:
+        """Unlink node from the list."""
+        node.prev_recent.next_recent = node.next_recent
+        node.next_recent.prev_recent = node.prev_recent
+        node.prev_recent = node.next_recent = node.segment = None
+        self._size -= 1
+
+    def back(self) -> CacheNode:
+        """Return the least recently used node, or None if the list is empty."""
+        node = self._sentinel.prev_recent
+        return None if node is self._sentinel else node
+
+    def length(self) -> int:
+        """Return the number of nodes in the list."""
+        return self._size
+
+
+class LRUEviction:
+    """
+    Evict the least recently used entry.
+    Every eviction policy is built with the CacheMap and is told about each
+    inserted, used and removed node; victim() names the next node to evict.
+    """
+
+    def __init__(self, cache: "CacheMap") -> None:
+        """Initialize the policy for cache."""
+        self._recent = RecencyList()
+
+    def on_insert(self, node: CacheNode) -> None:
+        """Track a node just added to the cache."""
+        self._recent.push_front(node)
+
+    def on_access(self, node: CacheNode) -> None:
+        """Record a use (a hit or an update) of node."""
+        self._recent.unlink(node)
+        self._recent.push_front(node)
+
+    def on_remove(self, node: CacheNode) -> None:
+        """Stop tracking a node removed from the cache."""
+        self._recent.unlink(node)
+
+    def victim(self) -> CacheNode:
+        """Return the node to evict next, or None if the cache is empty."""
+        return self._recent.back()
+
+    def clear(self) -> None:
+        """Forget every node."""
+        self._recent = RecencyList()
+
+
+class _FrequencyGroup(RecencyList):
+    """LFU group of the nodes used a given number of times, in a list of groups ordered by count."""
+
+    __slots__ = ('count', 'prev_group', 'next_group')
+
+    def __init__(self, count: int) -> None:
+        """Initialize an empty group for nodes used count times."""
+        super().__init__()
+        self.count = count
+        self.prev_group = self.next_group = None
+
+
+class LFUEviction:
+    """
+    Evict the least frequently used entry, the least recently used one among ties.
+    Nodes sit in groups of equal use count kept in count order, so every
+    operation is O(1) (the O(1) LFU scheme of Shah, Mitra and Matani).
+    """
+
+    def __init__(self, cache: "CacheMap") -> None:
+        """Initialize the policy for cache."""
+        self.clear()
+
+    def _group_after(self, group: _FrequencyGroup, count: int) -> _FrequencyGroup:
+        """Return the group for count, creating it right after group if needed."""
+        following = group.next_group
+        if following is not self._groups and following.count == count:
+            return following
+        new_group = _FrequencyGroup(count)
+        new_group.prev_group, new_group.next_group = group, following
+        group.next_group = following.prev_group = new_group
+        return new_group
+
+    def _drop_if_empty(self, group: _FrequencyGroup) -> None:
+        """Unlink group from the group list once it holds no nodes."""
+        if group.length() == 0 and group is not self._groups:
+            group.prev_group.next_group = group.next_group
+            group.next_group.prev_group = group.prev_group
+
+    def on_insert(self, node: CacheNode) -> None:
+        self._group_after(self._groups, 1).push_front(node)
+
+    def on_access(self, node: CacheNode) -> None:
+        group = node.segment
+        group.unlink(node)
+        self._group_after(group, group.count + 1).push_front(node)
+        self._drop_if_empty(group)
+
+    def on_remove(self, node: CacheNode) -> None:
+        group = node.segment
+        group.unlink(node)
+        self._drop_if_empty(group)
+
+    def victim(self) -> CacheNode:
+        first = self._groups.next_group
+        return None if first is self._groups else first.back()
+
+    def clear(self) -> None:
+        # Sentinel group with count 0 closing the ring of groups
+        self._groups = _FrequencyGroup(0)
+        self._groups.prev_group = self._groups.next_group = self._groups
+
+
+class TinyLFUEviction:
+    """
+    W-TinyLFU: new entries enter a small LRU window (1% of the entries) and
+    then move to a segmented LRU of probation and protected (80%) entries.
+    On eviction the newest probation entry competes with the oldest one and
+    the one with the higher estimated frequency, from a periodically halved
+    Count-Min Sketch, stays. One-hit wonders therefore cannot flush entries
+    that are used often.
+    """
+
+    def __init__(self, cache: "CacheMap") -> None:
+        """Initialize the policy, sizing the sketch for the cache's max_entries."""
+        width_hint = cache._max_entries or 1024
+        self._sketch = CountMinSketch(min(0.01, math.e / (4 * width_hint)), 0.05)
+        self._sample_size = 10 * width_hint
+        self._samples = 0
+        self.clear()
+
+    def _record(self, node: CacheNode) -> None:
+        """Count one use of node's key in the sketch, halving it once per sample period."""
+        self._sketch._add_hashed(node.key_hash)
+        self._samples += 1
+        if self._samples >= self._sample_size:
+            self._sketch.halve()
+            self._samples //= 2
+
+    def _frequency(self, node: CacheNode) -> int:
+        """Return the estimated recent use count of node's key."""
+        return self._sketch._estimate_hashed(node.key_hash)
+
+    def _main_victim(self) -> CacheNode:
+        """Return the oldest probation entry, or the oldest protected one if probation is empty."""
+        return self._probation.back() or self._protected.back()
+
+    def on_insert(self, node: CacheNode) -> None:
+        self._record(node)
+        self._window.push_front(node)
+        # Entries leaving the window join probation, where they compete on eviction
+        entries = self._window.length() + self._probation.length() + self._protected.length()
+        while self._window.length() > max(1, entries // 100):
+            moved = self._window.back()
+            self._window.unlink(moved)
+            self._probation.push_front(moved)
+
+    def on_access(self, node: CacheNode) -> None:
+        self._record(node)
+        segment = node.segment
+        segment.unlink(node)
+        if segment is self._probation:
+            # A second use promotes an entry, demoting the oldest protected one if needed
+            self._protected.push_front(node)
+            main = self._protected.length() + self._probation.length()
+            if self._protected.length() > 0.8 * main:
+                demoted = self._protected.back()
+                self._protected.unlink(demoted)
+                self._probation.push_front(demoted)
+        else:
+            segment.push_front(node)
+
+    def on_remove(self, node: CacheNode) -> None:
+        node.segment.unlink(node)
+
+    def victim(self) -> CacheNode:
+        # The newest probation entry (usually just out of the window) competes with
+        # the oldest one, and the one with the lower estimated frequency is evicted
+        candidate = self._probation._sentinel.next_recent
+        victim = self._main_victim()
+        if victim is None:
+            return self._window.back()
+        if candidate is victim or candidate is self._probation._sentinel:
+            return victim
+        if self._frequency(candidate) > self._frequency(victim):
+            return victim
+        return candidate
+
+    def clear(self) -> None:
+        self._window = RecencyList()
+        self._probation = RecencyList()
+        self._protected = RecencyList()
+
+
+EVICTIONS = {
+    'lru': LRUEviction,
+    'lfu': LFUEviction,
+    'tinylfu': TinyLFUEviction,
+}
+
+
+class CacheStats:
+    """Hit, miss, eviction and expiration counts of a CacheMap."""
+
+    __slots__ = ('hits', 'misses', 'evictions', 'expirations')
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def hit_ratio(self) -> float:
+        """Return the fraction of lookups that were hits (0 before any lookup)."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return (f"hits: {self.hits} misses: {self.misses} evictions: {self.evictions} "
+                f"expirations: {self.expirations} hit ratio: {self.hit_ratio():.3f}")
+
+
+class CacheMap(HashMap):
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 eviction: str = 'lru',
+                 ttl: float = None,
+                 function: callable = hash_function_1,
+                 weigher: callable = None,
+                 clock: callable = monotonic,
+                 on_evict: callable = None,
+                 **options) -> None:
+        """
+        Initialize a cache holding at most max_entries entries and/or at most
+        max_bytes bytes, as measured by weigher(key, value) (by default the
+        sys.getsizeof of key and value). eviction is 'lru', 'lfu' or 'tinylfu'.
+        ttl is the default number of seconds, on clock, an entry lives after
+        its last put; None keeps entries until they are evicted. Without any
+        bound the cache only ever drops expired entries.
+        on_evict(key, value) is called for every entry evicted to stay within
+        the bounds (not for expired or removed entries).
+        options are passed on to HashMap, except stats, since lookups bypass the
+        HashMap methods that record them; cache_stats() has the cache's counters.
+        """
+        if max_entries is None and max_bytes is None and ttl is None:
+            raise ValueError("A CacheMap needs max_entries, max_bytes, ttl or a combination")
+        if options.get('stats'):
+            raise ValueError("A CacheMap reports its counters with cache_stats(); stats=True is not supported")
+        if eviction not in EVICTIONS:
+            raise ValueError(f"Unknown eviction {eviction!r}, expected one of {', '.join(EVICTIONS)}")
+        if max_entries is not None:
+            options.setdefault('expected_size', max_entries)
+        super().__init__(options.pop('capacity', 11), function, **options)
+
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._default_ttl = ttl
+        self._weigher = weigher or (lambda key, value: sys.getsizeof(key) + sys.getsizeof(value))
+        self._clock = clock
+        self._on_evict = on_evict
+        self._bytes = 0
+        self._cache_stats = CacheStats()
+        self._eviction = EVICTIONS[eviction](self)
+
+    def get_bytes(self) -> int:
+        """
+        Return the total weight of the cached entries
+        """
+        return self._bytes
+
+    def cache_stats(self) -> CacheStats:
+        """
+        Return the cache's hit/miss/eviction/expiration counters
+        """
+        return self._cache_stats
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object, ttl: float = None) -> None:
+        """
+        Add or update key, then evict entries until the cache is within its bounds.
+        ttl overrides the cache's default time to live for this entry.
+        """
+        if self.table_load() >= self._max_load:
+            self._resize(self._policy.grow(self._capacity))
+
+        self._rehash_step()
+        self._put_hashed(key, value, self._hash(key), ttl)
+
+    def _put_hashed(self, key: object, value: object, key_hash: int, ttl: float = None) -> None:
+        """
+        Add or update the given key using an already computed hash, then evict
+        entries until the cache is within its bounds.
+        """
+        ttl = self._default_ttl if ttl is None else ttl
+        expires = None if ttl is None else self._clock() + ttl
+        weight = self._weigher(key, value) if self._max_bytes is not None else 1
+
+        node = self._find_node(key, key_hash)
+        if node:
+            self._bytes += weight - node.weight
+            node.value, node.expires, node.weight = value, expires, weight
+            self._eviction.on_access(node)
+        else:
+            node = CacheNode(key, value, key_hash, expires, weight)
+            bucket = self._link_node(node)
+            self._size += 1
+            self._bytes += weight
+            self._eviction.on_insert(node)
+            if self._flood_guard and bucket.length() > self._FLOOD_CHAIN:
+                self._defend_flood()
+        self._evict()
+
+    def _over_bounds(self) -> bool:
+        """Return True if the cache holds more entries or bytes than allowed."""
+        return ((self._max_entries is not None and self._size > self._max_entries) or
+                (self._max_bytes is not None and self._bytes > self._max_bytes))
+
+    def _evict(self) -> None:
+        """Evict the eviction policy's victims until the cache is within its bounds."""
+        while self._size and self._over_bounds():
+            node = self._eviction.victim()
+            self._remove_hashed(node.key, node.key_hash)
+            self._cache_stats.evictions += 1
+            if self._on_evict is not None:
+                self._on_evict(node.key, node.value)
+
+    def _remove_hashed(self, key: object, key_hash: int) -> bool:
+        """
+        Remove the given key using an already computed hash, unlinking it from
+        the eviction policy. Return True if the key was found.
+        """
+        node = self._find_node(key, key_hash)
+        if node is None:
+            return False
+        super()._remove_hashed(key, key_hash)
+        self._eviction.on_remove(node)
+        self._bytes -= node.weight
+        return True
+
+    def _live_node(self, key: object) -> CacheNode:
+        """Return the node for key, or None if it is absent or expired (removing it then)."""
+        self._rehash_step()
+        key_hash = self._hash(key)
+        node = self._find_node(key, key_hash)
+        if node is not None and node.expires is not None and node.expires <= self._clock():
+            self._remove_hashed(key, key_hash)
+            self._cache_stats.expirations += 1
+            return None
+        return node
+
+    def get(self, key: object) -> object:
+        """
+        Return the value cached for key, or None on a miss. A hit counts as a use
+        for the eviction policy.
+        """
+        node = self._live_node(key)
+        if node is None:
+            self._cache_stats.misses += 1
+            return None
+        self._cache_stats.hits += 1
+        self._eviction.on_access(node)
+        return node.value
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Return the cached value of every key of an iterable, in order, using
+        default for misses. Every lookup counts like a get.
+        """
+        result = DynamicArray()
+        for key in keys:
+            node = self._live_node(key)
+            if node is None:
+                self._cache_stats.misses += 1
+                result.append(default)
+            else:
+                self._cache_stats.hits += 1
+                self._eviction.on_access(node)
+                result.append(node.value)
+        return result
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Return True if key is cached and not expired. Does not count as a use.
+        """
+        return self._live_node(key) is not None
+
+    def purge_expired(self) -> int:
+        """
+        Remove every expired entry and return how many there were. Expired
+        entries are otherwise only removed when they are looked up or evicted.
+        """
+        now = self._clock()
+        expired = [node for node in self._nodes() if node.expires is not None and node.expires <= now]
+        for node in expired:
+            self._remove_hashed(node.key, node.key_hash)
+        self._cache_stats.expirations += len(expired)
+        return len(expired)
+
+    def clear(self) -> None:
+        """
+        Clear all contents of the cache. The statistics are kept.
+        """
+        super().clear()
+        self._eviction.clear()
+        self._bytes = 0
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nLRU example")
+    print("-----------")
+    cache = CacheMap(max_entries=3)
+    for key in ['a', 'b', 'c']:
+        cache.put(key, key.upper())
+    cache.get('a')
+    cache.put('d', 'D')
+    print(cache.get_keys_and_values(), cache.get('b'))
+    print(cache.cache_stats())
+
+    print("\nLFU example")
+    print("-----------")
+    cache = CacheMap(max_entries=3, eviction='lfu', function=hash_function_2)
+    for key in ['a', 'b', 'c', 'a', 'a', 'b', 'd']:
+        if cache.get(key) is None:
+            cache.put(key, key.upper())
+    print(cache.get_keys_and_values())
+    print(cache.cache_stats())
+
+    print("\nTTL and max_bytes example")
+    print("-------------------------")
+    now = [0.0]
+    cache = CacheMap(max_bytes=100, ttl=10, weigher=lambda key, value: len(value), clock=lambda: now[0])
+    cache.put('short', 'x' * 40, ttl=1)
+    cache.put('long', 'y' * 50)
+    now[0] = 5.0
+    print(cache.get('short'), cache.get_bytes(), cache.get_size())
+    cache.put('big', 'z' * 60)
+    print(cache.contains_key('long'), cache.get_bytes())
+    print(cache.cache_stats())
@@ -0,0 +1,330 @@
+# Implements an open addressing hash map with quadratic probing, like hash_map_oa, but stores the
+# table in flat parallel arrays (keys, values, cached hashes, slot states) instead of one
+# HashEntry object per slot.
+
+from array import array
+
+from a6_include import (DynamicArray, GrowthPolicy, HashEntry, hash_function_1, hash_function_2,
+                        resolve_hash_function)
+
+# Slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# Hashes are stored in a signed 64-bit array, so they are reduced to 63 bits
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    # Fraction of the slots tombstones may fill before the table is rebuilt without them
+    _TOMBSTONE_RATIO = GrowthPolicy().tombstone_ratio
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing for collision
+        resolution and keeps the table in parallel flat arrays.
+        function is a hash function or the name of one in a6_include.HASH_FUNCTIONS
+        ('hash_function_1', 'hash_function_2', 'fnv1a', 'siphash', 'builtin').
+        """
+        # capacity must be a prime number
+        self._capacity = self._next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = resolve_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                entry = HashEntry(self._keys[i], self._values[i], self._hashes[i])
+                entry.is_tombstone = self._states[i] == TOMBSTONE
+                out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty ones of the given capacity.
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._states = array('b', bytes(capacity))
+
+    def _next_prime(self, capacity: int) -> int:
+        """
+        Increment from given number to find the closest prime number
+        """
+        if capacity % 2 == 0:
+            capacity += 1
+
+        while not self._is_prime(capacity):
+            capacity += 2
+
+        return capacity
+
+    @staticmethod
+    def _is_prime(capacity: int) -> bool:
+        """
+        Determine if given integer is a prime number and return boolean
+        """
+        if capacity == 2 or capacity == 3:
+            return True
+
+        if capacity == 1 or capacity % 2 == 0:
+            return False
+
+        factor = 3
+        while factor ** 2 <= capacity:
+            if capacity % factor == 0:
+                return False
+            factor += 2
+
+        return True
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash of key, reduced to fit the hash array.
+        """
+        return self._hash_function(key) & _HASH_MASK
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Insert or update the given key with the specified value.
+        If the table load exceeds 0.5 before insertion, the table is resized to twice its current capacity.
+        Slots left behind by removed keys are reused. If the probe sequence
+        reaches no empty slot and no tombstone, the table grows and the put is retried.
+        """
+        if self._size / self._capacity >= 0.5:
+            self.resize_table(self._capacity * 2)
+
+        key_hash = self._hash(key)
+        capacity, keys, hashes, states = self._capacity, self._keys, self._hashes, self._states
+        initial_index = index = key_hash % capacity
+        probe = 0
+        first_tombstone_index = -1
+
+        while True:
+            state = states[index]
+            # The key is absent once an empty slot is reached or the whole probe sequence was walked
+            if state == EMPTY or probe > capacity:
+                # If a tombstone was found earlier, use that slot instead
+                if first_tombstone_index != -1:
+                    index = first_tombstone_index
+                    self._tombstones -= 1
+                elif state != EMPTY:
+                    # Every reachable slot holds a live entry: grow the table and try again
+                    self.resize_table(capacity * 2)
+                    self.put(key, value)
+                    return
+                keys[index] = key
+                self._values[index] = value
+                hashes[index] = key_hash
+                states[index] = LIVE
+                self._size += 1
+                return
+
+            if state == TOMBSTONE:
+                if first_tombstone_index == -1:
+                    first_tombstone_index = index
+            elif hashes[index] == key_hash and keys[index] == key:
+                self._values[index] = value
+                return
+
+            # Quadratic probing
+            probe += 1
+            index = (initial_index + probe * probe) % capacity
+
+    def _find_index(self, key: str) -> int:
+        """
+        Return the slot index holding key, or -1 if the key is not present.
+        """
+        key_hash = self._hash(key)
+        capacity, keys, hashes, states = self._capacity, self._keys, self._hashes, self._states
+        initial_index = index = key_hash % capacity
+        probe = 0
+
+        while probe <= capacity:
+            state = states[index]
+            if state == EMPTY:
+                return -1
+            if state == LIVE and hashes[index] == key_hash and keys[index] == key:
+                return index
+
+            probe += 1
+            index = (initial_index + probe * probe) % capacity
+        return -1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table to a new capacity that is a prime number, moving all live entries
+        using their cached hashes.
+        """
+        if new_capacity < self._size:
+            return
+
+        if not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        # Keep doubling while re-adding the entries would push the load past 0.5
+        while self._size and (self._size - 1) / new_capacity >= 0.5:
+            new_capacity = self._next_prime(new_capacity * 2)
+
+        old_keys, old_values = self._keys, self._values
+        old_hashes, old_states = self._hashes, self._states
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._tombstones = 0
+        keys, values, hashes, states = self._keys, self._values, self._hashes, self._states
+
+        for i in range(len(old_states)):
+            if old_states[i] != LIVE:
+                continue
+            key_hash = old_hashes[i]
+            initial_index = index = key_hash % new_capacity
+            probe = 0
+            while states[index] != EMPTY:
+                probe += 1
+                index = (initial_index + probe * probe) % new_capacity
+            keys[index] = old_keys[i]
+            values[index] = old_values[i]
+            hashes[index] = key_hash
+            states[index] = LIVE
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor of the hash table.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        return self._states.count(EMPTY)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        index = self._find_index(key)
+        return None if index == -1 else self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        return self._find_index(key) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        index = self._find_index(key)
+        if index == -1:
+            return
+
+        # Leave a tombstone and drop the references so key and value can be freed
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+        self._compact_if_needed()
+
+    def _compact_if_needed(self) -> None:
+        """
+        Rebuild the table at its current capacity, dropping all tombstones, once
+        they take up more than the default GrowthPolicy's tombstone_ratio of the slots.
+        """
+        if self._tombstones > self._TOMBSTONE_RATIO * self._capacity:
+            self.resize_table(self._capacity)
+
+    def tombstone_count(self) -> int:
+        """
+        Returns the number of slots holding a tombstone left behind by remove.
+        """
+        return self._tombstones
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of (key, value) for all live entries.
+        """
+        result = DynamicArray()
+        keys, values, states = self._keys, self._values, self._states
+        for i in range(self._capacity):
+            if states[i] == LIVE:
+                result.append((keys[i], values[i]))
+        return result
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs in the hash map without changing the hash table's capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def __iter__(self):
+        """
+        Iterate over the live entries, yielding a HashEntry built for each one.
+        """
+        for i in range(self._capacity):
+            if self._states[i] == LIVE:
+                yield HashEntry(self._keys[i], self._values[i], self._hashes[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('str150'), m.contains_key('str149'))
+
+    print("\nremove example")
+    print("--------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+    print(m.get_keys_and_values())
+
+    print("\nput / remove churn example")
+    print("--------------------------")
+    m = HashMap(11, 'fnv1a')
+    for i in range(1000):
+        m.put('k' + str(i), i)
+        m.remove('k' + str(i))
+    print(m.get_size(), m.get_capacity(), m.tombstone_count())
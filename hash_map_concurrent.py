@@ -0,0 +1,287 @@
+# A thread-safe hash map built from separate chaining segments. Each segment owns a range of
+# the hash space and its own lock (lock striping), so threads working on different segments
+# never wait for each other and a resize only pauses the segment that grows.
+
+import threading
+
+from a6_include import DynamicArray, hash_function_1, hash_function_2, mix_hash
+from hash_map_sc import HashMap
+
+
+class ConcurrentHashMap:
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 segments: int = 16,
+                 **options) -> None:
+        """
+        Initialize new ConcurrentHashMap of separate chaining segments.
+        function is a hash function or the name of one in a6_include.HASH_FUNCTIONS.
+        segments is the number of independently locked segments and is rounded
+        up to a power of two; capacity is split evenly between them.
+        options (incremental, policy, expected_size) are passed on to every
+        segment's HashMap, with expected_size split like capacity.
+        """
+        if segments < 1:
+            raise ValueError("segments must be at least 1")
+        if options.get('flood_guard'):
+            # Every segment must keep the hash function the segment is picked with
+            raise ValueError("flood_guard is not supported; use a keyed function such as 'siphash'")
+        if options.get('stats'):
+            # Segments are driven through their internal methods, which stats would not see in full
+            raise ValueError("stats is not supported by ConcurrentHashMap")
+        count = 1
+        while count < segments:
+            count *= 2
+
+        expected_size = options.pop('expected_size', None)
+        if expected_size is not None:
+            options['expected_size'] = -(-expected_size // count)
+
+        self._segment_mask = count - 1
+        self._segments = [HashMap(-(-capacity // count), function, **options) for _ in range(count)]
+        # RLock, so a compute_if_absent or merge function may use the map again
+        self._locks = [threading.RLock() for _ in range(count)]
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(len(self._segments)):
+            with self._locks[i]:
+                out += 'segment ' + str(i) + ':\n' + str(self._segments[i])
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map. Segments are counted one after another, so the result
+        may miss concurrent changes to segments already counted.
+        """
+        return sum(segment.get_size() for segment in self._segments)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the total of all segment capacities
+        """
+        return sum(segment.get_capacity() for segment in self._segments)
+
+    def get_segment_count(self) -> int:
+        """
+        Return the number of segments
+        """
+        return len(self._segments)
+
+    # ------------------------------------------------------------------ #
+
+    def _locate(self, key: str) -> tuple:
+        """
+        Return (segment index, key hash) for key. The hash is computed once and
+        used both to pick the segment and inside the segment.
+        """
+        # Every segment shares the hash function and policy, so any one can hash
+        key_hash = self._segments[0]._hash(key)
+        return mix_hash(key_hash) & self._segment_mask, key_hash
+
+    @staticmethod
+    def _put_hashed(segment: HashMap, key: str, value: object, key_hash: int) -> None:
+        """
+        Add or update key in segment using an already computed hash, growing
+        the segment first if needed. The caller holds the segment's lock.
+        """
+        if segment.table_load() >= segment._max_load:
+            segment._resize(segment._policy.grow(segment._capacity))
+        segment._rehash_step()
+        segment._put_hashed(key, value, key_hash)
+
+    @staticmethod
+    def _find_node(segment: HashMap, key: str, key_hash: int):
+        """
+        Return the node holding key in segment, or None. The caller holds the segment's lock.
+        """
+        segment._rehash_step()
+        return segment._find_node(key, key_hash)
+
+    @staticmethod
+    def _remove_hashed(segment: HashMap, key: str, key_hash: int) -> None:
+        """
+        Remove key from segment using an already computed hash. The caller holds the segment's lock.
+        """
+        segment._rehash_step()
+        if segment._remove_hashed(key, key_hash):
+            segment._shrink_if_sparse()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds a new key-value pair to the hash map, updating the value if the key already exists.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            self._put_hashed(self._segments[index], key, value, key_hash)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            node = self._find_node(self._segments[index], key, key_hash)
+            return node.value if node else None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        A key stored with the value None counts as absent, as in the chaining HashMap.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            node = self._find_node(self._segments[index], key, key_hash)
+            return node is not None and node.value is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            self._remove_hashed(self._segments[index], key, key_hash)
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Atomically add key with value unless it is already in the hash map.
+        Return the existing value, or None if value was added.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            segment = self._segments[index]
+            node = self._find_node(segment, key, key_hash)
+            if node:
+                return node.value
+            self._put_hashed(segment, key, value, key_hash)
+            return None
+
+    def compute_if_absent(self, key: str, function: callable) -> object:
+        """
+        Atomically return the value of key, adding function(key) first if the
+        key is not in the hash map. function is called at most once per missing
+        key, while the key's segment is locked, so it should be quick. If it
+        returns None nothing is added.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            segment = self._segments[index]
+            node = self._find_node(segment, key, key_hash)
+            if node:
+                return node.value
+            value = function(key)
+            if value is not None:
+                self._put_hashed(segment, key, value, key_hash)
+            return value
+
+    def merge(self, key: str, value: object, function: callable) -> object:
+        """
+        Atomically add key with value if it is not in the hash map, otherwise
+        replace its value with function(old value, value). If function returns
+        None the key is removed. Return the new value. function runs while the
+        key's segment is locked.
+        """
+        index, key_hash = self._locate(key)
+        with self._locks[index]:
+            segment = self._segments[index]
+            node = self._find_node(segment, key, key_hash)
+            if node is None:
+                self._put_hashed(segment, key, value, key_hash)
+                return value
+            new_value = function(node.value, value)
+            if new_value is None:
+                self._remove_hashed(segment, key, key_hash)
+            else:
+                node.value = new_value
+            return new_value
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor over all segments.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets over all segments.
+        """
+        empty = 0
+        for segment, lock in zip(self._segments, self._locks):
+            with lock:
+                empty += segment.empty_buckets()
+        return empty
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of (key, value) tuples. Each segment is copied
+        under its own lock, so the result is consistent per segment but may
+        mix states of different segments.
+        """
+        result = DynamicArray()
+        for segment, lock in zip(self._segments, self._locks):
+            with lock:
+                pairs = [(node.key, node.value) for node in segment._nodes()]
+            for pair in pairs:
+                result.append(pair)
+        return result
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs, one segment at a time.
+        """
+        for segment, lock in zip(self._segments, self._locks):
+            with lock:
+                segment.clear()
+
+    def __iter__(self):
+        """
+        Iterate over (key, value) tuples. Every iteration has its own cursor and
+        works on a per-segment copy, so the map may be changed while it runs.
+        """
+        for segment, lock in zip(self._segments, self._locks):
+            with lock:
+                pairs = [(node.key, node.value) for node in segment._nodes()]
+            yield from pairs
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = ConcurrentHashMap(53, hash_function_1, segments=4)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('str150'), m.contains_key('str149'))
+
+    print("\natomic operations example")
+    print("-------------------------")
+    m = ConcurrentHashMap(11, hash_function_2, segments=2)
+    print(m.put_if_absent('a', 1), m.put_if_absent('a', 2), m.get('a'))
+    print(m.compute_if_absent('b', len), m.compute_if_absent('b', lambda key: 99))
+    print(m.merge('c', 1, lambda old, new: old + new), m.merge('c', 1, lambda old, new: old + new))
+    print(m.merge('c', 0, lambda old, new: None), m.contains_key('c'))
+    print(sorted(m))
+
+    print("\nthreads example")
+    print("---------------")
+    m = ConcurrentHashMap(function='fnv1a')
+
+    def count_words(offset: int) -> None:
+        for i in range(1000):
+            m.merge('word' + str((i + offset) % 50), 1, lambda old, new: old + new)
+
+    threads = [threading.Thread(target=count_words, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), sum(value for _, value in m))
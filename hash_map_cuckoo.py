@@ -0,0 +1,432 @@
+# Implements a bucketized cuckoo hash map: two tables of 4-slot buckets, where every key lives in
+# one of exactly two buckets (one per table) or in a small stash. A lookup examines at most
+# 2 * 4 slots plus the stash, so get, contains_key and remove are O(1) in the worst case. Inserts
+# displace ("kick") entries to their other bucket when both candidates are full.
+
+import os
+import random
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, hash_function_1, hash_function_2, mix_hash,
+                        next_power_of_two, resolve_hash_function)
+
+# Slots per bucket
+BUCKET_SIZE = 4
+
+# Entries that found no slot after a full displacement walk; lookups scan all of them
+STASH_SIZE = 4
+
+# Hashes are stored in signed 64-bit arrays, so they are reduced to 63 bits
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    # The tables grow once 90% of the slots are used; 4-slot buckets stay insertable well past that
+    _MAX_LOAD = 0.9
+
+    # Displacements tried before an entry goes to the stash
+    _MAX_KICKS = 100
+
+    # Reseeded rebuilds tried at one capacity before the capacity is doubled
+    _REBUILD_ATTEMPTS = 3
+
+    def __init__(self, capacity: int, function, alternate_function='builtin') -> None:
+        """
+        Initialize new HashMap with two tables of 4-slot buckets.
+        function picks the bucket in the first table and alternate_function the
+        bucket in the second; each is a hash function or the name of one in
+        a6_include.HASH_FUNCTIONS ('hash_function_1', 'hash_function_2', 'fnv1a',
+        'siphash', 'builtin'). The second hash is mixed with a random seed, which
+        is replaced when the table has to be rebuilt, so keys that collide under
+        function are still spread over the second table.
+        capacity is the total slot count, rounded up to two tables of a
+        power-of-two number of buckets.
+        """
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = resolve_hash_function(function)
+        self._alternate_function = resolve_hash_function(alternate_function)
+        self._seed = self._new_seed()
+        self._stash = []
+        self._size = 0
+        # Picks the slot an insert displaces, so no fixed order of kicks can cycle
+        self._random = random.Random(self._new_seed())
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._used[i]:
+                out += str(i) + ': ' + str(HashEntry(self._keys[i], self._values[i], self._hashes[i])) + '\n'
+            else:
+                out += str(i) + ': None\n'
+        for key, value, key_hash, _ in self._stash:
+            out += 'stash: ' + str(HashEntry(key, value, key_hash)) + '\n'
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Return the slot count for capacity: two tables of a power-of-two number of buckets.
+        """
+        return next_power_of_two(max(1, -(-capacity // (2 * BUCKET_SIZE)))) * 2 * BUCKET_SIZE
+
+    @staticmethod
+    def _new_seed() -> int:
+        """
+        Return a random 64-bit seed for the second table's hash.
+        """
+        return int.from_bytes(os.urandom(8), 'little')
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty ones of the given capacity. Slots
+        [0, capacity / 2) are the first table and the rest the second.
+        """
+        self._used = bytearray(capacity)
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._alternate_hashes = array('q', bytes(8 * capacity))
+        self._bucket_mask = capacity // (2 * BUCKET_SIZE) - 1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the mixed hash of key for the first table.
+        """
+        return mix_hash(self._hash_function(key)) & _HASH_MASK
+
+    def _alternate_hash(self, key: str) -> int:
+        """
+        Return the unseeded hash of key for the second table. It is stored with
+        the entry, so reseeding does not call alternate_function again.
+        """
+        return self._alternate_function(key) & _HASH_MASK
+
+    def _first_bucket(self, key_hash: int) -> int:
+        """
+        Return the index of the first slot of key_hash's bucket in the first table.
+        """
+        return (key_hash & self._bucket_mask) * BUCKET_SIZE
+
+    def _second_bucket(self, alternate_hash: int) -> int:
+        """
+        Return the index of the first slot of alternate_hash's bucket in the second table.
+        """
+        bucket = mix_hash(alternate_hash ^ self._seed) & self._bucket_mask
+        return self._capacity // 2 + bucket * BUCKET_SIZE
+
+    def _find_in_bucket(self, start: int, key: str, key_hash: int) -> int:
+        """
+        Return the slot index of key in the bucket starting at start, or -1.
+        """
+        used, hashes, keys = self._used, self._hashes, self._keys
+        for index in range(start, start + BUCKET_SIZE):
+            if used[index] and hashes[index] == key_hash and keys[index] == key:
+                return index
+        return -1
+
+    def _find_index(self, key: str, key_hash: int) -> int:
+        """
+        Return the slot index holding key, -2 if it is in the stash, or -1 if
+        it is not present. The second hash is computed only when the key is
+        not in its first-table bucket.
+        """
+        index = self._find_in_bucket(self._first_bucket(key_hash), key, key_hash)
+        if index != -1:
+            return index
+        index = self._find_in_bucket(self._second_bucket(self._alternate_hash(key)), key, key_hash)
+        if index != -1:
+            return index
+        for entry in self._stash:
+            if entry[2] == key_hash and entry[0] == key:
+                return -2
+        return -1
+
+    def _probe_length(self, key: str) -> int:
+        """
+        Return the number of slots a lookup of key examines, counting stash entries.
+        """
+        key_hash = self._hash(key)
+        if self._find_in_bucket(self._first_bucket(key_hash), key, key_hash) != -1:
+            return BUCKET_SIZE
+        if self._find_in_bucket(self._second_bucket(self._alternate_hash(key)), key, key_hash) != -1:
+            return 2 * BUCKET_SIZE
+        return 2 * BUCKET_SIZE + len(self._stash)
+
+    def _stash_index(self, key: str, key_hash: int) -> int:
+        """
+        Return the position of key in the stash.
+        """
+        for position, entry in enumerate(self._stash):
+            if entry[2] == key_hash and entry[0] == key:
+                return position
+        return -1
+
+    def _free_slot(self, start: int) -> int:
+        """
+        Return the first unused slot of the bucket starting at start, or -1 if it is full.
+        """
+        return self._used.find(0, start, start + BUCKET_SIZE)
+
+    def _store(self, index: int, key: str, value: object, key_hash: int, alternate_hash: int) -> None:
+        """
+        Write an entry into slot index.
+        """
+        self._used[index] = 1
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = key_hash
+        self._alternate_hashes[index] = alternate_hash
+
+    def _load(self, index: int) -> tuple:
+        """
+        Return the entry in slot index as (key, value, hash, alternate hash).
+        """
+        return self._keys[index], self._values[index], self._hashes[index], self._alternate_hashes[index]
+
+    def _place(self, key: str, value: object, key_hash: int, alternate_hash: int) -> bool:
+        """
+        Insert an entry that is not in the map. If both of its buckets are full,
+        randomly chosen entries are displaced to their other bucket, up to _MAX_KICKS times; an
+        entry left without a slot goes to the stash. If the stash is full too,
+        the displacements are undone and False is returned.
+        """
+        entry = (key, value, key_hash, alternate_hash)
+        start = self._first_bucket(key_hash)
+        for bucket in (start, self._second_bucket(alternate_hash)):
+            index = self._free_slot(bucket)
+            if index != -1:
+                self._store(index, *entry)
+                return True
+
+        # Random walk: swap the homeless entry into a random slot of the bucket it
+        # was refused by, then try the displaced entry's other bucket
+        half = self._capacity // 2
+        path = []
+        for _ in range(self._MAX_KICKS):
+            index = start + self._random.randrange(BUCKET_SIZE)
+            displaced = self._load(index)
+            self._store(index, *entry)
+            path.append(index)
+            entry = displaced
+
+            start = self._second_bucket(entry[3]) if index < half else self._first_bucket(entry[2])
+            free = self._free_slot(start)
+            if free != -1:
+                self._store(free, *entry)
+                return True
+
+        if len(self._stash) < STASH_SIZE:
+            self._stash.append(entry)
+            return True
+
+        for index in reversed(path):
+            displaced = self._load(index)
+            self._store(index, *entry)
+            entry = displaced
+        return False
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Insert or update the given key with the specified value.
+        The tables are doubled once 90% of the slots are used. If an insert
+        still finds no slot and the stash is full, the tables are rebuilt with
+        a new seed for the second hash, and doubled if that fails as well.
+        """
+        key_hash = self._hash(key)
+        index = self._find_index(key, key_hash)
+        if index >= 0:
+            self._values[index] = value
+            return
+        if index == -2:
+            position = self._stash_index(key, key_hash)
+            entry = self._stash[position]
+            self._stash[position] = (key, value, entry[2], entry[3])
+            return
+
+        if self._size + 1 > self._MAX_LOAD * self._capacity:
+            self.resize_table(self._capacity * 2)
+
+        alternate_hash = self._alternate_hash(key)
+        if not self._place(key, value, key_hash, alternate_hash):
+            self._rebuild(self._capacity, [(key, value, key_hash, alternate_hash)])
+        self._size += 1
+
+    def _entries(self) -> list:
+        """
+        Return every entry, from the tables and the stash, as (key, value, hash, alternate hash).
+        """
+        used, keys, values = self._used, self._keys, self._values
+        hashes, alternate_hashes = self._hashes, self._alternate_hashes
+        entries = [(keys[i], values[i], hashes[i], alternate_hashes[i])
+                   for i in range(self._capacity) if used[i]]
+        entries.extend(self._stash)
+        return entries
+
+    def _rebuild(self, capacity: int, extra: list) -> None:
+        """
+        Reinsert every entry, plus the entries in extra, into empty tables of
+        the given capacity. Each failed attempt draws a new seed, and every
+        _REBUILD_ATTEMPTS failures double the capacity. Raises ValueError, with
+        the map unchanged, if the entries cannot be placed at 64 times their
+        count; that only happens when more than 2 * BUCKET_SIZE + STASH_SIZE
+        keys share both their hashes.
+        """
+        entries = self._entries() + extra
+        saved = (self._capacity, self._used, self._keys, self._values, self._hashes,
+                 self._alternate_hashes, self._bucket_mask, self._seed, self._stash)
+        limit = 64 * max(len(entries), 2 * BUCKET_SIZE)
+        attempts = 0
+
+        while True:
+            self._capacity = capacity
+            self._allocate(capacity)
+            self._stash = []
+            if all(self._place(*entry) for entry in entries):
+                return
+
+            attempts += 1
+            self._seed = self._new_seed()
+            if attempts % self._REBUILD_ATTEMPTS == 0:
+                capacity *= 2
+            if capacity > limit:
+                (self._capacity, self._used, self._keys, self._values, self._hashes,
+                 self._alternate_hashes, self._bucket_mask, self._seed, self._stash) = saved
+                raise ValueError("Cannot place keys that share both their hashes; "
+                                 "use a different alternate_function")
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rebuild the tables with new_capacity slots (rounded up to two tables of
+        a power-of-two number of buckets, and grown until the entries fit below
+        the maximum load), placing every entry by its cached hashes. Stashed
+        entries are moved back into the tables when they fit.
+        """
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size > self._MAX_LOAD * new_capacity:
+            new_capacity *= 2
+        self._rebuild(new_capacity, [])
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor of the hash table.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty slots in the two tables.
+        """
+        return self._used.count(0)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        key_hash = self._hash(key)
+        index = self._find_index(key, key_hash)
+        if index >= 0:
+            return self._values[index]
+        if index == -2:
+            return self._stash[self._stash_index(key, key_hash)][1]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        return self._find_index(key, self._hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing. A slot freed in the
+        tables is offered to the stashed entries.
+        """
+        key_hash = self._hash(key)
+        index = self._find_index(key, key_hash)
+        if index == -1:
+            return
+
+        if index == -2:
+            del self._stash[self._stash_index(key, key_hash)]
+        else:
+            self._used[index] = 0
+            self._keys[index] = None
+            self._values[index] = None
+            bucket = index - index % BUCKET_SIZE
+            for position, entry in enumerate(self._stash):
+                if bucket in (self._first_bucket(entry[2]), self._second_bucket(entry[3])):
+                    self._store(index, *entry)
+                    del self._stash[position]
+                    break
+        self._size -= 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of (key, value) for all entries.
+        """
+        result = DynamicArray()
+        for key, value, _, _ in self._entries():
+            result.append((key, value))
+        return result
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs in the hash map without changing the hash table's capacity.
+        """
+        self._allocate(self._capacity)
+        self._stash = []
+        self._size = 0
+
+    def __iter__(self):
+        """
+        Iterate over the entries, yielding a HashEntry built for each one.
+        """
+        for key, value, key_hash, _ in self._entries():
+            yield HashEntry(key, value, key_hash)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('str150'), m.contains_key('str149'))
+
+    print("\nremove example")
+    print("--------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    for item in sorted(m, key=lambda entry: entry.key):
+        print('K:', item.key, 'V:', item.value)
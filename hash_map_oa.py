@@ -1,26 +1,98 @@
 # Implements an open addressing hash map with quadratic probing for collision resolution. Supports dynamic
 # resizing to maintain efficient operations as the map grows.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
-                        hash_function_1, hash_function_2)
+from time import perf_counter
+
+from a6_include import (DynamicArray, DynamicArrayException, GrowthPolicy, HashEntry, MapStats,
+                        PackedTable, SipHash, hash_function_1, hash_function_2, load_packed, mix_hash,
+                        next_power_of_two, resolve_hash_function, save_packed)
+
+# Marks an old-table slot whose entry was moved by an incremental resize. It is a
+# tombstone so probe sequences running through the slot are not cut short.
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # Number of old-table buckets moved per operation during an incremental resize
+    _REHASH_STEP = 8
+
+    # Load factor that triggers growth for each probing mode
+    _MAX_LOAD = {'quadratic': 0.5, 'robin_hood': 0.9}
+
+    # Insert probe count that flood_guard treats as an attack, for each probing mode.
+    # Several times the longest probe seen with a uniform hash at the maximum load.
+    _FLOOD_PROBES = {'quadratic': 48, 'robin_hood': 128}
+
+    def __init__(self, capacity: int, function, incremental: bool = False,
+                 probing: str = 'quadratic', policy: GrowthPolicy = None,
+                 expected_size: int = None, stats: bool = False,
+                 flood_guard: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        function is a hash function or the name of one in a6_include.HASH_FUNCTIONS
+        ('hash_function_1', 'hash_function_2', 'fnv1a', 'siphash', 'builtin').
+        If incremental is True, growing the table moves the entries a few buckets
+        at a time on each put/get/remove instead of all at once.
+        probing='robin_hood' switches to linear probing with Robin Hood reordering
+        and backward-shift deletion, which leaves no tombstones and runs at a
+        maximum load of 0.9 instead of 0.5.
+        policy is a GrowthPolicy setting the load factors at which the table grows
+        and shrinks, the growth factor and prime or power-of-two capacities. On
+        power-of-two capacities quadratic probing uses triangular numbers, so
+        every slot is reachable.
+        expected_size raises the capacity so that this many entries fit without
+        a resize; capacity itself is a bucket count.
+        stats=True records the probe count of every get/put/remove/contains_key,
+        including those made by the batch methods, and the number and duration
+        of resizes; see stats().
+        flood_guard=True defends against keys crafted to collide: once an insert
+        probes more than _FLOOD_PROBES slots, the map switches to SipHash with a
+        random seed and rehashes every key.
         """
-        self._buckets = DynamicArray()
+        if probing not in self._MAX_LOAD:
+            raise ValueError(f"Unknown probing mode {probing!r}, "
+                             f"expected one of {', '.join(self._MAX_LOAD)}")
+        self._policy = policy or GrowthPolicy()
+        self._max_load = self._policy.resolve_max_load(self._MAX_LOAD[probing])
+        self._robin_hood = probing == 'robin_hood'
+        self._power_of_two = self._policy.sizing == 'power_of_two'
+        if self._max_load >= 1.0:
+            raise ValueError("max_load must be below 1.0 for open addressing")
+        if not (self._robin_hood or self._power_of_two) and self._max_load > 0.5:
+            raise ValueError("quadratic probing over a prime capacity only reaches half of the "
+                             "slots, so max_load must be at most 0.5")
+
+        if expected_size is not None:
+            capacity = max(capacity, self._capacity_for(expected_size))
+
+        # capacity must be a prime number (or a power of two)
+        if self._power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+        self._buckets = DynamicArray([None] * self._capacity)
+
+        self._hash_function = resolve_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # remove never shrinks the table below its initial capacity
+        self._min_capacity = self._capacity
 
-        self._hash_function = function
-        self._size = 0
+        # Old table and migration cursor while an incremental resize is in progress
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+
+        self._flood_limit = self._FLOOD_PROBES[probing] if flood_guard else None
+        self._flood_rehashes = 0
+
+        # Slots examined by the last lookup, which stats records
+        self._probes = 0
+        self._stats = MapStats(self.stats) if stats else None
 
     def __str__(self) -> str:
         """
@@ -81,18 +153,58 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash cached on the entry for key. On power-of-two capacities the
+        hash function's result is passed through a mixing finalizer, because only
+        its low bits are used to pick the bucket.
+        """
+        if self._power_of_two:
+            return mix_hash(self._hash_function(key))
+        return self._hash_function(key)
+
+    def _home(self, key_hash: int, capacity: int) -> int:
+        """
+        Return the home bucket of a hash: a bit mask on power-of-two capacities,
+        the remainder modulo the (prime) capacity otherwise.
+        """
+        if self._power_of_two:
+            return key_hash & (capacity - 1)
+        return key_hash % capacity
+
     def put(self, key: str, value: object) -> None:
         """
         Insert or update the given key with the specified value in the hash map using quadratic probing.
         If the table load exceeds 0.5 before insertion, the table is resized to twice its current capacity.
         This method handles collisions using quadratic probing and reuses empty slots marked by tombstones.
+        In Robin Hood mode the table grows at a load of 0.9 instead.
         """
-        # If the load factor is too high, double the table capacity to maintain efficient operations
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        # If the load factor is too high, grow the table (doubling by default) to maintain efficient operations
+        if self.table_load() >= self._max_load:
+            self._resize(self._policy.grow(self._capacity))
+
+        self._rehash_step()
+        self._put_hashed(key, value, self._hash(key))
+
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Insert or update the given key using an already computed hash.
+        """
+        # While a resize is in progress, a key that is still in the old table is updated there
+        if self._old_buckets is not None:
+            index = self._find_old_index(key, key_hash)
+            if index != -1:
+                self._old_buckets[index].value = value
+                if self._stats is not None:
+                    self._stats.record('put', self._probes)
+                return
 
-        # Calculate the bucket index for the key using the hash function and modulus with current capacity
-        index = self._hash_function(key) % self._capacity
+        if self._robin_hood:
+            self._robin_hood_put(key, value, key_hash)
+            return
+
+        # Calculate the bucket index for the key using its hash and modulus with current capacity
+        index = self._home(key_hash, self._capacity)
         initial_index = index
         probe = 0
 
@@ -101,62 +213,366 @@ class HashMap:
         while True:
             current_entry = self._buckets.get_at_index(index)
 
-            if current_entry is None:
+            # The key is absent once an empty slot is reached or the whole probe sequence was walked
+            if current_entry is None or probe > self._capacity:
                 # If a tombstone was found earlier, use that slot instead
                 if first_tombstone_index is not None:
                     index = first_tombstone_index
-                self._buckets.set_at_index(index, HashEntry(key, value))
+                    self._tombstones -= 1
+                elif current_entry is not None:
+                    # Every reachable slot holds a live entry: grow the table and try again
+                    self.resize_table(self._policy.grow(self._capacity))
+                    self._put_hashed(key, value, key_hash)
+                    return
+                self._buckets.set_at_index(index, HashEntry(key, value, key_hash))
                 self._size += 1
+                if self._stats is not None:
+                    self._stats.record('put', min(probe + 1, self._capacity))
+                if self._flood_limit is not None and probe > self._flood_limit:
+                    self._defend_flood()
                 return
 
             elif current_entry.is_tombstone:
                 if first_tombstone_index is None:
                     first_tombstone_index = index
 
-            elif current_entry.key == key:
+            # Compare the cached hashes first so long keys are only compared on a likely match
+            elif current_entry.key_hash == key_hash and current_entry.key == key:
                 # Update existing entry
-                if current_entry.is_tombstone:
-                    self._size += 1  # Correcting the size if we're reviving a tombstone
                 current_entry.value = value
-                current_entry.is_tombstone = False  # Ensure this is marked as active
+                if self._stats is not None:
+                    self._stats.record('put', probe + 1)
                 return
 
             # Quadratic probing
             probe += 1
-            index = (initial_index + probe ** 2) % self._capacity
+            index = (initial_index + self._probe_offset(probe)) % self._capacity
+
+    def _probe_offset(self, probe: int) -> int:
+        """
+        Return the offset from the home bucket of the given quadratic probe: the
+        probe squared, or the triangular number probe * (probe + 1) / 2 on
+        power-of-two capacities, where squares would miss most slots.
+        """
+        if self._power_of_two:
+            return (probe * (probe + 1)) >> 1
+        return probe ** 2
+
+    def _robin_hood_put(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Insert or update the given key with linear probing, taking the slot of any
+        resident entry that is closer to its home bucket than the new entry is.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        index = self._home(key_hash, capacity)
+        distance = 0
+
+        while True:
+            current_entry = buckets[index]
+
+            if current_entry is None:
+                buckets[index] = HashEntry(key, value, key_hash)
+                self._size += 1
+                break
+
+            if current_entry.key_hash == key_hash and current_entry.key == key:
+                current_entry.value = value
+                if self._stats is not None:
+                    self._stats.record('put', distance + 1)
+                return
+
+            # A richer resident means the key is absent: the new entry takes its slot
+            # and the resident is pushed further along
+            if (index - self._home(current_entry.key_hash, capacity)) % capacity < distance:
+                buckets[index] = HashEntry(key, value, key_hash)
+                self._size += 1
+                self._robin_hood_place(buckets, capacity, current_entry, (index + 1) % capacity)
+                break
+
+            index = (index + 1) % capacity
+            distance += 1
+
+        if self._stats is not None:
+            self._stats.record('put', distance + 1)
+        if self._flood_limit is not None and distance > self._flood_limit:
+            self._defend_flood()
+
+    def _defend_flood(self) -> None:
+        """
+        Respond to an over-long probe sequence: switch to SipHash with a new
+        random seed, which keys crafted against the current hash function cannot
+        anticipate, and place every entry under its new hash in a fresh table of
+        the current capacity. A map already on SipHash keeps its function, since
+        its probe sequences can only be long by chance.
+        """
+        if isinstance(self._hash_function, SipHash):
+            return
+        self._finish_migration()
+        entries = list(self._entries())
+
+        self._hash_function = SipHash()
+        self._flood_rehashes += 1
+        buckets = DynamicArray([None] * self._capacity)
+        for entry in entries:
+            entry.key_hash = self._hash(entry.key)
+            self._move_entry(buckets, self._capacity, entry)
+        self._buckets = buckets
+        self._tombstones = 0
+
+    def _robin_hood_place(self, buckets: DynamicArray, capacity: int, entry: HashEntry, index: int = None) -> None:
+        """
+        Place an entry whose key is known to be absent into a Robin Hood table,
+        starting at index (its home bucket by default) and displacing residents
+        that are closer to home.
+        """
+        if index is None:
+            index = self._home(entry.key_hash, capacity)
+        distance = (index - self._home(entry.key_hash, capacity)) % capacity
+
+        while True:
+            current_entry = buckets[index]
+            if current_entry is None:
+                buckets[index] = entry
+                return
+
+            current_distance = (index - self._home(current_entry.key_hash, capacity)) % capacity
+            if current_distance < distance:
+                buckets[index] = entry
+                entry, distance = current_entry, current_distance
+
+            index = (index + 1) % capacity
+            distance += 1
+
+    def _find_index(self, buckets: DynamicArray, capacity: int, key: str, key_hash: int) -> int:
+        """
+        Return the index of the live entry for key in the given bucket array,
+        or -1 if the key is not present. The number of slots examined is left
+        in self._probes.
+        """
+        index = self._home(key_hash, capacity)
+        probe = 0
+
+        while True:
+            # Calculate the index with quadratic probing
+            current_index = (index + self._probe_offset(probe)) % capacity
+            current_entry = buckets[current_index]
+
+            # If the slot is empty, the key is not present
+            if current_entry is None:
+                self._probes = probe + 1
+                return -1
+
+            # If the slot is not a tombstone and the hashes and keys match, the key is present
+            if (not current_entry.is_tombstone and current_entry.key_hash == key_hash
+                    and current_entry.key == key):
+                self._probes = probe + 1
+                return current_index
+
+            # Update the probe number and continue
+            probe += 1
+
+            # If we've looped back to the start, the key is not in the hash table
+            if probe > capacity:
+                self._probes = capacity
+                return -1
+
+    def _robin_hood_find_index(self, buckets: DynamicArray, capacity: int, key: str, key_hash: int,
+                               early_exit: bool = True) -> int:
+        """
+        Return the index of the live entry for key in a linearly probed bucket array,
+        or -1 if the key is not present. With early_exit the search stops at the first
+        resident closer to its home than the key would be, which proves the key is absent.
+        The number of slots examined is left in self._probes.
+        """
+        index = self._home(key_hash, capacity)
+
+        for distance in range(capacity):
+            current_entry = buckets[index]
+
+            if current_entry is None:
+                self._probes = distance + 1
+                return -1
+
+            if not current_entry.is_tombstone:
+                if current_entry.key_hash == key_hash and current_entry.key == key:
+                    self._probes = distance + 1
+                    return index
+                if early_exit and (index - self._home(current_entry.key_hash, capacity)) % capacity < distance:
+                    self._probes = distance + 1
+                    return -1
+
+            index = (index + 1) % capacity
+        self._probes = capacity
+        return -1
+
+    def _find_old_index(self, key: str, key_hash: int) -> int:
+        """
+        Return the index of the live entry for key in the old table of an
+        incremental resize, or -1 if it is not there.
+        """
+        if self._robin_hood:
+            # Migrated slots are tombstones, which break the Robin Hood ordering,
+            # so the old table is searched without early exit
+            return self._robin_hood_find_index(self._old_buckets, self._old_capacity,
+                                               key, key_hash, early_exit=False)
+        return self._find_index(self._old_buckets, self._old_capacity, key, key_hash)
+
+    def _find_new_index(self, key: str, key_hash: int) -> int:
+        """
+        Return the index of the live entry for key in the current table, or -1.
+        """
+        if self._robin_hood:
+            return self._robin_hood_find_index(self._buckets, self._capacity, key, key_hash)
+        return self._find_index(self._buckets, self._capacity, key, key_hash)
+
+    def _lookup(self, key: str, key_hash: int) -> tuple:
+        """
+        Return (bucket array, index) of the live entry for key, checking the old
+        table of an incremental resize as well, or (None, -1) if it is absent.
+        self._probes is left holding the slots examined in both tables.
+        """
+        index = self._find_new_index(key, key_hash)
+        if index != -1:
+            return self._buckets, index
+
+        # Keys not moved yet by an incremental resize are still in the old table
+        if self._old_buckets is not None:
+            probes = self._probes
+            index = self._find_old_index(key, key_hash)
+            self._probes += probes
+            if index != -1:
+                return self._old_buckets, index
+
+        return None, -1
+
+    def _place_entry(self, buckets: DynamicArray, capacity: int, entry: HashEntry) -> None:
+        """
+        Place an entry whose key is known to be absent into the first empty slot
+        of its probe sequence, using the hash cached on the entry.
+        """
+        index = self._home(entry.key_hash, capacity)
+        probe = 0
+        current_index = index
+        while buckets[current_index] is not None:
+            probe += 1
+            current_index = (index + self._probe_offset(probe)) % capacity
+        buckets[current_index] = entry
+
+    def _move_entry(self, buckets: DynamicArray, capacity: int, entry: HashEntry) -> None:
+        """
+        Place a live entry into a freshly allocated table during a resize.
+        """
+        if self._robin_hood:
+            self._robin_hood_place(buckets, capacity, entry)
+        else:
+            self._place_entry(buckets, capacity, entry)
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round capacity up to the next prime, or power of two, as the policy requires.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+        return capacity
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Return the capacity the table ends up with when all entries are re-added
+        to a table of new_capacity: it keeps growing while the load would reach
+        the maximum, exactly as if the entries were put one by one.
+        """
+        new_capacity = self._round_capacity(new_capacity)
+
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity = self._round_capacity(self._policy.grow(new_capacity))
+
+        return new_capacity
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Grow or shrink the table, incrementally if the map was created with incremental=True.
+        """
+        if self._incremental:
+            self._begin_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
 
     def resize_table(self, new_capacity: int) -> None:
         """
-        Resizes the hash table to a new capacity that is a prime number, rehashing all existing non-tombstone entries.
+        Resizes the hash table to a new capacity that is a prime number, moving all existing non-tombstone
+        entries. Entries keep their cached hash, so the hash function is never called again.
         """
-        # Verify the new capacity is greater than the current size and is a prime number
+        # Verify the new capacity is greater than the current size
         if new_capacity < self._size:
             return
+        start = perf_counter()
 
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        # An explicit resize completes any incremental resize first
+        self._finish_migration()
 
-        # Create a new dynamic array with the new capacity
-        new_buckets = DynamicArray()
-        for _ in range(new_capacity):
-            new_buckets.append(None)
+        new_capacity = self._fit_capacity(new_capacity)
+        new_buckets = DynamicArray([None] * new_capacity)
+
+        # Move all entries that are not tombstones
+        for i in range(self._capacity):
+            entry = self._buckets.get_at_index(i)
+            if entry and not entry.is_tombstone:
+                self._move_entry(new_buckets, new_capacity, entry)
 
-        # Temporary save old buckets and reset size to re-add entries accurately
-        old_buckets = self._buckets
-        old_size = self._size
         self._buckets = new_buckets
         self._capacity = new_capacity
-        self._size = 0  # Reset size to accurately count when re-adding items
+        self._tombstones = 0
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
 
-        # Rehash all items that are not tombstones
-        for i in range(old_buckets.length()):
-            entry = old_buckets.get_at_index(i)
-            if entry and not entry.is_tombstone:
-                self.put(entry.key, entry.value)
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Start an incremental resize: allocate the new table and keep the current
+        one as the old table, which is drained by _rehash_step.
+        """
+        start = perf_counter()
+        self._finish_migration()
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._capacity = self._fit_capacity(new_capacity)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._tombstones = 0
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
+
+    def _rehash_step(self, steps: int = None) -> None:
+        """
+        Move the live entries of the next few old-table buckets into the new table.
+        Does nothing unless an incremental resize is in progress.
+        """
+        if self._old_buckets is None:
+            return
 
-        # Debug check to confirm size matches expected after resizing
-        if self._size != old_size:
-            print(f"Error: Expected size {old_size}, but got {self._size}")
+        old_buckets = self._old_buckets
+        stop = min(self._old_capacity, self._migrate_index + (steps or self._REHASH_STEP))
+
+        for i in range(self._migrate_index, stop):
+            entry = old_buckets[i]
+            if entry is not None and not entry.is_tombstone:
+                self._move_entry(self._buckets, self._capacity, entry)
+                old_buckets[i] = _MIGRATED
+
+        self._migrate_index = stop
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_migration(self) -> None:
+        """
+        Move everything left in the old table, completing an incremental resize.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
 
     def table_load(self) -> float:
         """
@@ -178,87 +594,187 @@ class HashMap:
         """
         Returns the value associated with the given key, or None if the key is not found.
         """
-        index = self._hash_function(key) % self._capacity
-        probe = 0
+        self._rehash_step()
+        buckets, index = self._lookup(key, self._hash(key))
+        if self._stats is not None:
+            self._stats.record('get', self._probes)
+        if index == -1:
+            return None
+        return buckets[index].value
 
-        while True:
-            # Calculate the index with quadratic probing
-            current_index = (index + probe ** 2) % self._capacity
-            current_entry = self._buckets[current_index]
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        index = self._lookup(key, self._hash(key))[1]
+        if self._stats is not None:
+            self._stats.record('contains_key', self._probes)
+        return index != -1
 
-            # If the slot is empty, the key is not present
-            if current_entry is None:
-                return None
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        self._rehash_step()
+        if self._remove_hashed(key, self._hash(key)):
+            self._shrink_if_sparse()
+            self._compact_if_needed()
 
-            # If the slot is not a tombstone and the keys match, return the value
-            if not current_entry.is_tombstone and current_entry.key == key:
-                return current_entry.value
+    def _remove_hashed(self, key: str, key_hash: int) -> bool:
+        """
+        Remove the given key using an already computed hash, without shrinking
+        or compacting the table. Return True if the key was found.
+        """
+        buckets, index = self._lookup(key, key_hash)
+        if self._stats is not None:
+            self._stats.record('remove', self._probes)
+        if index == -1:
+            return False
 
-            # Update the probe number and continue
-            probe += 1
+        self._size -= 1
+        if self._robin_hood and buckets is self._buckets:
+            self._backward_shift_delete(index)
+        else:
+            # Mark this entry as a tombstone
+            buckets[index].is_tombstone = True
+            if buckets is self._buckets:
+                self._tombstones += 1
+        return True
 
-            # If we've looped back to the start, the key is not in the hash table
-            if probe > self._capacity:
-                return None
+    def _compact_if_needed(self) -> None:
+        """
+        Rebuild the table at its current capacity, dropping all tombstones, once
+        they take up more than the policy's tombstone_ratio of the slots.
+        """
+        ratio = self._policy.tombstone_ratio
+        if ratio is not None and self._tombstones > ratio * self._capacity:
+            self._resize(self._capacity)
 
-    def contains_key(self, key: str) -> bool:
+    def tombstone_count(self) -> int:
         """
-        Returns True if the hash map contains the specified key, False otherwise.
+        Returns the number of slots holding a tombstone left behind by remove.
         """
-        index = self._hash_function(key) % self._capacity
-        probe = 0
+        return self._tombstones
 
-        while True:
-            # Calculate the index with quadratic probing
-            current_index = (index + probe ** 2) % self._capacity
-            current_entry = self._buckets[current_index]
+    def _shrink_if_sparse(self) -> None:
+        """
+        Shrink the table if the load dropped below the policy's min_load,
+        but never below the initial capacity.
+        """
+        if self._size / self._capacity >= self._policy.min_load:
+            return
 
-            # If the slot is empty, the key is not present
-            if current_entry is None:
-                return False
+        new_capacity = self._round_capacity(self._policy.shrink(self._capacity))
+        if self._power_of_two and new_capacity >= self._capacity:
+            # Rounding up to a power of two undid the shrink, so halve instead
+            new_capacity = self._capacity // 2
 
-            # If the slot is not a tombstone and the keys match, the key is present
-            if not current_entry.is_tombstone and current_entry.key == key:
-                return True
+        new_capacity = self._fit_capacity(max(self._min_capacity, new_capacity))
+        if new_capacity < self._capacity:
+            self._resize(new_capacity)
 
-            # Update the probe number and continue
-            probe += 1
+    def _backward_shift_delete(self, index: int) -> None:
+        """
+        Remove the entry at index from a Robin Hood table by shifting the following
+        displaced entries back one slot, so no tombstone is left behind.
+        """
+        buckets, capacity = self._buckets, self._capacity
+        next_index = (index + 1) % capacity
+        while True:
+            next_entry = buckets[next_index]
+            # Stop at an empty slot or an entry that already sits in its home bucket
+            if next_entry is None or self._home(next_entry.key_hash, capacity) == next_index:
+                break
+            buckets[index] = next_entry
+            index, next_index = next_index, (next_index + 1) % capacity
+        buckets[index] = None
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Return the smallest (unrounded) capacity that holds count entries
+        without reaching the maximum load.
+        """
+        return int(count / self._max_load) + 1
 
-            # If we've looped back to the start, the key is not in the hash table
-            if probe > self._capacity:
-                return False
+    def _reserve(self, count: int) -> None:
+        """
+        Grow the table once, if needed, so that it holds count entries
+        without reaching the maximum load.
+        """
+        capacity = self._round_capacity(self._capacity_for(count))
+        if capacity > self._capacity:
+            self._resize(capacity)
 
-    def remove(self, key: str) -> None:
+    @classmethod
+    def from_pairs(cls, pairs, function, **options) -> "HashMap":
         """
-        Removes the specified key and its associated value from the hash map.
-        If the key is not found, the method does nothing.
+        Build a hash map from an iterable of (key, value) pairs. The bucket array
+        is allocated once at its final size and the pairs are placed without any
+        per-insert load checks. options are passed on to the constructor.
         """
-        index = self._hash_function(key) % self._capacity
-        probe = 0
+        pairs = list(pairs)
+        hash_map = cls(options.pop('capacity', 1), function, expected_size=len(pairs), **options)
+        hash_map.put_many(pairs)
+        return hash_map
 
-        while True:
-            # Calculate the current index with quadratic probing
-            current_index = (index + probe ** 2) % self._capacity
-            current_entry = self._buckets[current_index]
+    def put_many(self, pairs) -> None:
+        """
+        Insert or update every (key, value) pair of an iterable. The table is
+        grown at most once, up front, to fit the whole batch.
+        """
+        pairs = list(pairs)
+        function = self._hash_function
+        hashes = [self._hash(key) for key, _ in pairs]
+        self._reserve(self._size + len(pairs))
+
+        for (key, value), key_hash in zip(pairs, hashes):
+            if self._hash_function is not function:
+                # flood_guard switched hash functions part way through the batch
+                key_hash = self._hash(key)
+            self._rehash_step()
+            self._put_hashed(key, value, key_hash)
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Returns a dynamic array with the value of every key of an iterable, in order,
+        using default for keys that are not in the hash map.
+        """
+        result = DynamicArray()
+        for key in keys:
+            buckets, index = self._lookup(key, self._hash(key))
+            if self._stats is not None:
+                self._stats.record('get', self._probes)
+            result.append(default if index == -1 else buckets[index].value)
+        return result
 
-            # If an empty slot is reached without finding the key, stop the search
-            if current_entry is None:
-                return
+    def remove_many(self, keys) -> None:
+        """
+        Removes every key of an iterable that is in the hash map. The table is
+        shrunk or compacted at most once, after the whole batch.
+        """
+        for key in keys:
+            self._rehash_step()
+            self._remove_hashed(key, self._hash(key))
 
-            # Check if the current entry matches the key
-            if current_entry is not None and not current_entry.is_tombstone:
-                if current_entry.key == key:
-                    # Mark this entry as a tombstone
-                    current_entry.is_tombstone = True
-                    self._size -= 1
-                    return
+        self._shrink_if_sparse()
+        self._compact_if_needed()
 
-            # Increment probe number and continue
-            probe += 1
+    def _entries(self):
+        """
+        Yield every live entry in the hash map, including those still in the
+        old table of an incremental resize.
+        """
+        for i in range(self._capacity):
+            entry = self._buckets[i]
+            if entry is not None and not entry.is_tombstone:
+                yield entry
 
-            # To avoid an infinite loop in a full table, we stop if we've cycled back to the start
-            if probe > self._capacity:
-                return
+        if self._old_buckets is not None:
+            for i in range(self._migrate_index, self._old_capacity):
+                entry = self._old_buckets[i]
+                if entry is not None and not entry.is_tombstone:
+                    yield entry
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -266,12 +782,74 @@ class HashMap:
         in the hash map that are not tombstones and not None.
         """
         result = DynamicArray()
-        for i in range(self._capacity):
-            entry = self._buckets[i]
-            if entry is not None and not entry.is_tombstone:
-                result.append((entry.key, entry.value))
+        for entry in self._entries():
+            result.append((entry.key, entry.value))
         return result
 
+    def _probe_length(self, key: str) -> int:
+        """
+        Return the number of slots a lookup of key examines in the current table.
+        """
+        key_hash = self._hash(key)
+        buckets, capacity = self._buckets, self._capacity
+        home = self._home(key_hash, capacity)
+
+        for probe in range(capacity):
+            if self._robin_hood:
+                index = (home + probe) % capacity
+            else:
+                index = (home + self._probe_offset(probe)) % capacity
+            entry = buckets[index]
+            if entry is None:
+                return probe + 1
+            if not entry.is_tombstone:
+                if entry.key_hash == key_hash and entry.key == key:
+                    return probe + 1
+                if self._robin_hood and (index - self._home(entry.key_hash, capacity)) % capacity < probe:
+                    return probe + 1
+        return capacity
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the statistics of a map created with stats=True:
+        operation counts, a probe count histogram per operation, resize count
+        and durations, size, capacity, load, tombstone ratio and flood_guard rehashes.
+        """
+        if self._stats is None:
+            raise ValueError("stats() needs a HashMap created with stats=True")
+        snapshot = self._stats.snapshot()
+        snapshot.update(size=self._size, capacity=self._capacity, load=self.table_load(),
+                        tombstone_ratio=self._tombstones / self._capacity,
+                        flood_rehashes=self._flood_rehashes, histogram_of='probes')
+        return snapshot
+
+    def set_stats_hook(self, callback: callable, interval: float = 60.0) -> None:
+        """
+        Call callback(self.stats()) after an operation whenever interval seconds
+        have passed since the last call, e.g. to feed a metrics pipeline.
+        """
+        if self._stats is None:
+            raise ValueError("set_stats_hook() needs a HashMap created with stats=True")
+        self._stats.set_hook(callback, interval)
+
+    def save(self, path: str) -> None:
+        """
+        Write the hash map to path in the packed format of a6_include.pack_table.
+        Entries are placed using their cached hashes; the hash function must be
+        registered in HASH_FUNCTIONS and not 'builtin'.
+        """
+        save_packed(path, ((entry.key, entry.value, entry.key_hash) for entry in self._entries()),
+                    self._hash_function, self._power_of_two)
+
+    @staticmethod
+    def load(path: str) -> PackedTable:
+        """
+        Open a file written by save() as a read-only map backed by mmap. It can be
+        queried at once with get/contains_key; nothing is rehashed or copied.
+        Call release() on it when done.
+        """
+        return load_packed(path)
+
     def clear(self) -> None:
         """
         Clears all key/value pairs in the hash map without changing the hash table's capacity.
@@ -280,8 +858,13 @@ class HashMap:
         for i in range(self._capacity):
             self._buckets[i] = None
 
-        # Reset the size counter to zero since the hash map is now empty
+        # Drop an old table left over from an incremental resize
+        self._old_buckets = None
+        self._old_capacity = 0
+
+        # Reset the size and tombstone counters to zero since the hash map is now empty
         self._size = 0
+        self._tombstones = 0
 
     def __iter__(self):
         """
@@ -294,13 +877,21 @@ class HashMap:
     def __next__(self):
         """
         Returns the next active hash entry in the hash map. Skips over
-        tombstone and None entries.
+        tombstone and None entries. Entries still in the old table of an
+        incremental resize are returned after those in the current table.
         """
         while self._current_index < self._capacity:
             entry = self._buckets[self._current_index]
             self._current_index += 1
             if entry is not None and not entry.is_tombstone:
                 return entry
+
+        while (self._old_buckets is not None and
+               self._current_index - self._capacity < self._old_capacity):
+            entry = self._old_buckets[self._current_index - self._capacity]
+            self._current_index += 1
+            if entry is not None and not entry.is_tombstone:
+                return entry
         raise StopIteration
 
 
@@ -1,30 +1,85 @@
 # A hash map implementation using separate chaining for collision resolution, allowing efficient key-value
 # mappings even under high load factors.
 
+import heapq
+from time import perf_counter
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+from a6_include import (DynamicArray, GrowthPolicy, LinkedList, MapStats, PackedTable, SipHash, SLNode,
+                        SortedBucket, hash_function_1, hash_function_2, load_packed, mix_hash, next_power_of_two,
+                        resolve_hash_function, save_packed)
 
 
 class HashMap:
+    # Number of old-table buckets moved per operation during an incremental resize
+    _REHASH_STEP = 8
+
+    # A chain longer than this becomes a SortedBucket, which turns back into a
+    # chain once it is shorter than _UNTREEIFY_LENGTH
+    _TREEIFY_LENGTH = 8
+    _UNTREEIFY_LENGTH = 6
+
+    # Chain length that flood_guard treats as an attack. With a uniform hash and a
+    # load of at most 1.0, a chain this long practically never occurs by chance.
+    _FLOOD_CHAIN = 16
+
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 policy: GrowthPolicy = None,
+                 expected_size: int = None,
+                 stats: bool = False,
+                 flood_guard: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        function is a hash function or the name of one in a6_include.HASH_FUNCTIONS
+        ('hash_function_1', 'hash_function_2', 'fnv1a', 'siphash', 'builtin').
+        If incremental is True, growing the table moves the nodes a few buckets
+        at a time on each put/get/remove instead of all at once.
+        policy is a GrowthPolicy setting the load factors at which the table grows
+        and shrinks, the growth factor and prime or power-of-two capacities.
+        expected_size raises the capacity so that this many entries fit without
+        a resize; capacity itself is a bucket count.
+        stats=True records the chain length seen by every get/put/remove/contains_key,
+        including those made by the batch methods, and the number and duration
+        of resizes; see stats().
+        flood_guard=True defends against keys crafted to collide: once a chain
+        grows past _FLOOD_CHAIN nodes, the map switches to SipHash with a random
+        seed and rehashes every key.
         """
-        self._buckets = DynamicArray()
+        self._policy = policy or GrowthPolicy()
+        self._max_load = self._policy.resolve_max_load(1.0)
+        self._power_of_two = self._policy.sizing == 'power_of_two'
+
+        if expected_size is not None:
+            capacity = max(capacity, self._capacity_for(expected_size))
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+        # capacity must be a prime number (or a power of two)
+        if self._power_of_two:
+            self._capacity = next_power_of_two(capacity)
+        else:
+            self._capacity = self._next_prime(capacity)
+        self._buckets = DynamicArray([LinkedList() for _ in range(self._capacity)])
 
-        self._hash_function = function
+        self._hash_function = resolve_hash_function(function)
         self._size = 0
 
+        # remove never shrinks the table below its initial capacity
+        self._min_capacity = self._capacity
+
+        # Old table and migration cursors while an incremental resize is in progress
+        self._incremental = incremental
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._migrate_index = 0
+        self._fill_index = 0
+
+        self._flood_guard = flood_guard
+        self._flood_rehashes = 0
+
+        self._stats = MapStats(self.stats) if stats else None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -84,57 +139,253 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
+    def _hash(self, key: str) -> int:
+        """
+        Return the hash cached on the node for key. On power-of-two capacities the
+        hash function's result is passed through a mixing finalizer, because only
+        its low bits are used to pick the bucket.
+        """
+        if self._power_of_two:
+            return mix_hash(self._hash_function(key))
+        return self._hash_function(key)
+
+    def _home(self, key_hash: int, capacity: int) -> int:
+        """
+        Return the bucket index of a hash: a bit mask on power-of-two capacities,
+        the remainder modulo the (prime) capacity otherwise.
+        """
+        if self._power_of_two:
+            return key_hash & (capacity - 1)
+        return key_hash % capacity
+
     def put(self, key: str, value: object) -> None:
         """
         Adds a new key-value pair to the hash map, updating the value if the key already exists.
-        Resizes the hash map if the load factor would exceed 1.0.
+        Resizes the hash map if the load factor would exceed 1.0 (or the policy's max_load).
         """
         # Check if resizing is necessary
-        if self.table_load() >= 1.0:
-            self.resize_table(2 * self._capacity)
+        if self.table_load() >= self._max_load:
+            self._resize(self._policy.grow(self._capacity))
 
-        # Determine bucket index and get the corresponding bucket
-        index = self._hash_function(key) % self._capacity
-        bucket = self._buckets.get_at_index(index)
+        self._rehash_step()
+        self._put_hashed(key, value, self._hash(key))
 
-        # Search for the key in the bucket
-        for node in bucket:
-            if node.key == key:
-                node.value = value  # Update existing key
-                return
+    def _put_hashed(self, key: str, value: object, key_hash: int) -> None:
+        """
+        Add or update the given key using an already computed hash.
+        """
+        if self._stats is not None:
+            self._stats.record('put', self._chain_length(key_hash))
+        # Search for the key, comparing cached hashes before keys
+        node = self._find_node(key, key_hash)
+        if node:
+            node.value = value  # Update existing key
+            return
 
         # Key not found, insert new key-value pair
-        bucket.insert(key, value)
+        bucket = self._link_node(SLNode(key, value, None, key_hash))
         self._size += 1
+        if self._flood_guard and bucket.length() > self._FLOOD_CHAIN:
+            self._defend_flood()
+
+    def _link_node(self, node: SLNode):
+        """
+        Link a node into its bucket of the current table and return the bucket.
+        A chain growing past _TREEIFY_LENGTH nodes becomes a SortedBucket, and a
+        SortedBucket given a key it cannot order turns back into a chain.
+        """
+        index = self._home(node.key_hash, self._capacity)
+        bucket = self._bucket(index)
+        if type(bucket) is SortedBucket and type(node.key) is not bucket.key_type:
+            bucket = self._buckets[index] = bucket.to_linked_list()
+        bucket.insert_node(node)
+        if bucket.length() > self._TREEIFY_LENGTH and type(bucket) is LinkedList:
+            bucket = self._treeify(self._buckets, index)
+        return bucket
+
+    @staticmethod
+    def _treeify(buckets: DynamicArray, index: int):
+        """
+        Replace the chain at index by a SortedBucket if its keys can be ordered,
+        and return the bucket now at index.
+        """
+        bucket = buckets[index]
+        key_type = SortedBucket.key_type_of(bucket)
+        if key_type is not None:
+            bucket = buckets[index] = SortedBucket(bucket, key_type)
+        return bucket
+
+    def _defend_flood(self) -> None:
+        """
+        Respond to an over-long chain: switch to SipHash with a new random seed,
+        which keys crafted against the current hash function cannot anticipate,
+        and relink every node under its new hash at the current capacity.
+        A map already on SipHash keeps its function, since its chains can only
+        be long by chance.
+        """
+        if isinstance(self._hash_function, SipHash):
+            return
+        self._finish_migration()
+        nodes = list(self._nodes())
+
+        self._hash_function = SipHash()
+        self._flood_rehashes += 1
+        buckets = DynamicArray([LinkedList() for _ in range(self._capacity)])
+        for node in nodes:
+            node.key_hash = self._hash(node.key)
+            buckets[self._home(node.key_hash, self._capacity)].insert_node(node)
+        self._buckets = buckets
+
+    def _bucket(self, index: int) -> LinkedList:
+        """
+        Return the bucket at index, creating it if an incremental resize
+        has not allocated it yet.
+        """
+        bucket = self._buckets[index]
+        if bucket is None:
+            bucket = LinkedList()
+            self._buckets[index] = bucket
+        return bucket
+
+    def _find_node(self, key: str, key_hash: int):
+        """
+        Return the node holding key, or None if the key is not in the hash map.
+        """
+        bucket = self._buckets[self._home(key_hash, self._capacity)]
+        node = bucket.contains(key, key_hash) if bucket is not None else None
+
+        # Keys not moved yet by an incremental resize are still in the old table
+        if node is None and self._old_buckets is not None:
+            old_index = self._home(key_hash, self._old_capacity)
+            if old_index >= self._migrate_index:
+                node = self._old_buckets[old_index].contains(key, key_hash)
+        return node
+
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Round capacity up to the next prime, or power of two, as the policy requires.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        # Ensure the new capacity is prime
+        if not self._is_prime(capacity):
+            capacity = self._next_prime(capacity)
+        return capacity
+
+    def _fit_capacity(self, new_capacity: int) -> int:
+        """
+        Return the capacity the table ends up with when all entries are re-added
+        to a table of new_capacity: it keeps growing while the load would reach
+        the maximum, exactly as if the entries were put one by one.
+        """
+        new_capacity = self._round_capacity(new_capacity)
+
+        while self._size and (self._size - 1) / new_capacity >= self._max_load:
+            new_capacity = self._round_capacity(self._policy.grow(new_capacity))
+
+        return new_capacity
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Grow or shrink the table, incrementally if the map was created with incremental=True.
+        """
+        if self._incremental:
+            self._begin_resize(new_capacity)
+        else:
+            self.resize_table(new_capacity)
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes the hash map to a new capacity if greater than the current and a prime number,
-        rehashing all existing entries into the new bucket array.
+        relinking all existing nodes into the new bucket array.
+        Nodes keep their cached hash, so the hash function is never called again.
         """
         # Check the new capacity for validity
         if new_capacity < 1:
             return
+        start = perf_counter()
 
-        # Ensure the new capacity is prime
-        if not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
+        # An explicit resize completes any incremental resize first
+        self._finish_migration()
 
-        # Create a new hash map with the adjusted capacity
-        new_map = HashMap(new_capacity, self._hash_function)
-        if new_capacity == 2:
-            new_map._capacity = 2  # Handle the edge case directly
+        new_capacity = self._fit_capacity(new_capacity)
+        new_buckets = DynamicArray([LinkedList() for _ in range(new_capacity)])
 
-        # Rehash all entries
+        # Relink all nodes; iterating a chain reads the next pointer before insert_node overwrites it
+        long_chains = set()
         for i in range(self._capacity):
-            current_bucket = self._buckets.get_at_index(i)
-            for node in current_bucket:
-                new_map.put(node.key, node.value)
+            for node in self._buckets.get_at_index(i):
+                index = self._home(node.key_hash, new_capacity)
+                bucket = new_buckets[index]
+                bucket.insert_node(node)
+                if bucket.length() > self._TREEIFY_LENGTH:
+                    long_chains.add(index)
+
+        # Chains that came out long, from a shrink or from skewed hashes, are sorted
+        for index in long_chains:
+            self._treeify(new_buckets, index)
 
         # Update the current hash map with new settings
-        self._buckets = new_map._buckets
-        self._size = new_map._size
-        self._capacity = new_map._capacity
+        self._buckets = new_buckets
+        self._capacity = new_capacity
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
+
+    def _begin_resize(self, new_capacity: int) -> None:
+        """
+        Start an incremental resize. The new bucket array starts out unallocated
+        (None); _rehash_step fills it in while draining the old table.
+        """
+        start = perf_counter()
+        self._finish_migration()
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._migrate_index = 0
+
+        self._capacity = self._fit_capacity(new_capacity)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._fill_index = 0
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
+
+    def _rehash_step(self, steps: int = None) -> None:
+        """
+        Relink the nodes of the next few old-table buckets into the new table and
+        allocate a proportional share of the new table's empty buckets.
+        Does nothing unless an incremental resize is in progress.
+        """
+        if self._old_buckets is None:
+            return
+
+        steps = steps or self._REHASH_STEP
+        stop = min(self._old_capacity, self._migrate_index + steps)
+
+        for i in range(self._migrate_index, stop):
+            for node in self._old_buckets[i]:
+                self._link_node(node)
+            self._old_buckets[i] = None
+        self._migrate_index = stop
+
+        # Allocate new buckets at a pace that finishes together with the migration
+        fill_stop = self._capacity
+        if stop < self._old_capacity:
+            per_step = -(-self._capacity // self._old_capacity) * steps
+            fill_stop = min(fill_stop, self._fill_index + per_step)
+        for i in range(self._fill_index, fill_stop):
+            self._bucket(i)
+        self._fill_index = fill_stop
+
+        if stop == self._old_capacity:
+            self._old_buckets = None
+            self._old_capacity = 0
+
+    def _finish_migration(self) -> None:
+        """
+        Move everything left in the old table, completing an incremental resize.
+        """
+        if self._old_buckets is not None:
+            self._rehash_step(self._old_capacity)
 
     def table_load(self) -> float:
         """
@@ -151,8 +402,9 @@ class HashMap:
         empty = 0
         # Iterate over all buckets
         for i in range(self._buckets.length()):
-            # Check if the bucket's list head is None
-            if self._buckets[i]._head is None:
+            # Check if the bucket is unallocated or its list head is None
+            bucket = self._buckets[i]
+            if bucket is None or bucket.length() == 0:
                 # Increment the empty bucket count
                 empty += 1
         return empty
@@ -161,10 +413,12 @@ class HashMap:
         """
         Retrieve the value associated with the given key in the hash map.
         """
-        # Compute bucket index
-        index = self._hash_function(key) % self._capacity
-        # Search for the key in the bucket
-        node = self._buckets[index].contains(key)
+        self._rehash_step()
+        key_hash = self._hash(key)
+        if self._stats is not None:
+            self._stats.record('get', self._chain_length(key_hash))
+        # Search for the key in its bucket
+        node = self._find_node(key, key_hash)
         if node:
             # Return the value if key is found
             return node.value
@@ -175,19 +429,147 @@ class HashMap:
         """
         Check if the hash map contains the given key.
         """
-        # Utilize get method to check key presence
-        return self.get(key) is not None
+        self._rehash_step()
+        key_hash = self._hash(key)
+        if self._stats is not None:
+            self._stats.record('contains_key', self._chain_length(key_hash))
+        node = self._find_node(key, key_hash)
+        return node is not None and node.value is not None
 
     def remove(self, key: str) -> None:
         """
         Remove the key-value pair associated with the given key from the hash map.
         """
+        self._rehash_step()
+        if self._remove_hashed(key, self._hash(key)):
+            self._shrink_if_sparse()
+
+    def _remove_hashed(self, key: str, key_hash: int) -> bool:
+        """
+        Remove the given key using an already computed hash, without shrinking
+        the table. Return True if the key was found.
+        """
+        if self._stats is not None:
+            self._stats.record('remove', self._chain_length(key_hash))
         # Compute bucket index
-        index = self._hash_function(key) % self._capacity
+        index = self._home(key_hash, self._capacity)
+        bucket = self._buckets[index]
         # Attempt to remove the key
-        if self._buckets[index].remove(key):
+        removed = bucket is not None and bucket.remove(key, key_hash)
+        if removed and type(bucket) is SortedBucket and bucket.length() < self._UNTREEIFY_LENGTH:
+            self._buckets[index] = bucket.to_linked_list()
+
+        # Keys not moved yet by an incremental resize are still in the old table
+        if not removed and self._old_buckets is not None:
+            old_index = self._home(key_hash, self._old_capacity)
+            if old_index >= self._migrate_index:
+                removed = self._old_buckets[old_index].remove(key, key_hash)
+
+        if removed:
             # Decrement the size if removal was successful
             self._size -= 1
+        return removed
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Shrink the table if the load dropped below the policy's min_load,
+        but never below the initial capacity.
+        """
+        if self._size / self._capacity >= self._policy.min_load:
+            return
+
+        new_capacity = self._round_capacity(self._policy.shrink(self._capacity))
+        if self._power_of_two and new_capacity >= self._capacity:
+            # Rounding up to a power of two undid the shrink, so halve instead
+            new_capacity = self._capacity // 2
+
+        new_capacity = self._fit_capacity(max(self._min_capacity, new_capacity))
+        if new_capacity < self._capacity:
+            self._resize(new_capacity)
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Return the smallest (unrounded) capacity that holds count entries
+        without reaching the maximum load.
+        """
+        return int(count / self._max_load) + 1
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grow the table once, if needed, so that it holds count entries
+        without reaching the maximum load.
+        """
+        capacity = self._round_capacity(self._capacity_for(count))
+        if capacity > self._capacity:
+            self._resize(capacity)
+
+    @classmethod
+    def from_pairs(cls, pairs, function: callable = hash_function_1, **options) -> "HashMap":
+        """
+        Build a hash map from an iterable of (key, value) pairs. The bucket array
+        is allocated once at its final size and the pairs are placed without any
+        per-insert load checks. options are passed on to the constructor.
+        """
+        pairs = list(pairs)
+        hash_map = cls(options.pop('capacity', 1), function, expected_size=len(pairs), **options)
+        hash_map.put_many(pairs)
+        return hash_map
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update every (key, value) pair of an iterable. The table is
+        grown at most once, up front, to fit the whole batch.
+        """
+        pairs = list(pairs)
+        function = self._hash_function
+        hashes = [self._hash(key) for key, _ in pairs]
+        self._reserve(self._size + len(pairs))
+
+        for (key, value), key_hash in zip(pairs, hashes):
+            if self._hash_function is not function:
+                # flood_guard switched hash functions part way through the batch
+                key_hash = self._hash(key)
+            self._rehash_step()
+            self._put_hashed(key, value, key_hash)
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Retrieve the value of every key of an iterable, in order, as a dynamic
+        array, using default for keys that are not in the hash map.
+        """
+        result = DynamicArray()
+        for key in keys:
+            key_hash = self._hash(key)
+            if self._stats is not None:
+                self._stats.record('get', self._chain_length(key_hash))
+            node = self._find_node(key, key_hash)
+            result.append(node.value if node else default)
+        return result
+
+    def remove_many(self, keys) -> None:
+        """
+        Remove every key of an iterable that is in the hash map. The table is
+        shrunk at most once, after the whole batch.
+        """
+        for key in keys:
+            self._rehash_step()
+            self._remove_hashed(key, self._hash(key))
+
+        self._shrink_if_sparse()
+
+    def _nodes(self):
+        """
+        Yield every node in the hash map, including those still in the old
+        table of an incremental resize.
+        """
+        buckets = [(self._buckets, 0, self._buckets.length())]
+        if self._old_buckets is not None:
+            buckets.append((self._old_buckets, self._migrate_index, self._old_capacity))
+        for table, start, stop in buckets:
+            for i in range(start, stop):
+                # Traverse the chain or sorted bucket
+                if table[i] is not None:
+                    yield from table[i]
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -195,16 +577,71 @@ class HashMap:
         """
         # Initialize the result array
         result = DynamicArray()
-        # Iterate over all buckets
-        for i in range(self._buckets.length()):
-            # Start with the head of the linked list
-            current = self._buckets[i]._head
-            while current:  # Traverse the linked list
-                # Append the (key, value) tuple
-                result.append((current.key, current.value))
-                current = current.next
+        for node in self._nodes():
+            # Append the (key, value) tuple
+            result.append((node.key, node.value))
         return result
 
+    def _probe_length(self, key: str) -> int:
+        """
+        Return the length of the chain a lookup of key walks in the current table,
+        or the number of steps of the binary search in a SortedBucket.
+        """
+        return self._chain_length(self._hash(key))
+
+    def _chain_length(self, key_hash: int) -> int:
+        """
+        Return the length of the chain at key_hash's bucket of the current table,
+        or the number of steps of the binary search in a SortedBucket. Buckets
+        keep their length, so nothing is walked.
+        """
+        bucket = self._buckets[self._home(key_hash, self._capacity)]
+        if bucket is None:
+            return 0
+        if type(bucket) is SortedBucket:
+            return bucket.length().bit_length()
+        return bucket.length()
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the statistics of a map created with stats=True:
+        operation counts, a chain length histogram per operation, resize count
+        and durations, size, capacity, load and flood_guard rehashes.
+        """
+        if self._stats is None:
+            raise ValueError("stats() needs a HashMap created with stats=True")
+        snapshot = self._stats.snapshot()
+        snapshot.update(size=self._size, capacity=self._capacity, load=self.table_load(),
+                        flood_rehashes=self._flood_rehashes, histogram_of='chain_length')
+        return snapshot
+
+    def set_stats_hook(self, callback: callable, interval: float = 60.0) -> None:
+        """
+        Call callback(self.stats()) after an operation whenever interval seconds
+        have passed since the last call, e.g. to feed a metrics pipeline.
+        """
+        if self._stats is None:
+            raise ValueError("set_stats_hook() needs a HashMap created with stats=True")
+        self._stats.set_hook(callback, interval)
+
+    def save(self, path: str) -> None:
+        """
+        Write the hash map to path in the packed format of a6_include.pack_table.
+        Nodes are placed using their cached hashes; the hash function must be
+        registered in HASH_FUNCTIONS and not 'builtin'.
+        """
+        save_packed(path, ((node.key, node.value, node.key_hash) for node in self._nodes()),
+                    self._hash_function, self._power_of_two)
+
+    @staticmethod
+    def load(path: str) -> PackedTable:
+        """
+        Open a file written by save() as a read-only map backed by mmap. It can be
+        queried at once with get/contains_key; nothing is rehashed or copied.
+        Call release() on it when done.
+        """
+        return load_packed(path)
+
     def clear(self) -> None:
         """
         Clear all contents of the hash map.
@@ -216,49 +653,134 @@ class HashMap:
             # Reset the size of the hash map to zero
         self._size = 0
 
+        # Drop an old table left over from an incremental resize
+        self._old_buckets = None
+        self._old_capacity = 0
+
+
+def _count(frequency_map: HashMap, element: object, amount: int = 1) -> int:
+    """
+    Add amount to the count of element in a frequency map and return the new count.
+    """
+    node = frequency_map._find_node(element, frequency_map._hash(element))
+    if node:
+        node.value += amount
+        return node.value
+    frequency_map.put(element, amount)
+    return amount
+
+
+def _elements(da) -> object:
+    """
+    Yield the elements of a DynamicArray (which disables iteration) or any other iterable.
+    """
+    if isinstance(da, DynamicArray):
+        for i in range(da.length()):
+            yield da.get_at_index(i)
+    else:
+        yield from da
+
 
-def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
+def _modes(frequency_map: HashMap) -> tuple[DynamicArray, int]:
+    """
+    Return the most frequent element(s) of a frequency map and their frequency,
+    in a single pass over its distinct elements.
+    """
+    max_frequency = 0
+    mode_elements = []
+    for node in frequency_map._nodes():
+        if node.value > max_frequency:
+            max_frequency = node.value
+            mode_elements.clear()
+            mode_elements.append(node.key)
+        elif node.value == max_frequency:
+            mode_elements.append(node.key)
+    return DynamicArray(mode_elements), max_frequency
+
+
+def _top_k(frequency_map: HashMap, k: int) -> DynamicArray:
+    """
+    Return the k most frequent (element, frequency) pairs of a frequency map,
+    most frequent first. Ties at the cut-off are broken arbitrarily.
+    """
+    nodes = heapq.nlargest(k, frequency_map._nodes(), key=lambda node: node.value)
+    return DynamicArray([(node.key, node.value) for node in nodes])
+
+
+def find_mode(da: DynamicArray, function: callable = hash_function_1) -> tuple[DynamicArray, int]:
     """
     Find the mode(s) of the values in a DynamicArray and their corresponding frequency.
+    The input is read once to count each element; the modes are then collected in
+    one pass over the distinct elements of the frequency map.
+    function is the hash function (or its name) used for the frequency map.
     """
     # Initialize a hash map to store the frequency of each element
-    frequency_map = HashMap()
+    frequency_map = HashMap(function=function)
 
     # Populate the frequency map with counts for each element
     for i in range(da.length()):
-        element = da.get_at_index(i)
-        # Retrieve current frequency or set to zero if key not present
-        current_count = frequency_map.get(element) or 0
-        frequency_map.put(element, current_count + 1)
+        _count(frequency_map, da.get_at_index(i))
+
+    return _modes(frequency_map)
 
-    # Determine the maximum frequency and collect the elements with that frequency
-    max_frequency = 0
-    mode_elements = DynamicArray()
 
-    # Re-iterate to find the maximum frequency
+def top_k(da: DynamicArray, k: int, function: callable = hash_function_1) -> DynamicArray:
+    """
+    Return a DynamicArray of the k most frequent (element, frequency) pairs in
+    da, most frequent first.
+    """
+    frequency_map = HashMap(function=function)
     for i in range(da.length()):
-        element = da.get_at_index(i)
-        frequency = frequency_map.get(element)
-        if frequency > max_frequency:
-            max_frequency = frequency
-            mode_elements = DynamicArray()  # Reset mode elements
-            mode_elements.append(element)
-        elif frequency == max_frequency:
-            # Check if element is already in mode_elements to avoid duplicates
-            if not in_dynamic_array(mode_elements, element):
-                mode_elements.append(element)
-
-    return (mode_elements, max_frequency)
-
-def in_dynamic_array(dyn_array: DynamicArray, item: object) -> bool:
+        _count(frequency_map, da.get_at_index(i))
+    return _top_k(frequency_map, k)
+
+
+class ModeCounter:
     """
-    Helper function to check if an item is in the dynamic array,
-    since DynamicArray does not support 'contains' method.
+    Streaming frequency counter. Chunks of elements are added with update(),
+    and the current modes, top k or count of an element can be read at any time.
+    The modes are kept up to date on every update, since counts only grow.
     """
-    for i in range(dyn_array.length()):
-        if dyn_array.get_at_index(i) == item:
-            return True
-    return False
+
+    def __init__(self, function: callable = hash_function_1) -> None:
+        """Initialize an empty counter; function is the hash function for the frequency map."""
+        self._frequency_map = HashMap(function=function)
+        self._total = 0
+        self._max_frequency = 0
+        self._mode_elements = []
+
+    def update(self, chunk) -> None:
+        """Count every element of a DynamicArray or any other iterable."""
+        for element in _elements(chunk):
+            frequency = _count(self._frequency_map, element)
+            self._total += 1
+            if frequency > self._max_frequency:
+                self._max_frequency = frequency
+                self._mode_elements.clear()
+                self._mode_elements.append(element)
+            elif frequency == self._max_frequency:
+                self._mode_elements.append(element)
+
+    def modes(self) -> tuple[DynamicArray, int]:
+        """Return the current mode(s) and their frequency."""
+        return DynamicArray(self._mode_elements), self._max_frequency
+
+    def top_k(self, k: int) -> DynamicArray:
+        """Return the current k most frequent (element, frequency) pairs, most frequent first."""
+        return _top_k(self._frequency_map, k)
+
+    def count(self, element: object) -> int:
+        """Return how many times element has been seen."""
+        return self._frequency_map.get(element) or 0
+
+    def get_total(self) -> int:
+        """Return the number of elements counted so far."""
+        return self._total
+
+    def get_distinct(self) -> int:
+        """Return the number of distinct elements counted so far."""
+        return self._frequency_map.get_size()
+
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -460,3 +982,13 @@ if __name__ == "__main__":
         da = DynamicArray(case)
         mode, frequency = find_mode(da)
         print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}\n")
+
+    print("\ntop_k / ModeCounter example")
+    print("-----------------------------")
+    da = DynamicArray(["2", "4", "2", "6", "8", "4", "1", "3", "4", "5", "7", "3", "3", "2"])
+    print(f"Input: {da}\nTop 3: {top_k(da, 3)}")
+    counter = ModeCounter()
+    counter.update(["Arch", "Manjaro", "Manjaro"])
+    print(counter.modes()[0], counter.modes()[1])
+    counter.update(DynamicArray(["Mint", "Mint", "Mint", "Ubuntu"]))
+    print(counter.modes()[0], counter.modes()[1], counter.count("Manjaro"), counter.get_total())
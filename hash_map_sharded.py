@@ -0,0 +1,417 @@
+# A hash map partitioned over worker processes. Every worker owns one shard, a separate chaining
+# or open addressing HashMap, and the parent routes each key to its shard and ships operations
+# to the workers in batches over pipes, so the pure-Python hashing and probing runs on
+# several cores at once.
+
+import heapq
+import multiprocessing
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray, resolve_hash_function
+from hash_map_sc import _count, _elements
+
+ENGINES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+}
+
+
+class _Missing:
+    """Marks a key that is not in a shard. It pickles by name, so it stays the same object."""
+
+    def __reduce__(self) -> str:
+        return '_MISSING'
+
+
+_MISSING = _Missing()
+
+
+def _entries(hash_map) -> object:
+    """Yield the live nodes/entries (with key and value attributes) of a shard."""
+    if isinstance(hash_map, hash_map_sc.HashMap):
+        yield from hash_map._nodes()
+    else:
+        yield from hash_map
+
+
+def _add_count(hash_map, element: object) -> None:
+    """Add one to the count of element in a shard used as a frequency map."""
+    if isinstance(hash_map, hash_map_sc.HashMap):
+        _count(hash_map, element)
+        return
+    buckets, index = hash_map._lookup(element, hash_map._hash(element))
+    if index != -1:
+        buckets[index].value += 1
+    else:
+        hash_map.put(element, 1)
+
+
+def _shard_modes(hash_map) -> tuple:
+    """Return (mode elements, frequency) of a shard used as a frequency map."""
+    max_frequency = 0
+    mode_elements = []
+    for entry in _entries(hash_map):
+        if entry.value > max_frequency:
+            max_frequency = entry.value
+            mode_elements = [entry.key]
+        elif entry.value == max_frequency:
+            mode_elements.append(entry.key)
+    return mode_elements, max_frequency
+
+
+def _apply(hash_map, operations: list) -> None:
+    """Apply a batch of ('put', key, value) and ('remove', key) operations in order."""
+    for operation in operations:
+        if operation[0] == 'put':
+            hash_map.put(operation[1], operation[2])
+        else:
+            hash_map.remove(operation[1])
+
+
+def _get_all(hash_map, keys: list) -> list:
+    """Look up a batch of keys, answering _MISSING for keys not in the shard."""
+    values = hash_map.get_many(keys, _MISSING)
+    return [values[i] for i in range(values.length())]
+
+
+def _count_all(hash_map, elements: list) -> None:
+    """Count every element of a batch."""
+    for element in elements:
+        _add_count(hash_map, element)
+
+
+# Commands whose result is sent back to the parent
+_QUERIES = {
+    'get_many': _get_all,
+    'contains_many': lambda hash_map, keys: [hash_map.contains_key(key) for key in keys],
+    'size': lambda hash_map, _: hash_map.get_size(),
+    'capacity': lambda hash_map, _: hash_map.get_capacity(),
+    'items': lambda hash_map, _: [(entry.key, entry.value) for entry in _entries(hash_map)],
+    'modes': lambda hash_map, _: _shard_modes(hash_map),
+    'top_k': lambda hash_map, k: [(entry.key, entry.value) for entry in
+                                  heapq.nlargest(k, _entries(hash_map), key=lambda entry: entry.value)],
+}
+
+# Commands that are not answered, so batches can be streamed without waiting
+_UPDATES = {
+    'apply': _apply,
+    'count': _count_all,
+    'clear': lambda hash_map, _: hash_map.clear(),
+}
+
+
+def _serve(connection, engine: str, capacity: int, function, options: dict) -> None:
+    """
+    Worker process loop: build the shard, then run commands from the pipe until
+    'close'. An error raised by an update is held and reported as the answer
+    to the next query.
+    """
+    hash_map = ENGINES[engine](capacity, function, **options)
+    error = None
+    while True:
+        command, payload = connection.recv()
+        if command == 'close':
+            connection.close()
+            return
+        try:
+            if command in _UPDATES:
+                _UPDATES[command](hash_map, payload)
+                continue
+            if error is None:
+                connection.send(('ok', _QUERIES[command](hash_map, payload)))
+                continue
+        except Exception as exception:
+            if command in _UPDATES:
+                error = error or exception
+                continue
+            error = exception
+        connection.send(('error', error))
+        error = None
+
+
+class ShardedHashMap:
+    def __init__(self,
+                 processes: int = 4,
+                 function: callable = 'fnv1a',
+                 engine: str = 'sc',
+                 capacity: int = 11,
+                 batch_size: int = 1024,
+                 **options) -> None:
+        """
+        Start processes workers, each owning one shard built as
+        ENGINES[engine](capacity, function, **options). function should be a
+        hash function name from a6_include.HASH_FUNCTIONS, or another function
+        that can be pickled. Updates are sent to a worker once batch_size of
+        them are waiting for it, or before any query that involves it.
+        Keys are routed with the builtin hash() in the parent process only.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        if processes < 1 or batch_size < 1:
+            raise ValueError("processes and batch_size must be at least 1")
+        # Fail here rather than in every worker
+        resolve_hash_function(function)
+
+        self._batch_size = batch_size
+        self._connections = []
+        self._workers = []
+        for _ in range(processes):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=_serve, args=(child, engine, capacity, function, options),
+                                             daemon=True)
+            worker.start()
+            child.close()
+            self._connections.append(parent)
+            self._workers.append(worker)
+
+        # Updates waiting to be sent to each shard, and elements waiting to be counted
+        self._pending = [[] for _ in range(processes)]
+        self._pending_counts = [[] for _ in range(processes)]
+
+    def __enter__(self) -> "ShardedHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _shard(self, key: object) -> int:
+        """Return the index of the shard that owns key."""
+        return hash(key) % len(self._connections)
+
+    def _flush(self, shard: int) -> None:
+        """
+        Send the updates or counts waiting for a shard. Only one of the two
+        queues is ever non-empty.
+        """
+        if self._pending[shard]:
+            self._connections[shard].send(('apply', self._pending[shard]))
+            self._pending[shard] = []
+        if self._pending_counts[shard]:
+            self._connections[shard].send(('count', self._pending_counts[shard]))
+            self._pending_counts[shard] = []
+
+    def _query(self, command: str, payloads: dict) -> dict:
+        """
+        Send command to every shard in payloads (shard -> payload) at once, then
+        collect and return their answers as shard -> result.
+        """
+        for shard, payload in payloads.items():
+            self._flush(shard)
+            self._connections[shard].send((command, payload))
+
+        results = {}
+        errors = []
+        for shard in payloads:
+            status, result = self._connections[shard].recv()
+            if status == 'error':
+                errors.append(result)
+            results[shard] = result
+        if errors:
+            raise errors[0]
+        return results
+
+    def _query_all(self, command: str, payload: object = None) -> list:
+        """Send command to every shard and return their answers in shard order."""
+        results = self._query(command, {shard: payload for shard in range(len(self._connections))})
+        return [results[shard] for shard in range(len(self._connections))]
+
+    def _queue(self, shard: int, operation: tuple) -> None:
+        """Queue an update for a shard, sending the batch once it is full."""
+        # Send counts queued earlier first, so the shard sees everything in order
+        if self._pending_counts[shard]:
+            self._flush(shard)
+        pending = self._pending[shard]
+        pending.append(operation)
+        if len(pending) >= self._batch_size:
+            self._flush(shard)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._query_all('size'))
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map, the total of all shard capacities
+        """
+        return sum(self._query_all('capacity'))
+
+    def get_shard_count(self) -> int:
+        """
+        Return the number of shards (worker processes)
+        """
+        return len(self._connections)
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Adds a new key-value pair to the hash map, updating the value if the key already exists.
+        """
+        self._queue(self._shard(key), ('put', key, value))
+
+    def put_many(self, pairs) -> None:
+        """
+        Add or update every (key, value) pair of an iterable.
+        """
+        for key, value in pairs:
+            self._queue(self._shard(key), ('put', key, value))
+
+    def remove(self, key: object) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        self._queue(self._shard(key), ('remove', key))
+
+    def get(self, key: object) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        shard = self._shard(key)
+        value = self._query('get_many', {shard: [key]})[shard][0]
+        return None if value is _MISSING else value
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        shard = self._shard(key)
+        return self._query('contains_many', {shard: [key]})[shard][0]
+
+    def get_many(self, keys, default: object = None) -> DynamicArray:
+        """
+        Retrieve the value of every key of an iterable, in order, as a dynamic
+        array, using default for keys that are not in the hash map. A key
+        stored with the value None gives None. All shards look up their keys
+        in parallel.
+        """
+        keys = list(keys)
+        shards = [self._shard(key) for key in keys]
+        payloads = {}
+        for key, shard in zip(keys, shards):
+            payloads.setdefault(shard, []).append(key)
+        answers = {shard: iter(values) for shard, values in self._query('get_many', payloads).items()}
+
+        result = DynamicArray()
+        for shard in shards:
+            value = next(answers[shard])
+            result.append(default if value is _MISSING else value)
+        return result
+
+    def count(self, elements) -> None:
+        """
+        Add one to the value of every element of a DynamicArray or other iterable,
+        using the map as a frequency map. The shards count in parallel.
+        """
+        # Send updates queued earlier first, so the shards see everything in order
+        for shard in range(len(self._connections)):
+            self._flush(shard)
+
+        connections = len(self._connections)
+        batch_size = self._batch_size
+        pending_counts = self._pending_counts
+        for element in _elements(elements):
+            shard = hash(element) % connections
+            batch = pending_counts[shard]
+            batch.append(element)
+            if len(batch) >= batch_size:
+                self._flush(shard)
+
+    def find_mode(self) -> tuple[DynamicArray, int]:
+        """
+        Return the key(s) with the highest value and that value, for a map
+        filled by count(). Each shard finds its own modes in parallel; since
+        shards never share a key, the overall modes are the shard modes with
+        the highest frequency.
+        """
+        max_frequency = 0
+        mode_elements = []
+        for elements, frequency in self._query_all('modes'):
+            if frequency > max_frequency:
+                max_frequency = frequency
+                mode_elements = list(elements)
+            elif frequency == max_frequency:
+                mode_elements.extend(elements)
+        return DynamicArray(mode_elements), max_frequency
+
+    def top_k(self, k: int) -> DynamicArray:
+        """
+        Return the k (key, value) pairs with the highest values, highest first,
+        merged from the top k of every shard.
+        """
+        pairs = [pair for shard_pairs in self._query_all('top_k', k) for pair in shard_pairs]
+        return DynamicArray(heapq.nlargest(k, pairs, key=lambda pair: pair[1]))
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor over all shards.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing (key, value) tuples from every shard.
+        """
+        result = DynamicArray()
+        for pairs in self._query_all('items'):
+            for pair in pairs:
+                result.append(pair)
+        return result
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs in every shard.
+        """
+        for shard in range(len(self._connections)):
+            self._pending[shard] = []
+            self._pending_counts[shard] = []
+            self._connections[shard].send(('clear', None))
+
+    def close(self) -> None:
+        """
+        Stop the worker processes. The map cannot be used afterwards.
+        """
+        for connection, worker in zip(self._connections, self._workers):
+            try:
+                connection.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+
+def parallel_find_mode(da, processes: int = 4, function: callable = 'fnv1a',
+                       engine: str = 'sc') -> tuple[DynamicArray, int]:
+    """
+    Find the mode(s) of a DynamicArray (or any other iterable) and their frequency,
+    counting on processes worker processes. Results match find_mode, except for
+    the order of tied modes.
+    """
+    with ShardedHashMap(processes, function, engine) as frequency_map:
+        frequency_map.count(da)
+        return frequency_map.find_mode()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    with ShardedHashMap(2, 'hash_function_1', engine='oa', batch_size=16) as m:
+        for i in range(150):
+            m.put('str' + str(i), i * 100)
+        m.remove('str0')
+        print(m.get_size(), m.get('str42'), m.get('str0'), m.contains_key('str149'))
+        print(m.get_many(['str1', 'str2', 'missing'], default=-1))
+
+    print("\nparallel_find_mode example")
+    print("--------------------------")
+    da = DynamicArray(["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu", "Ubuntu"])
+    mode, frequency = parallel_find_mode(da, processes=2)
+    print(f"Input: {da}\nMode : {sorted(mode[i] for i in range(mode.length()))}, Frequency: {frequency}")
@@ -0,0 +1,199 @@
+# A read-only open addressing hash map kept in a multiprocessing.shared_memory block. One process
+# packs the table (see a6_include.pack_table) into shared memory and any number of processes
+# attach to it by name and run lookups directly against the shared buffer, without copying it.
+
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+from a6_include import DynamicArray, PackedTable, hash_function_1, pack_table
+
+# Names of the blocks created by this process (and inherited by forked children), which
+# share its resource tracker registration
+_created = set()
+
+
+class SharedHashMap:
+    def __init__(self, name: str) -> None:
+        """
+        Attach to the shared table created under name by SharedHashMap.create.
+        Lookups read the shared block in place; close() detaches.
+        """
+        if sys.version_info >= (3, 13):
+            # Attaching must not make this process unlink the block on exit
+            self._memory = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            # Before 3.13 attaching registers the block with this process's resource
+            # tracker, which would unlink it for every process when this one exits.
+            # A block created here (or before a fork) keeps the creator's registration.
+            self._memory = shared_memory.SharedMemory(name=name)
+            if self._memory._name not in _created:
+                resource_tracker.unregister(self._memory._name, 'shared_memory')
+        self._table = PackedTable(self._memory.buf)
+        self._owner = False
+
+    @classmethod
+    def create(cls, pairs, function: callable = 'fnv1a', name: str = None) -> "SharedHashMap":
+        """
+        Pack an iterable of (key, value) pairs into a new shared memory block
+        and return the map attached to it. function must be a name or function
+        from a6_include.HASH_FUNCTIONS other than 'builtin'. The creator should
+        call unlink() once every process is done with the table.
+        """
+        return cls._publish(pack_table(((key, value, None) for key, value in pairs), function), name)
+
+    @classmethod
+    def from_map(cls, hash_map, name: str = None) -> "SharedHashMap":
+        """
+        Pack the entries of a hash_map_oa or hash_map_sc HashMap into a new
+        shared memory block, reusing the hashes cached on its entries.
+        """
+        if hasattr(hash_map, '_nodes'):
+            entries = hash_map._nodes()
+        else:
+            entries = hash_map._entries()
+        triples = ((entry.key, entry.value, entry.key_hash) for entry in entries)
+        return cls._publish(pack_table(triples, hash_map._hash_function, hash_map._power_of_two), name)
+
+    @classmethod
+    def _publish(cls, packed: bytearray, name: str) -> "SharedHashMap":
+        """Copy a packed table into a new shared memory block and attach to it."""
+        memory = shared_memory.SharedMemory(name=name, create=True, size=len(packed))
+        memory.buf[:len(packed)] = packed
+        _created.add(memory._name)
+        shared = cls.__new__(cls)
+        shared._memory = memory
+        shared._table = PackedTable(memory.buf)
+        shared._owner = True
+        return shared
+
+    def __enter__(self) -> "SharedHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_name(self) -> str:
+        """
+        Return the name other processes attach to
+        """
+        return self._memory.name
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._table.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table.get_capacity()
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        return self._table.get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        return self._table.contains_key(key)
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor of the hash table.
+        """
+        return self._table.table_load()
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        return self._table.empty_buckets()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of (key, value) for all entries.
+        """
+        return self._table.get_keys_and_values()
+
+    def __iter__(self):
+        """
+        Iterate over the entries, yielding a HashEntry built for each one.
+        """
+        return iter(self._table)
+
+    def close(self) -> None:
+        """
+        Detach this process from the shared block. The map cannot be used afterwards.
+        """
+        if self._table is not None:
+            self._table.release()
+            self._table = None
+            self._memory.close()
+
+    def unlink(self) -> None:
+        """
+        Detach and destroy the shared block. Only the creating process should call this.
+        """
+        self.close()
+        if self._owner:
+            self._memory.unlink()
+            _created.discard(self._memory._name)
+            self._owner = False
+
+
+def _lookup_worker(name: str, queue) -> None:
+    """Attach to a shared table, report a few lookups and detach (used by the examples)."""
+    with SharedHashMap(name) as attached:
+        queue.put((attached.get('str42'), attached.get('str150'), attached.contains_key('str149')))
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import multiprocessing
+
+    import hash_map_oa
+
+    print("\ncreate / attach example")
+    print("-----------------------")
+    shared = SharedHashMap.create((('str' + str(i), i * 100) for i in range(150)), hash_function_1)
+    print(shared.get_size(), shared.get_capacity(), round(shared.table_load(), 2))
+
+    queue = multiprocessing.Queue()
+    worker = multiprocessing.Process(target=_lookup_worker, args=(shared.get_name(), queue))
+    worker.start()
+    print(queue.get())
+    worker.join()
+    shared.unlink()
+
+    print("\nspawned attach example")
+    print("----------------------")
+    # A spawned process has its own resource tracker; its exit must not unlink the block
+    shared = SharedHashMap.create((('str' + str(i), i * 100) for i in range(150)), hash_function_1)
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    worker = context.Process(target=_lookup_worker, args=(shared.get_name(), queue))
+    worker.start()
+    print(queue.get())
+    worker.join()
+    with SharedHashMap(shared.get_name()) as attached:
+        print(attached.get('str42'))
+    shared.unlink()
+
+    print("\nfrom_map example")
+    print("----------------")
+    m = hash_map_oa.HashMap(11, 'siphash')
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    shared = SharedHashMap.from_map(m)
+    for item in shared:
+        print('K:', item.key, 'V:', item.value)
+    print(shared.get('3'), shared.get('5'))
+    shared.unlink()
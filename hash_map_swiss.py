@@ -0,0 +1,294 @@
+# Implements an open addressing hash map in the style of SwissTable: slots are split into groups
+# of 16, and a bytearray holds one control byte per slot (empty, deleted, or 7 bits of the
+# key's hash). A lookup matches the 7 hash bits against a whole group with bytearray.find, which
+# scans in C, and only reads the key arrays for the few slots whose control byte matches.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry, hash_function_1, hash_function_2, mix_hash,
+                        next_power_of_two, resolve_hash_function)
+
+# Slots per group
+GROUP_SIZE = 16
+
+# Control bytes. A full slot holds the low 7 bits of its hash (0-127)
+EMPTY = 0x80
+DELETED = 0xFE
+
+# Hashes are stored in a signed 64-bit array, so they are reduced to 63 bits
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap:
+    # The table grows once live and deleted slots fill 7/8 of it, as in SwissTable
+    _MAX_LOAD = 7 / 8
+
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that probes groups of 16 slots and matches
+        keys by control byte before comparing them.
+        function is a hash function or the name of one in a6_include.HASH_FUNCTIONS
+        ('hash_function_1', 'hash_function_2', 'fnv1a', 'siphash', 'builtin').
+        Its result is passed through mix_hash, since the group index and the
+        control byte are both taken from the low bits.
+        capacity is rounded up to a power-of-two number of groups.
+        """
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = resolve_hash_function(function)
+        self._size = 0
+        self._deleted = 0
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            control = self._control[i]
+            if control == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                entry = HashEntry(self._keys[i], self._values[i], self._hashes[i])
+                entry.is_tombstone = control == DELETED
+                out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Return the slot count for capacity: a power-of-two number of groups.
+        """
+        return next_power_of_two(max(1, -(-capacity // GROUP_SIZE))) * GROUP_SIZE
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty ones of the given capacity.
+        """
+        self._control = bytearray([EMPTY]) * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('q', bytes(8 * capacity))
+        self._group_mask = capacity // GROUP_SIZE - 1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """
+        Return the mixed hash of key, reduced to fit the hash array. Its low
+        7 bits are the control byte and the rest pick the first group.
+        """
+        return mix_hash(self._hash_function(key)) & _HASH_MASK
+
+    def _find_index(self, key: str, key_hash: int) -> int:
+        """
+        Return the slot index holding key, or -1 if the key is not present.
+        Groups are probed in triangular-number order, which visits every
+        group of a power-of-two table. Within a group only slots whose control
+        byte equals the hash's low 7 bits are compared, and a group with an
+        empty slot ends the search.
+        """
+        control, hashes, keys = self._control, self._hashes, self._keys
+        fragment = key_hash & 0x7F
+        group_mask = self._group_mask
+        group = (key_hash >> 7) & group_mask
+        probe = 0
+
+        while probe <= group_mask:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            index = control.find(fragment, start, end)
+            while index != -1:
+                if hashes[index] == key_hash and keys[index] == key:
+                    return index
+                index = control.find(fragment, index + 1, end)
+            if control.find(EMPTY, start, end) != -1:
+                return -1
+            probe += 1
+            group = (group + probe) & group_mask
+        return -1
+
+    def _free_index(self, control: bytearray, group_mask: int, key_hash: int) -> int:
+        """
+        Return the first empty or deleted slot on the probe sequence of key_hash.
+        """
+        group = (key_hash >> 7) & group_mask
+        probe = 0
+        while True:
+            start = group * GROUP_SIZE
+            end = start + GROUP_SIZE
+            empty = control.find(EMPTY, start, end)
+            deleted = control.find(DELETED, start, end)
+            if empty != -1 or deleted != -1:
+                return deleted if empty == -1 or (deleted != -1 and deleted < empty) else empty
+            probe += 1
+            group = (group + probe) & group_mask
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Insert or update the given key with the specified value.
+        Once live and deleted slots would fill 7/8 of the table, it is rebuilt:
+        at the same capacity if deleted slots make up much of that, otherwise
+        at twice the capacity.
+        """
+        key_hash = self._hash(key)
+        index = self._find_index(key, key_hash)
+        if index != -1:
+            self._values[index] = value
+            return
+
+        if self._size + self._deleted + 1 > self._MAX_LOAD * self._capacity:
+            if self._size + 1 <= self._MAX_LOAD * self._capacity / 2:
+                self.resize_table(self._capacity)
+            else:
+                self.resize_table(self._capacity * 2)
+
+        index = self._free_index(self._control, self._group_mask, key_hash)
+        if self._control[index] == DELETED:
+            self._deleted -= 1
+        self._control[index] = key_hash & 0x7F
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = key_hash
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rebuild the table with new_capacity slots (rounded up to a power-of-two
+        number of groups, and grown until the entries fit below the maximum
+        load), placing every live entry by its cached hash. Deleted slots are dropped.
+        """
+        if new_capacity < self._size:
+            return
+
+        new_capacity = self._round_capacity(new_capacity)
+        while self._size > self._MAX_LOAD * new_capacity:
+            new_capacity *= 2
+
+        old_control, old_keys, old_values, old_hashes = self._control, self._keys, self._values, self._hashes
+        self._allocate(new_capacity)
+        self._capacity = new_capacity
+        self._deleted = 0
+        control, keys, values, hashes = self._control, self._keys, self._values, self._hashes
+        group_mask = self._group_mask
+
+        for i in range(len(old_control)):
+            if old_control[i] >= EMPTY:
+                continue
+            key_hash = old_hashes[i]
+            index = self._free_index(control, group_mask, key_hash)
+            control[index] = old_control[i]
+            keys[index] = old_keys[i]
+            values[index] = old_values[i]
+            hashes[index] = key_hash
+
+    def table_load(self) -> float:
+        """
+        Return the current load factor of the hash table.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash table.
+        """
+        return self._control.count(EMPTY)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        index = self._find_index(key, self._hash(key))
+        return None if index == -1 else self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        return self._find_index(key, self._hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        index = self._find_index(key, self._hash(key))
+        if index == -1:
+            return
+
+        # A group that still has an empty slot has never been full, so no probe
+        # sequence continues past it and the slot can become empty again
+        start = index - index % GROUP_SIZE
+        if self._control.find(EMPTY, start, start + GROUP_SIZE) != -1:
+            self._control[index] = EMPTY
+        else:
+            self._control[index] = DELETED
+            self._deleted += 1
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of (key, value) for all live entries.
+        """
+        result = DynamicArray()
+        control, keys, values = self._control, self._keys, self._values
+        for i in range(self._capacity):
+            if control[i] < EMPTY:
+                result.append((keys[i], values[i]))
+        return result
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs in the hash map without changing the hash table's capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._deleted = 0
+
+    def __iter__(self):
+        """
+        Iterate over the live entries, yielding a HashEntry built for each one.
+        """
+        for i in range(self._capacity):
+            if self._control[i] < EMPTY:
+                yield HashEntry(self._keys[i], self._values[i], self._hashes[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('str150'), m.contains_key('str149'))
+
+    print("\nremove example")
+    print("--------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
+    print(m.get_keys_and_values())
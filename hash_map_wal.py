@@ -0,0 +1,443 @@
+# A durability layer for the HashMaps. Every put/remove/clear is appended to a write-ahead log as a
+# compact binary record, the log is fsynced in groups on a configurable interval, and the map is
+# rebuilt on open from the latest snapshot plus the logs written after it. Once the log grows
+# past a size limit it is compacted into a new snapshot by a background thread.
+#
+# Files in the directory, for generation g:
+#   snapshot-g.hmpk   the map's contents when log-g was started (a6_include.pack_table format)
+#   log-g.wal         the records written since then
+# A new generation starts at every compaction; older files are deleted once its snapshot is safe.
+
+import os
+import pickle
+import struct
+import threading
+import zlib
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_name, load_packed, save_packed
+
+ENGINES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+}
+
+# Record types
+PUT = 1
+REMOVE = 2
+CLEAR = 3
+
+# Record header: CRC-32 of the rest of the record, type, key length, value length
+_RECORD = struct.Struct('<IBII')
+
+
+def _encode_record(kind: int, key: object = None, value: object = None) -> bytes:
+    """Return the log record for one mutation."""
+    key_data = pickle.dumps(key) if kind != CLEAR else b''
+    value_data = pickle.dumps(value) if kind == PUT else b''
+    body = _RECORD.pack(0, kind, len(key_data), len(value_data))[4:] + key_data + value_data
+    return struct.pack('<I', zlib.crc32(body)) + body
+
+
+def _apply(hash_map, records: list) -> None:
+    """Replay (type, key, value) records on a map."""
+    for kind, key, value in records:
+        if kind == PUT:
+            hash_map.put(key, value)
+        elif kind == REMOVE:
+            hash_map.remove(key)
+        else:
+            hash_map.clear()
+
+
+def _read_records(data: bytes) -> tuple:
+    """
+    Return (records, valid length) for the contents of a log file. Records
+    are (type, key, value) tuples; reading stops at the first record that is
+    truncated or fails its checksum, as left behind by a crash mid-write.
+    """
+    records = []
+    offset = 0
+    while offset + _RECORD.size <= len(data):
+        crc, kind, key_length, value_length = _RECORD.unpack_from(data, offset)
+        end = offset + _RECORD.size + key_length + value_length
+        if end > len(data) or zlib.crc32(data[offset + 4:end]) != crc:
+            break
+        key_start = offset + _RECORD.size
+        key = pickle.loads(data[key_start:key_start + key_length]) if kind != CLEAR else None
+        value = pickle.loads(data[key_start + key_length:end]) if kind == PUT else None
+        records.append((kind, key, value))
+        offset = end
+    return records, offset
+
+
+class DurableHashMap:
+    # Queued bytes that are written to the log, without fsync, before the next group commit
+    _MAX_PENDING = 2 ** 20
+
+    def __init__(self,
+                 directory: str,
+                 function: callable = 'fnv1a',
+                 engine: str = 'sc',
+                 fsync_interval: float = 0.01,
+                 compact_bytes: int = 16 * 2 ** 20,
+                 **options) -> None:
+        """
+        Open the map stored in directory, creating it if needed, and replay its
+        snapshot and logs into a new ENGINES[engine](11, function, **options).
+        function must be registered in HASH_FUNCTIONS and not 'builtin', since
+        snapshots store hashes.
+        fsync_interval is the most time, in seconds, a mutation waits in memory
+        before it is written and fsynced: 0 fsyncs every mutation before it
+        returns, and None only on sync() and close(). A crash loses at most the
+        last interval of mutations. Whatever the interval, once more than
+        _MAX_PENDING bytes are queued they are written to the log without an
+        fsync, so memory use stays bounded; they become durable at the next fsync.
+        If a write or fsync fails, the error is raised again by every later
+        put/remove/clear, sync, compact and close, since the log is no longer
+        known to hold the mutations.
+        Once the current log passes compact_bytes, a background thread folds
+        it into a new snapshot; None disables compaction.
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        if fsync_interval is not None and fsync_interval < 0:
+            raise ValueError("fsync_interval must be None or at least 0")
+        hash_function_name(function)
+
+        self._directory = directory
+        self._fsync_interval = fsync_interval
+        self._compact_bytes = compact_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._map = ENGINES[engine](11, function, **options)
+        # Compaction replays the files into a scratch map of the same layout
+        self._engine = ENGINES[engine]
+        self._layout = {name: value for name, value in options.items() if name not in ('stats', 'flood_guard')}
+        self._generation = self._recover()
+        self._log = open(self._path('log', self._generation), 'ab', buffering=0)
+        self._log_bytes = self._log.tell()
+
+        # Records waiting for the next group commit
+        self._pending = bytearray()
+        # The OSError that broke the log, raised again by every later mutation
+        self._error = None
+        self._lock = threading.Lock()
+        self._compaction = None
+        # Cleared while the log of the previous generation is not yet fsynced
+        self._sealed = threading.Event()
+        self._sealed.set()
+        self._closed = threading.Event()
+        self._flusher = None
+        if fsync_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._flusher.start()
+
+    def __enter__(self) -> "DurableHashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _path(self, kind: str, generation: int) -> str:
+        """Return the path of the snapshot or log file of a generation."""
+        extension = 'hmpk' if kind == 'snapshot' else 'wal'
+        return os.path.join(self._directory, f"{kind}-{generation}.{extension}")
+
+    def _generations(self, kind: str) -> list:
+        """Return the generations of the snapshot or log files in the directory, in order."""
+        prefix = kind + '-'
+        generations = []
+        for name in os.listdir(self._directory):
+            stem, _, extension = name.partition('.')
+            if stem.startswith(prefix) and stem[len(prefix):].isdigit() and extension in ('hmpk', 'wal'):
+                generations.append(int(stem[len(prefix):]))
+        return sorted(generations)
+
+    def _recover(self) -> int:
+        """
+        Load the latest snapshot, replay every log from its generation on and
+        return the current generation. A torn record at the end of the last
+        log is cut off so new records follow valid ones.
+        """
+        snapshots = self._generations('snapshot')
+        generation = snapshots[-1] if snapshots else 0
+        if snapshots:
+            with load_packed(self._path('snapshot', generation)) as table:
+                self._map.put_many((entry.key, entry.value) for entry in table)
+
+        logs = [log for log in self._generations('log') if log >= generation]
+        for log in logs:
+            path = self._path('log', log)
+            with open(path, 'rb') as file:
+                data = file.read()
+            records, valid = _read_records(data)
+            _apply(self._map, records)
+            if valid < len(data):
+                with open(path, 'r+b') as file:
+                    file.truncate(valid)
+        return logs[-1] if logs else generation
+
+    def _holds(self, key: object) -> bool:
+        """Return True if the map has an entry for key, even one whose value is None."""
+        key_hash = self._map._hash(key)
+        if hasattr(self._map, '_find_node'):
+            return self._map._find_node(key, key_hash) is not None
+        return self._map._lookup(key, key_hash)[1] != -1
+
+    def _append(self, record: bytes) -> None:
+        """
+        Queue a record for the next group commit, or write and fsync it now
+        when fsync_interval is 0. A queue past _MAX_PENDING bytes is written
+        without fsync. The caller holds the lock.
+        """
+        self._pending += record
+        if self._fsync_interval == 0:
+            self._write_pending(True)
+        elif len(self._pending) >= self._MAX_PENDING:
+            self._write_pending(False)
+
+    def _check_error(self) -> None:
+        """Raise the error that broke the log, if any. The caller holds the lock."""
+        if self._error is not None:
+            raise self._error
+
+    def _write_pending(self, fsync: bool) -> None:
+        """
+        Write the queued records to the log, and fsync it. The fsync first waits
+        for the log of the previous generation to be fsynced, so a crash cannot
+        keep newer records and lose older ones. An OSError is kept in
+        self._error before it is raised. The caller holds the lock.
+        """
+        if self._pending:
+            try:
+                self._log.write(self._pending)
+                self._log_bytes += len(self._pending)
+                self._pending = bytearray()
+                if fsync:
+                    self._sealed.wait()
+                    self._check_error()
+                    os.fsync(self._log.fileno())
+            except OSError as error:
+                self._error = error
+                raise
+            if self._compact_bytes is not None and self._log_bytes >= self._compact_bytes:
+                self._start_compaction()
+
+    def _flush_periodically(self) -> None:
+        """
+        Group commit loop: write and fsync everything queued once per interval.
+        It stops at the first OSError, which _write_pending has kept for the
+        next caller.
+        """
+        while not self._closed.wait(self._fsync_interval):
+            with self._lock:
+                try:
+                    self._write_pending(True)
+                except OSError:
+                    return
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: object, value: object) -> None:
+        """
+        Adds a new key-value pair to the hash map, updating the value if the key already exists.
+        """
+        record = _encode_record(PUT, key, value)
+        with self._lock:
+            self._check_error()
+            self._map.put(key, value)
+            self._append(record)
+
+    def remove(self, key: object) -> None:
+        """
+        Removes the specified key and its associated value from the hash map.
+        If the key is not found, the method does nothing.
+        """
+        with self._lock:
+            self._check_error()
+            if self._holds(key):
+                self._map.remove(key)
+                self._append(_encode_record(REMOVE, key))
+
+    def clear(self) -> None:
+        """
+        Clears all key/value pairs in the hash map.
+        """
+        with self._lock:
+            self._check_error()
+            self._map.clear()
+            self._append(_encode_record(CLEAR))
+
+    def get(self, key: object) -> object:
+        """
+        Returns the value associated with the given key, or None if the key is not found.
+        """
+        with self._lock:
+            return self._map.get(key)
+
+    def contains_key(self, key: object) -> bool:
+        """
+        Returns True if the hash map contains the specified key, False otherwise.
+        """
+        with self._lock:
+            return self._map.contains_key(key)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._map.get_capacity()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing tuples of (key, value) for all entries.
+        """
+        with self._lock:
+            return self._map.get_keys_and_values()
+
+    def sync(self) -> None:
+        """
+        Write and fsync every queued mutation now.
+        """
+        with self._lock:
+            self._check_error()
+            self._write_pending(True)
+
+    # ------------------------------------------------------------------ #
+
+    def _start_compaction(self) -> None:
+        """
+        Start a new generation: later records go to a new log, and a background
+        thread fsyncs the old log and builds the snapshot of the new generation
+        from the files. Only the switch to the new log happens under the lock,
+        which the caller holds after writing the queued records.
+        """
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        try:
+            log = open(self._path('log', self._generation + 1), 'ab', buffering=0)
+        except OSError as error:
+            self._error = error
+            raise
+        previous, self._log = self._log, log
+        self._generation += 1
+        self._log_bytes = 0
+        self._sealed.clear()
+
+        # The hashes belong to the current function, which flood_guard may later replace
+        self._compaction = threading.Thread(target=self._write_snapshot,
+                                            args=(self._generation, previous, self._map._hash_function),
+                                            daemon=True)
+        self._compaction.start()
+
+    def _write_snapshot(self, generation: int, previous, function: callable) -> None:
+        """
+        Fsync and close the log of the previous generation, replay the files
+        before generation into a scratch map and write it as the snapshot of
+        generation, then delete the files it replaces. An error is kept in
+        self._error, to be raised by the next mutation, sync, compact or close.
+        """
+        try:
+            try:
+                os.fsync(previous.fileno())
+            except OSError as error:
+                self._error = error
+                raise
+            finally:
+                previous.close()
+                self._sealed.set()
+
+            scratch = self._engine(11, function, **self._layout)
+            snapshots = [older for older in self._generations('snapshot') if older < generation]
+            start = snapshots[-1] if snapshots else 0
+            if snapshots:
+                with load_packed(self._path('snapshot', start)) as table:
+                    scratch.put_many((entry.key, entry.value) for entry in table)
+            for log in self._generations('log'):
+                if start <= log < generation:
+                    with open(self._path('log', log), 'rb') as file:
+                        _apply(scratch, _read_records(file.read())[0])
+
+            if hasattr(scratch, '_nodes'):
+                entries = [(node.key, node.value, node.key_hash) for node in scratch._nodes()]
+            else:
+                entries = [(entry.key, entry.value, entry.key_hash) for entry in scratch._entries()]
+            save_packed(self._path('snapshot', generation), entries, function, scratch._power_of_two)
+            for kind in ('snapshot', 'log'):
+                for older in self._generations(kind):
+                    if older < generation:
+                        os.remove(self._path(kind, older))
+        except Exception as error:
+            with self._lock:
+                if self._error is None:
+                    self._error = error
+
+    def compact(self) -> None:
+        """
+        Fold the log into a new snapshot now and wait until it is written.
+        """
+        with self._lock:
+            self._check_error()
+            self._write_pending(True)
+            if self._compaction is None or not self._compaction.is_alive():
+                self._start_compaction()
+            compaction = self._compaction
+        compaction.join()
+        with self._lock:
+            self._check_error()
+
+    def close(self) -> None:
+        """
+        Write and fsync every queued mutation, wait for a running compaction
+        and close the log. The map cannot be used afterwards. The log is closed
+        even if the last write fails or an earlier one did; that error is raised.
+        """
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+        try:
+            with self._lock:
+                self._check_error()
+                self._write_pending(True)
+        finally:
+            compaction = self._compaction
+            if compaction is not None:
+                compaction.join()
+            self._log.close()
+        with self._lock:
+            self._check_error()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("\nput / reopen example")
+        print("--------------------")
+        with DurableHashMap(directory, 'hash_function_1') as m:
+            for i in range(150):
+                m.put('str' + str(i), i * 100)
+            m.remove('str0')
+        with DurableHashMap(directory, 'hash_function_1') as m:
+            print(m.get_size(), m.get('str42'), m.get('str0'), m.contains_key('str149'))
+
+        print("\ncompaction example")
+        print("------------------")
+        with DurableHashMap(directory, 'hash_function_1', engine='oa', compact_bytes=None) as m:
+            m.compact()
+            m.put('str150', 15000)
+            print(sorted(os.listdir(directory)))
+        with DurableHashMap(directory, 'hash_function_1') as m:
+            print(m.get_size(), m.get('str150'))
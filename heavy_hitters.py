@@ -0,0 +1,220 @@
+# Bounded-memory approximate counterparts of hash_map_sc.find_mode: a Count-Min Sketch for
+# frequency estimates and a Space-Saving summary that tracks the heavy hitters of a stream.
+
+import heapq
+import math
+from array import array
+
+from a6_include import DynamicArray, mix_hash, next_prime, resolve_hash_function
+from hash_map_sc import HashMap, _elements
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: a depth x width table of counters. Every element adds to
+    one counter per row and its estimate is the smallest of those counters.
+    The estimate never undercounts; with probability 1 - delta it overcounts
+    by at most epsilon times the total number of elements added.
+    """
+
+    def __init__(self, epsilon: float = 0.001, delta: float = 0.01,
+                 function: callable = 'fnv1a') -> None:
+        """
+        Initialize an empty sketch sized for the given error and confidence.
+        The width is rounded up to a prime, so every step of the double hashing
+        in _indexes is coprime with it and each row spreads over all columns.
+        """
+        if not 0 < epsilon < 1 or not 0 < delta < 1:
+            raise ValueError("epsilon and delta must be in (0, 1)")
+        self._width = next_prime(math.ceil(math.e / epsilon))
+        self._depth = math.ceil(math.log(1 / delta))
+        self._counters = array('q', bytes(8 * self._width * self._depth))
+        self._hash_function = resolve_hash_function(function)
+        self._total = 0
+
+    def _indexes(self, key_hash: int) -> list:
+        """
+        Return the counter index of a hash in every row. The row hashes are
+        derived from the one hash by double hashing, with a step in
+        [1, width) so that rows never repeat a column.
+        """
+        width = self._width
+        second = 1 + mix_hash(key_hash) % (width - 1)
+        return [row * width + (key_hash + row * second) % width for row in range(self._depth)]
+
+    def add(self, element: object, count: int = 1) -> None:
+        """Add count occurrences of element."""
+        self._add_hashed(self._hash_function(element), count)
+
+    def _add_hashed(self, key_hash: int, count: int = 1) -> None:
+        """Add count occurrences of the element with an already computed hash."""
+        counters = self._counters
+        for index in self._indexes(key_hash):
+            counters[index] += count
+        self._total += count
+
+    def estimate(self, element: object) -> int:
+        """Return the estimated number of occurrences of element."""
+        return self._estimate_hashed(self._hash_function(element))
+
+    def _estimate_hashed(self, key_hash: int) -> int:
+        """Return the estimated number of occurrences of the element with an already computed hash."""
+        counters = self._counters
+        return min(counters[index] for index in self._indexes(key_hash))
+
+    def halve(self) -> None:
+        """Divide every counter (and the total) by two, so old counts fade out."""
+        counters = self._counters
+        for index in range(len(counters)):
+            counters[index] >>= 1
+        self._total >>= 1
+
+    def get_total(self) -> int:
+        """Return the number of elements added."""
+        return self._total
+
+    def get_width(self) -> int:
+        """Return the number of counters per row."""
+        return self._width
+
+    def get_depth(self) -> int:
+        """Return the number of rows."""
+        return self._depth
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary monitoring at most k elements. An unmonitored element
+    replaces the monitored element with the smallest count and inherits that
+    count (plus one), which is recorded as its maximum overcount. Any element
+    occurring more than total / k times is guaranteed to be monitored.
+    """
+
+    def __init__(self, k: int, function: callable = 'fnv1a') -> None:
+        """Initialize an empty summary with k counters."""
+        if k < 1:
+            raise ValueError("k must be at least 1")
+        self._k = k
+        # element -> [count, error]
+        self._counters = HashMap(k, function, expected_size=k)
+        # One (count, sequence, element, hash) entry per monitored element. Counts
+        # are only refreshed when an entry reaches the top, so a heap count may
+        # lag behind the element's real count but never exceeds it.
+        self._heap = []
+        self._sequence = 0
+        self._total = 0
+
+    def _pop_min(self) -> int:
+        """Stop monitoring the element with the smallest count and return that count."""
+        heap = self._heap
+        while True:
+            count, _, element, key_hash = heap[0]
+            counter = self._counters._find_node(element, key_hash).value
+            if counter[0] == count:
+                heapq.heappop(heap)
+                self._counters._remove_hashed(element, key_hash)
+                return count
+            # Stale entry: refresh it and look again
+            self._sequence += 1
+            heapq.heapreplace(heap, (counter[0], self._sequence, element, key_hash))
+
+    def add(self, element: object, count: int = 1) -> None:
+        """Add count occurrences of element."""
+        self._add_hashed(element, self._counters._hash(element), count)
+
+    def _add_hashed(self, element: object, key_hash: int, count: int = 1) -> None:
+        """Add count occurrences of element using an already computed hash."""
+        self._total += count
+        node = self._counters._find_node(element, key_hash)
+        if node:
+            node.value[0] += count
+            return
+
+        if self._counters.get_size() < self._k:
+            counter = [count, 0]
+        else:
+            minimum = self._pop_min()
+            counter = [minimum + count, minimum]
+        # The map is sized for k entries, so it never needs to grow here
+        self._counters._put_hashed(element, counter, key_hash)
+        self._sequence += 1
+        heapq.heappush(self._heap, (counter[0], self._sequence, element, key_hash))
+
+    def update(self, chunk) -> None:
+        """Add every element of a DynamicArray or any other iterable."""
+        for element in _elements(chunk):
+            self.add(element)
+
+    def estimate(self, element: object) -> tuple:
+        """
+        Return (count, error) for element: its true frequency lies between
+        count - error and count. Unmonitored elements return (0, 0).
+        """
+        counter = self._counters.get(element)
+        return (counter[0], counter[1]) if counter is not None else (0, 0)
+
+    def top_k(self, k: int = None) -> DynamicArray:
+        """
+        Return up to k monitored (element, count, error) triples, highest count first.
+        """
+        nodes = heapq.nlargest(k or self._k, self._counters._nodes(), key=lambda node: node.value[0])
+        return DynamicArray([(node.key, node.value[0], node.value[1]) for node in nodes])
+
+    def get_total(self) -> int:
+        """Return the number of elements added."""
+        return self._total
+
+
+def approx_find_mode(da, epsilon: float = 0.001, delta: float = 0.01,
+                     function: callable = 'fnv1a') -> tuple[DynamicArray, int]:
+    """
+    Approximate find_mode in memory bounded by epsilon instead of by the number
+    of distinct elements. A Space-Saving summary with 1 / epsilon counters picks
+    the candidates and a Count-Min Sketch tightens their counts, since both only
+    ever overestimate. The returned frequency overestimates the true one by at
+    most epsilon times the input length (with probability 1 - delta for the sketch).
+    da may be a DynamicArray or any other iterable.
+    """
+    summary = SpaceSaving(math.ceil(1 / epsilon), function)
+    sketch = CountMinSketch(epsilon, delta, function)
+    # Hash every element once and share the hash between the two structures
+    for element in _elements(da):
+        key_hash = summary._counters._hash(element)
+        summary._add_hashed(element, key_hash)
+        sketch._add_hashed(key_hash)
+
+    max_frequency = 0
+    mode_elements = []
+    for node in summary._counters._nodes():
+        frequency = min(node.value[0], sketch._estimate_hashed(node.key_hash))
+        if frequency > max_frequency:
+            max_frequency = frequency
+            mode_elements.clear()
+            mode_elements.append(node.key)
+        elif frequency == max_frequency:
+            mode_elements.append(node.key)
+    return DynamicArray(mode_elements), max_frequency
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+
+    print("\nCountMinSketch example")
+    print("----------------------")
+    sketch = CountMinSketch(0.01, 0.01)
+    for i in range(1000):
+        sketch.add('item' + str(i % 50))
+    print(sketch.get_width(), sketch.get_depth(), sketch.estimate('item7'), sketch.estimate('missing'))
+
+    print("\nSpaceSaving example")
+    print("-------------------")
+    summary = SpaceSaving(3)
+    summary.update(["a", "b", "a", "c", "d", "a", "b", "e", "a"])
+    print(summary.top_k(), summary.estimate('a'))
+
+    print("\napprox_find_mode example")
+    print("------------------------")
+    da = DynamicArray(["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu", "Ubuntu"])
+    mode, frequency = approx_find_mode(da, epsilon=0.25)
+    print(f"Input: {da}\nMode : {mode}, Frequency: {frequency}")
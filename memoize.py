@@ -0,0 +1,339 @@
+# A memoization decorator storing results in the project's HashMaps. Unbounded caches use a
+# hash_map_sc or hash_map_oa HashMap; bounded or expiring ones a hash_map_cache.CacheMap. Entries
+# evicted from a bounded cache can spill to a file, and concurrent callers of the same arguments
+# wait for one computation instead of each running the function.
+
+import functools
+import os
+import pickle
+import tempfile
+import threading
+from time import monotonic, perf_counter
+
+import hash_map_oa
+import hash_map_sc
+from hash_map_cache import CacheMap
+
+ENGINES = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+}
+
+# Separates positional from keyword arguments in a key
+_KWARGS_MARK = object()
+
+# Single arguments of these types are their own key, as in functools.lru_cache
+_FAST_TYPES = (int, str)
+
+
+def _make_key(args: tuple, kwargs: dict, typed: bool) -> object:
+    """Return the cache key of a call: its arguments, and their types if typed."""
+    if not kwargs and not typed and len(args) == 1 and type(args[0]) in _FAST_TYPES:
+        return args[0]
+    key = args
+    if kwargs:
+        key += (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+    if typed:
+        key += tuple(type(arg) for arg in args)
+        if kwargs:
+            key += tuple(type(value) for _, value in sorted(kwargs.items()))
+    return key
+
+
+class _Call:
+    """A computation in progress, waited on by the callers that arrive during it."""
+
+    __slots__ = ('done', 'result', 'error', 'cost')
+
+    def __init__(self) -> None:
+        """Initialize an unfinished call."""
+        self.done = threading.Event()
+        self.result = self.error = None
+        self.cost = 0.0
+
+
+class MemoInfo:
+    """
+    Counters of a memoized function. Every call is a hit (served from memory
+    or from the spill file), a coalesced call (waited for another caller's
+    computation) or a miss (ran the function).
+    """
+
+    __slots__ = ('hits', 'misses', 'coalesced', 'spill_hits', 'size', 'compute_seconds', 'saved_seconds')
+
+    def __init__(self) -> None:
+        """Initialize all counters to zero."""
+        self.hits = self.misses = self.coalesced = self.spill_hits = self.size = 0
+        self.compute_seconds = self.saved_seconds = 0.0
+
+    def hit_ratio(self) -> float:
+        """Return the fraction of calls that did not run the function (0 before any call)."""
+        calls = self.hits + self.coalesced + self.misses
+        return (self.hits + self.coalesced) / calls if calls else 0.0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return (f"hits: {self.hits} misses: {self.misses} coalesced: {self.coalesced} "
+                f"spill hits: {self.spill_hits} size: {self.size} hit ratio: {self.hit_ratio():.3f} "
+                f"compute: {self.compute_seconds:.3f}s saved: {self.saved_seconds:.3f}s")
+
+
+class _SpillFile:
+    """
+    Append-only file of pickled entries evicted from memory, indexed by a
+    chaining HashMap of key -> (offset, length). It only lives as long as the
+    memoized function: it is truncated when opened and removed on close.
+    """
+
+    def __init__(self, path: str, function: callable) -> None:
+        """Create the file at path, or a temporary file if path is True."""
+        if path is True:
+            descriptor, path = tempfile.mkstemp(suffix='.spill')
+            os.close(descriptor)
+        self._path = path
+        self._file = open(path, 'w+b')
+        self._index = hash_map_sc.HashMap(11, function)
+
+    def write(self, key: object, entry: tuple) -> None:
+        """Append entry under key. Entries that cannot be pickled are dropped."""
+        try:
+            data = pickle.dumps(entry)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        offset = self._file.seek(0, os.SEEK_END)
+        self._file.write(data)
+        self._index.put(key, (offset, len(data)))
+
+    def take(self, key: object) -> tuple:
+        """Return the entry stored under key and forget it, or None if there is none."""
+        location = self._index.get(key)
+        if location is None:
+            return None
+        self._index.remove(key)
+        self._file.flush()
+        offset, length = location
+        return pickle.loads(os.pread(self._file.fileno(), length, offset))
+
+    def get_size(self) -> int:
+        """Return the number of entries in the file."""
+        return self._index.get_size()
+
+    def clear(self) -> None:
+        """Drop every entry and empty the file."""
+        self._index.clear()
+        self._file.truncate(0)
+
+    def close(self) -> None:
+        """Close and delete the file."""
+        self._file.close()
+        os.remove(self._path)
+
+
+class _Memoized:
+    """The cache and counters behind one memoized function."""
+
+    def __init__(self, func: callable, max_entries: int, max_bytes: int, ttl: float, eviction: str,
+                 engine: str, function: callable, spill, typed: bool, options: dict) -> None:
+        """Build the storage described by the memoize arguments."""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
+        bounded = max_entries is not None or max_bytes is not None
+        if spill and not bounded:
+            raise ValueError("spill needs max_entries or max_bytes, since only evicted entries spill")
+
+        self._func = func
+        self._ttl = ttl
+        self._typed = typed
+        self._lock = threading.Lock()
+        self._info = MemoInfo()
+        self._in_flight = hash_map_sc.HashMap(11, function)
+        self._spill = _SpillFile(spill, function) if spill else None
+
+        if bounded or ttl is not None:
+            if engine != 'sc':
+                raise ValueError("max_entries, max_bytes and ttl need engine='sc' (a CacheMap)")
+            # Entries are (result, cost, expires); weigh the result only
+            weigher = options.pop('weigher', None)
+            if weigher is not None:
+                options['weigher'] = lambda key, entry: weigher(key, entry[0])
+            self.cache = CacheMap(max_entries, max_bytes, eviction, ttl, function,
+                                  on_evict=self._spill.write if self._spill else None, **options)
+        else:
+            self.cache = ENGINES[engine](11, function, **options)
+
+    def _lookup(self, key: object) -> tuple:
+        """Return the live entry for key from memory or the spill file, or None. The lock is held."""
+        entry = self.cache.get(key)
+        if entry is None and self._spill is not None:
+            entry = self._spill.take(key)
+            if entry is not None and (entry[2] is None or entry[2] > monotonic()):
+                self._info.spill_hits += 1
+                self.cache.put(key, entry, None if entry[2] is None else entry[2] - monotonic())
+            else:
+                entry = None
+        return entry
+
+    def _store(self, key: object, result: object, cost: float) -> None:
+        """Cache a computed result. The lock is held."""
+        expires = None if self._ttl is None else monotonic() + self._ttl
+        self.cache.put(key, (result, cost, expires))
+
+    def __call__(self, *args, **kwargs) -> object:
+        """Return the cached result for the arguments, computing it at most once."""
+        key = _make_key(args, kwargs, self._typed)
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self._info.hits += 1
+                self._info.saved_seconds += entry[1]
+                return entry[0]
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight.put(key, call)
+                self._info.misses += 1
+            else:
+                self._info.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            with self._lock:
+                self._info.saved_seconds += call.cost
+            return call.result
+
+        start = perf_counter()
+        try:
+            call.result = self._func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        else:
+            call.cost = perf_counter() - start
+            with self._lock:
+                self._store(key, call.result, call.cost)
+                self._info.compute_seconds += call.cost
+            return call.result
+        finally:
+            with self._lock:
+                self._in_flight.remove(key)
+            call.done.set()
+
+    def cache_info(self) -> MemoInfo:
+        """Return a copy of the counters, with the current number of cached results."""
+        with self._lock:
+            info = MemoInfo()
+            for name in MemoInfo.__slots__:
+                setattr(info, name, getattr(self._info, name))
+            info.size = self.cache.get_size() + (self._spill.get_size() if self._spill else 0)
+            return info
+
+    def cache_clear(self) -> None:
+        """Drop every cached result and reset the counters."""
+        with self._lock:
+            self.cache.clear()
+            if self._spill is not None:
+                self._spill.clear()
+            self._info = MemoInfo()
+
+    def cache_close(self) -> None:
+        """Delete the spill file. The function must not be called afterwards."""
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+
+
+def memoize(max_entries: int = None,
+            max_bytes: int = None,
+            ttl: float = None,
+            eviction: str = 'lru',
+            engine: str = 'sc',
+            function: callable = 'builtin',
+            spill=None,
+            typed: bool = False,
+            **options) -> callable:
+    """
+    Decorator caching a pure function's results by its arguments, which must
+    be hashable by function (the default 'builtin' hashes any hashable).
+    Without bounds or ttl the results go in an ENGINES[engine] HashMap and are
+    kept forever. max_entries, max_bytes, eviction and ttl are those of
+    hash_map_cache.CacheMap, which then stores them (engine must be 'sc').
+    spill, a path or True for a temporary file, keeps results evicted from a
+    bounded cache on disk and moves them back into memory when called again.
+    typed caches arguments of different types (1 and 1.0) separately.
+    Callers that ask for a result while it is being computed wait for it
+    instead of computing it again. options are passed on to the map.
+
+    The decorated function gets cache_info(), cache_clear(), cache_close()
+    (which deletes the spill file) and the underlying map as .cache.
+    """
+    def decorator(func: callable) -> callable:
+        memoized = _Memoized(func, max_entries, max_bytes, ttl, eviction, engine,
+                             function, spill, typed, options)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return memoized(*args, **kwargs)
+
+        wrapper.cache_info = memoized.cache_info
+        wrapper.cache_clear = memoized.cache_clear
+        wrapper.cache_close = memoized.cache_close
+        wrapper.cache = memoized.cache
+        return wrapper
+    return decorator
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+if __name__ == "__main__":
+    import time
+
+    print("\nunbounded example")
+    print("-----------------")
+
+    @memoize()
+    def fib(n: int) -> int:
+        return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+    print(fib(80), fib.cache_info().size, fib.cache_info().hits, fib.cache_info().misses)
+
+    print("\nbounded with spill example")
+    print("--------------------------")
+
+    @memoize(max_entries=4, spill=True)
+    def square(n: int) -> int:
+        return n * n
+
+    for n in list(range(8)) + list(range(8)):
+        square(n)
+    print(square.cache.get_size(), square.cache_info())
+    square.cache_close()
+
+    print("\nttl example")
+    print("-----------")
+
+    @memoize(ttl=0.05)
+    def now(label: str) -> float:
+        return time.monotonic()
+
+    first = now('a')
+    print(now('a') == first, end=' ')
+    time.sleep(0.06)
+    print(now('a') == first, now.cache_info())
+
+    print("\nconcurrent callers example")
+    print("--------------------------")
+
+    @memoize(engine='oa')
+    def slow(key: str, factor: int = 2) -> str:
+        time.sleep(0.05)
+        return key * factor
+
+    threads = [threading.Thread(target=slow, args=('ab',), kwargs={'factor': 3}) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(slow('ab', factor=3), slow.cache_info())